@@ -0,0 +1,401 @@
+# =========================================================
+# BENCHMARK - ETL E CADASTROS
+# Autor: Victor
+# Descrição: Gera dados sintéticos (planilhas anuais de
+#            receitas/despesas e planilhas de cadastro de
+#            clientes, produtos e fornecedores), mede o tempo
+#            de cada etapa e compara com um baseline gravado.
+#
+#   python benchmark.py                       -> mede e compara
+#   python benchmark.py --salvar-baseline     -> grava o baseline
+#   python benchmark.py --so cadastro --tamanhos 10000 --repeticoes 1
+# =========================================================
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import extract_receitas
+import extract_despesas
+import transform_receitas
+import transform_despesas
+from etl_formatos import ler_base
+from cadastro_export import export_dataframe
+from cadastro_clientes import ClientesTratamento
+from cadastro_produtos import ProdutosTratamento
+from cadastro_fornecedores import FornecedoresTratamento
+
+PASTA_MODULO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_BASELINE = os.path.join(PASTA_MODULO, "benchmark_baseline.json")
+PASTA_DADOS = os.path.join(tempfile.gettempdir(), "benchmark_etl")
+
+TAMANHOS = [10_000, 100_000, 1_000_000]
+ANOS = [3, 10]
+SEMENTE = 42
+# acima disso a gravação do xlsx domina o tempo e não é medida
+MAX_LINHAS_XLSX = 100_000
+# variação tolerada antes de apontar regressão (relativa e absoluta)
+TOLERANCIA = 0.20
+MINIMO_SEGUNDOS = 0.05
+
+MESES = ["JAN", "FEV", "MAR", "ABR", "MAI", "JUN", "JUL", "AGO", "SET", "OUT", "NOV", "DEZ"]
+
+
+# ---------------------- dados sintéticos: receitas / despesas ----------------------
+
+DESCRICOES_RECEITAS = [
+    "Salário Victor", "Salário Suellyn", "Bonificação Victor", "Bonificação Suely",
+    "13º Victor", "13 Suellyn", "Ticket", "Vale Refeição", "Vale Alimentação",
+    "Comissão", "Comissão Magalu", "FGTS Victor", "FGTS Varoa", "Seguro Desemprego",
+    "Restituição IR", "Freela", "Venda OLX",
+]
+
+DESCRICOES_DESPESAS = [
+    "Dízimo", "Oferta", "Aporte de caixa", "Aporte para carro", "Aporte de investimento",
+    "Nubank Victor", "Nubank Suellyn", "XP Casal", "Coisas casa", "Coisa Conrado",
+    "Aluguel", "Energia", "Internet", "Felicidade Suellyn", "Felicidade Victor",
+    "Parcela carro 3/48", "Combustível", "Gasolina", "Uber", "Quitar dívida menor",
+    "Financiamento casa", "iFood", "Supermercado", "Restaurante", "Farmácia", "Presente",
+]
+
+
+def gerar_planilhas_etl(pasta, anos, semente=SEMENTE):
+    """
+    Gera `anos` planilhas 'controle AAAA.xlsx' no layout lido pelos extracts:
+    uma aba por mês, título na linha 1, cabeçalho na linha 2, receitas em A:C
+    (até 30 linhas) e despesas em E:G (até 25 linhas). Retorna a pasta.
+    """
+    if os.path.isdir(pasta) and len(os.listdir(pasta)) == anos:
+        return pasta
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.makedirs(pasta)
+
+    rng = np.random.default_rng(semente)
+    for ano in range(2000, 2000 + anos):
+        wb = Workbook(write_only=True)
+        for mes in MESES:
+            ws = wb.create_sheet(mes)
+            ws.append([f"CONTROLE {mes}/{ano}"])
+            ws.append(["DESCRICAO", "TETO", "REALIZADO", None, "DESCRICAO", "TETO", "REALIZADO"])
+
+            n_receitas = int(rng.integers(5, 29))
+            n_despesas = int(rng.integers(10, 24))
+            receitas = rng.choice(DESCRICOES_RECEITAS, n_receitas).tolist() + ["TOTAL"]
+            despesas = rng.choice(DESCRICOES_DESPESAS, n_despesas).tolist() + ["TOTAL"]
+            for i in range(max(len(receitas), len(despesas))):
+                linha = [None] * 7
+                if i < len(receitas):
+                    linha[0:3] = [receitas[i], int(rng.integers(100, 9000)), round(float(rng.uniform(0, 9000)), 2)]
+                if i < len(despesas):
+                    linha[4:7] = [despesas[i], int(rng.integers(50, 5000)), round(float(rng.uniform(0, 5000)), 2)]
+                ws.append(linha)
+        wb.save(os.path.join(pasta, f"controle {ano}.xlsx"))
+    return pasta
+
+
+# ---------------------- dados sintéticos: cadastros ----------------------
+
+NOMES = ["ANA", "Bruno", "carla", "Diego", "Eduarda", "fabio", "GABRIELA", "Heitor", "Íris", "João"]
+SOBRENOMES = ["Silva", "SOUZA", "oliveira", "Pereira", "Lima", "Gonçalves", "D'Ávila", "Araújo"]
+RUAS = ["Rua das Flores", "Av. Brasil", "Travessa São João", "Rua 7 de Setembro", "Alameda Santos"]
+BAIRROS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", None]
+CIDADES = ["São Paulo", "Campinas", "Belo Horizonte", "Curitiba", "Goiânia", "Recife"]
+UFS = ["SP", "SP", "MG", "PR", "GO", "PE"]
+CANAIS = ["Loja", "Instagram", "WhatsApp", "Indicação", None, None]
+MARCAS = ["ACME", "Genérica", "Top Line", "Super'S", None]
+UNIDADES = ["UN", "CX", "KG", "PC", "LT"]
+
+
+def _escolher(rng, valores, n):
+    return pd.Series(rng.choice(np.array(valores, dtype=object), n), dtype=object)
+
+
+def _digitos(rng, n, tamanho):
+    # números com `tamanho` dígitos (zeros à esquerda) como texto
+    return pd.Series(rng.integers(0, 10 ** tamanho, n)).astype(str).str.zfill(tamanho)
+
+
+def _com_vazios(rng, serie, fracao):
+    return serie.mask(rng.random(len(serie)) < fracao)
+
+
+def _documento(rng, n):
+    # mistura CNPJ formatado, CPF formatado e só dígitos
+    cnpj = _digitos(rng, n, 14)
+    cpf = _digitos(rng, n, 11)
+    cnpj_fmt = cnpj.str[:2] + "." + cnpj.str[2:5] + "." + cnpj.str[5:8] + "/" + cnpj.str[8:12] + "-" + cnpj.str[12:]
+    cpf_fmt = cpf.str[:3] + "." + cpf.str[3:6] + "." + cpf.str[6:9] + "-" + cpf.str[9:]
+    sorteio = rng.random(n)
+    return pd.Series(np.where(sorteio < 0.4, cnpj_fmt, np.where(sorteio < 0.8, cpf_fmt, cpf)), dtype=object)
+
+
+def _endereco(rng, n):
+    cep = _digitos(rng, n, 8)
+    numero = pd.Series(rng.integers(1, 5000, n)).astype(str)
+    return {
+        "endereco": _escolher(rng, RUAS, n),
+        "numero": numero.mask(rng.random(n) < 0.1, "S/N"),
+        "bairro": _escolher(rng, BAIRROS, n),
+        "cidade": _escolher(rng, CIDADES, n),
+        "uf": _escolher(rng, UFS, n),
+        "cep": cep.str[:5] + "-" + cep.str[5:],
+    }
+
+
+def _nomes(rng, n):
+    return _escolher(rng, NOMES, n) + " " + _escolher(rng, SOBRENOMES, n)
+
+
+def _fone(rng, n):
+    fone = _digitos(rng, n, 9)
+    return "(" + _digitos(rng, n, 2) + ") " + fone.str[:5] + "-" + fone.str[5:]
+
+
+def gerar_clientes(n, semente=SEMENTE):
+    """Cadastro de clientes com colunas já mapeadas (saída da etapa 2 da GUI)."""
+    rng = np.random.default_rng(semente)
+    nome = _nomes(rng, n)
+    return pd.DataFrame({
+        "cliente_id": np.arange(1, n + 1),
+        "nome": nome,
+        "fantasia": _com_vazios(rng, nome, 0.5),
+        "cnpj_cpf": _documento(rng, n),
+        "ie": _com_vazios(rng, _digitos(rng, n, 12).mask(rng.random(n) < 0.2, "ISENTO"), 0.3),
+        "fone": _com_vazios(rng, _fone(rng, n), 0.1),
+        **_endereco(rng, n),
+        "email": _com_vazios(rng, nome.str.lower().str.replace(" ", ".", regex=False) + "@email.com", 0.3),
+        "canal": _escolher(rng, CANAIS, n),
+        "ponto_referencia": _com_vazios(rng, "Próximo ao nº " + _digitos(rng, n, 3), 0.7),
+    })
+
+
+def gerar_produtos(n, semente=SEMENTE):
+    """Cadastro de produtos com colunas já mapeadas; preços em formatos variados."""
+    rng = np.random.default_rng(semente)
+    preco = pd.Series(rng.uniform(1, 20000, n).round(2))
+    preco_br = preco.map("{:,.2f}".format).str.replace(",", "_").str.replace(".", ",").str.replace("_", ".")
+    sorteio = rng.random(n)
+    return pd.DataFrame({
+        "produto_id": np.arange(1, n + 1),
+        "descricao": "Produto " + _escolher(rng, SOBRENOMES, n) + " " + _digitos(rng, n, 4),
+        "marca": _escolher(rng, MARCAS, n),
+        "fornece": _escolher(rng, SOBRENOMES, n),
+        "estoque": rng.integers(0, 500, n),
+        "unidade": _escolher(rng, UNIDADES, n),
+        # "1.234,56", "R$ 1234.56" ou vazio
+        "prvenda": pd.Series(np.where(sorteio < 0.5, preco_br, "R$ " + preco.astype(str)), dtype=object)
+                   .mask(sorteio > 0.95),
+        "ccompra": _com_vazios(rng, (preco * 0.6).round(2).astype(str).str.replace(".", ",", regex=False), 0.1),
+        "pesobr": _com_vazios(rng, pd.Series(rng.uniform(0.01, 50, n).round(3)), 0.2),
+        "ncm": _com_vazios(rng, pd.Series(rng.integers(10_000_000, 99_999_999, n), dtype=float), 0.1),
+        "cest": _com_vazios(rng, pd.Series(rng.integers(100_000, 9_999_999, n), dtype=float), 0.6),
+        "origem": rng.integers(0, 9, n),
+        "ean13": _com_vazios(rng, pd.Series(rng.integers(10 ** 12, 10 ** 13 - 1, n), dtype=float), 0.2),
+    })
+
+
+def gerar_fornecedores(n, semente=SEMENTE):
+    """Cadastro de fornecedores com colunas já mapeadas."""
+    rng = np.random.default_rng(semente)
+    razao = _nomes(rng, n) + " LTDA"
+    return pd.DataFrame({
+        "fornecedor_id": np.arange(1, n + 1),
+        "razao": razao,
+        "fantasia": _com_vazios(rng, razao, 0.5),
+        "cnpj_cpf": _documento(rng, n),
+        "ie": _com_vazios(rng, _digitos(rng, n, 12).mask(rng.random(n) < 0.2, "ISENTO"), 0.3),
+        "fone": _com_vazios(rng, _fone(rng, n), 0.1),
+        "email": _com_vazios(rng, razao.str.lower().str.replace(" ", "", regex=False) + "@fornecedor.com", 0.3),
+        **_endereco(rng, n),
+        "contato": _com_vazios(rng, _nomes(rng, n), 0.4),
+    })
+
+
+# tipo -> (gerar(n), criar o tratador)
+CADASTROS = {
+    "clientes": (gerar_clientes, ClientesTratamento),
+    "produtos": (gerar_produtos, lambda: ProdutosTratamento(decimal_fields=["prvenda", "ccompra", "pesobr"])),
+    "fornecedores": (gerar_fornecedores, FornecedoresTratamento),
+}
+
+
+def arquivo_cadastro(pasta, tipo, n, semente=SEMENTE):
+    """Gera (se ainda não existir) o CSV sintético do cadastro e devolve o caminho."""
+    caminho = os.path.join(pasta, f"{tipo}_{n}_{semente}.csv")
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        CADASTROS[tipo][0](n, semente).to_csv(caminho, index=False)
+    return caminho
+
+
+# ---------------------- medição ----------------------
+
+def cronometrar(func, repeticoes):
+    """Roda `func` `repeticoes` vezes; retorna (menor tempo em segundos, último resultado)."""
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        segundos = time.perf_counter() - inicio
+        melhor = segundos if melhor is None else min(melhor, segundos)
+    return melhor, resultado
+
+
+def _registrar(resultados, chave, segundos, linhas):
+    resultados[chave] = {
+        "segundos": round(segundos, 4),
+        "linhas": linhas,
+        "linhas_por_segundo": round(linhas / segundos) if segundos > 0 else None,
+    }
+    print(f"{chave}: {segundos:.3f}s ({linhas} linhas)")
+
+
+def medir_etl(pasta, anos, repeticoes, workers, resultados):
+    """Extract (planilhas → base raw) e transform de receitas e despesas."""
+    dados = gerar_planilhas_etl(os.path.join(pasta, f"etl_{anos}_anos"), anos)
+    saida = tempfile.mkdtemp(prefix="benchmark_etl_")
+    try:
+        for tipo, mod_extract, mod_transform in [
+            ("receitas", extract_receitas, transform_receitas),
+            ("despesas", extract_despesas, transform_despesas),
+        ]:
+            segundos, _ = cronometrar(
+                lambda: mod_extract.executar(
+                    pasta_load=dados, pasta_saida=saida, workers=workers, incremental=False
+                ),
+                repeticoes
+            )
+            raw = ler_base(saida, mod_extract.NOME_SAIDA)
+            _registrar(resultados, f"etl/{anos}_anos/extract_{tipo}", segundos, len(raw))
+
+            # sem memo: mede o motor de regras, não o cache entre execuções
+            segundos, tratada = cronometrar(lambda: mod_transform.transformar(raw.copy()), repeticoes)
+            _registrar(resultados, f"etl/{anos}_anos/transform_{tipo}", segundos, len(tratada))
+    finally:
+        shutil.rmtree(saida, ignore_errors=True)
+
+
+def medir_cadastro(pasta, tipo, n, repeticoes, resultados):
+    """Leitura do CSV, clean_dataframe e exportação (xlsx e csv) de um cadastro."""
+    caminho = arquivo_cadastro(pasta, tipo, n)
+    prefixo = f"cadastro/{tipo}/{n}"
+
+    segundos, df = cronometrar(lambda: pd.read_csv(caminho), repeticoes)
+    _registrar(resultados, f"{prefixo}/ler", segundos, len(df))
+
+    tratador = CADASTROS[tipo][1]()
+    segundos, tratado = cronometrar(lambda: tratador.clean_dataframe(df.copy()), repeticoes)
+    _registrar(resultados, f"{prefixo}/tratar", segundos, len(tratado))
+
+    if n <= MAX_LINHAS_XLSX:
+        destino = os.path.join(tempfile.gettempdir(), f"benchmark_{tipo}_{n}.xlsx")
+        segundos, _ = cronometrar(lambda: export_dataframe(tratado, destino), repeticoes)
+        os.remove(destino)
+        _registrar(resultados, f"{prefixo}/exportar_xlsx", segundos, len(tratado))
+
+    destino = os.path.join(tempfile.gettempdir(), f"benchmark_{tipo}_{n}.csv")
+    segundos, _ = cronometrar(lambda: export_dataframe(tratado, destino), repeticoes)
+    os.remove(destino)
+    _registrar(resultados, f"{prefixo}/exportar_csv", segundos, len(tratado))
+
+
+# ---------------------- resultados e baseline ----------------------
+
+def montar_relatorio(resultados, repeticoes):
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+    }
+
+
+def comparar(resultados, baseline, tolerancia=TOLERANCIA, minimo=MINIMO_SEGUNDOS):
+    """
+    Compara com o baseline. Retorna lista de (chave, base, atual, razão) das
+    medições que ficaram mais lentas que base * (1 + tolerancia) e pelo menos
+    `minimo` segundos acima da base (evita alarme em medições muito curtas).
+    """
+    regressoes = []
+    for chave, atual in resultados.items():
+        base = baseline.get("resultados", {}).get(chave)
+        if base is None:
+            continue
+        razao = atual["segundos"] / base["segundos"] if base["segundos"] else float("inf")
+        print(f"{chave}: {base['segundos']:.3f}s → {atual['segundos']:.3f}s ({razao:.2f}x)")
+        if razao > 1 + tolerancia and atual["segundos"] - base["segundos"] >= minimo:
+            regressoes.append((chave, base["segundos"], atual["segundos"], razao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do ETL de receitas/despesas e dos cadastros.")
+    parser.add_argument("--so", choices=["etl", "cadastro"], help="mede só uma das partes")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="linhas dos cadastros")
+    parser.add_argument("--cadastros", nargs="+", choices=list(CADASTROS), default=list(CADASTROS))
+    parser.add_argument("--anos", type=int, nargs="+", default=ANOS, help="quantidade de planilhas anuais")
+    parser.add_argument("--workers", type=int, default=1, help="processos na extração")
+    parser.add_argument("--repeticoes", type=int, default=3, help="vale o menor tempo")
+    parser.add_argument("--pasta", default=PASTA_DADOS, help="onde ficam os dados sintéticos")
+    parser.add_argument("--saida", help="grava os resultados desta execução em JSON")
+    parser.add_argument("--baseline", default=ARQUIVO_BASELINE)
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava os resultados como novo baseline")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="ex.: 0.2 = até 20%% mais lento")
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    if args.so in (None, "etl"):
+        for anos in args.anos:
+            medir_etl(args.pasta, anos, args.repeticoes, args.workers, resultados)
+    if args.so in (None, "cadastro"):
+        for tipo in args.cadastros:
+            for n in args.tamanhos:
+                medir_cadastro(args.pasta, tipo, n, args.repeticoes, resultados)
+
+    relatorio = montar_relatorio(resultados, args.repeticoes)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    if args.salvar_baseline:
+        # mantém medições do baseline que não foram refeitas nesta execução
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                relatorio["resultados"] = {**json.load(f).get("resultados", {}), **resultados}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"Baseline gravado em: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sem baseline para comparar (rode com --salvar-baseline).")
+        return 0
+
+    print("\nComparação com o baseline:")
+    with open(args.baseline, encoding="utf-8") as f:
+        regressoes = comparar(resultados, json.load(f), args.tolerancia)
+    if regressoes:
+        print("\nREGRESSÕES:")
+        for chave, base, atual, razao in regressoes:
+            print(f"  {chave}: {base:.3f}s → {atual:.3f}s ({razao:.2f}x)")
+        return 1
+    print("Nenhuma regressão.")
+    return 0
+
+
+# o guard é necessário para o ProcessPoolExecutor (spawn no Windows)
+if __name__ == "__main__":
+    raise SystemExit(main())
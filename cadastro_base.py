@@ -0,0 +1,348 @@
+# cadastro_base.py
+# -*- coding: utf-8 -*-
+# Núcleo de limpeza compartilhado por clientes, produtos e fornecedores.
+# As operações trabalham na coluna inteira (.str do pandas) em vez de
+# chamar uma função Python por célula.
+import numpy as np
+import pandas as pd
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # sem pyarrow as mesmas regras rodam com o .str do pandas
+    pa = pc = None
+
+from cadastro_export import export_chunks
+from cadastro_io import DEFAULT_CHUNKSIZE, read_chunks
+
+# ---------------------- Helpers (valor único) ----------------------
+
+def get_numbers_from_string(s):
+    """Extrai apenas os dígitos de uma string. Retorna '' se vazio ou somente zeros."""
+    try:
+        s = str(s)
+    except:
+        return ''
+    texto = ''.join(re.findall(r'\d+', s))
+    if all(caractere == '0' for caractere in texto):
+        return ''
+    return texto
+
+def remover_itens_na_string(s, replacer_mask):
+    """Substitui itens indesejados em uma string conforme replacer_mask dict."""
+    try:
+        s = str(s)
+    except:
+        return ''
+    for item, rep in replacer_mask.items():
+        s = s.replace(item, rep)
+    return s
+
+# nome usado em produtos.py
+remove_items_in_string = remover_itens_na_string
+
+# ---------------------- Helpers (coluna inteira) ----------------------
+
+def on_distinct(texto: pd.Series, func) -> pd.Series:
+    """
+    Aplica `func` (série -> série) só aos valores distintos de uma série de
+    strings e devolve o resultado alinhado às linhas. Cidade, UF, bairro,
+    vazios etc. se repetem muito: cada valor é tratado uma vez só.
+    """
+    codes, uniques = pd.factorize(texto)
+    result = func(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    return pd.Series(result.take(codes), index=texto.index, name=texto.name)
+
+def _digits(texto):
+    digitos = texto.str.replace(r"\D", "", regex=True)
+    return digitos.mask(digitos.str.fullmatch("0*"), "")
+
+def cell_text(serie: pd.Series) -> pd.Series:
+    """
+    Texto de cada célula: vazio (NaN/None/NA) vira '' e número inteiro lido
+    como float perde o '.0' (1310100.0 -> '1310100', e não '13101000' depois
+    de tirar o que não é dígito).
+    """
+    empty = serie.isna().to_numpy()
+    if pd.api.types.is_float_dtype(serie):
+        values = serie.to_numpy(dtype=float)
+        text = serie.astype(str).to_numpy(dtype=object)
+        integral = ~empty & np.isfinite(values) & (values == np.trunc(values))
+        small = integral & (np.abs(values) < 2 ** 63)
+        text[small] = values[small].astype(np.int64).astype(str).tolist()
+        text[integral & ~small] = [str(int(v)) for v in values[integral & ~small]]
+    else:
+        text = serie.astype(object).astype(str).to_numpy(dtype=object)
+    text[empty] = ''
+    return pd.Series(text, index=serie.index, name=serie.name, dtype=object)
+
+def numbers_only(serie: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de get_numbers_from_string: mantém só os dígitos do
+    texto de cada valor; vazio ou somente zeros vira ''.
+    """
+    return on_distinct(serie.astype(str), _digits)
+
+def _replace_all(texto, replacer_mask):
+    # uma chave por vez, na ordem do dicionário, como na versão por célula:
+    # uma remoção pode juntar pedaços que formam a chave seguinte
+    # (ex.: 'NSNAN' -> 'NAN' -> '') e uma regex única não reproduz isso
+    for item, rep in replacer_mask.items():
+        texto = texto.str.replace(item, rep, regex=False)
+    return texto
+
+def remove_items(serie: pd.Series, replacer_mask) -> pd.Series:
+    """Versão vetorizada de remover_itens_na_string."""
+    return on_distinct(serie.astype(str), lambda texto: _replace_all(texto, replacer_mask))
+
+def cache_key(value):
+    """Versão hashable de `value` (dict/list/set aninhados) para usar como chave de cache."""
+    if isinstance(value, dict):
+        # a ordem conta: o replacer_mask é aplicado na ordem do dicionário
+        return tuple((k, cache_key(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(cache_key(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+def apply_mapping(df: pd.DataFrame, rename_map=None, ignored_columns=None) -> pd.DataFrame:
+    """Renomeia as colunas e descarta as ignoradas (etapa 2 das GUIs)."""
+    if rename_map:
+        df = df.rename(columns=rename_map)
+    if ignored_columns:
+        df = df.drop(columns=list(ignored_columns), errors='ignore')
+    return df
+
+# número já sem milhar, com ponto decimal: convertido direto (sem passar pelo Python)
+_SIMPLE_DECIMAL = r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)'
+
+def _to_float(texto):
+    try:
+        return float(texto)
+    except ValueError:
+        return np.nan
+
+def _decimal_values(s, simple):
+    # s: textos já normalizados ('1234.56'); simple: máscara dos que casam com _SIMPLE_DECIMAL
+    values = np.full(len(s), np.nan)
+    values[simple] = s[simple].astype(float)
+    # o que sobrar ('-', '1.2.3', dígitos não ASCII...) segue a regra do float()
+    rest = ~simple & (s != '')
+    values[rest] = [_to_float(v) for v in s[rest]]
+    return values
+
+def _parse_decimal_text(texto):
+    # strip/upper e um teste de 'NAN'/'NONE' não são necessários: espaços e
+    # letras caem na remoção de símbolos e o que sobra vazio vira NaN
+    s = texto.str.replace(r'[^\d,.-]', '', regex=True)
+
+    # com vírgula e ponto, o separador que vem por último é o decimal:
+    # 1.234,56 -> remove os pontos; 1,234.56 -> remove as vírgulas
+    both = s.str.contains(',', regex=False) & s.str.contains('.', regex=False)
+    comma_last = s.str.contains(r',[^.]*$')
+    s = s.mask(both & comma_last, s.str.replace('.', '', regex=False))
+    s = s.mask(both & ~comma_last, s.str.replace(',', '', regex=False))
+    s = s.str.replace(',', '.', regex=False)
+
+    simple = s.str.fullmatch(_SIMPLE_DECIMAL).to_numpy(dtype=bool)
+    return pd.Series(_decimal_values(s.to_numpy(dtype=object), simple), index=texto.index)
+
+def _normalize_decimal_arrow(texto):
+    # as mesmas etapas de _parse_decimal_text com os kernels do pyarrow (RE2:
+    # \p{Nd} equivale ao \d do Python para textos)
+    s = pc.replace_substring_regex(pa.array(texto.to_numpy(), pa.string()), r'[^\p{Nd},.-]', '')
+    both = pc.and_(pc.match_substring(s, ','), pc.match_substring(s, '.'))
+    comma_last = pc.match_substring_regex(s, r',[^.]*$')
+    s = pc.if_else(pc.and_(both, comma_last), pc.replace_substring(s, '.', ''), s)
+    s = pc.if_else(pc.and_(both, pc.invert(comma_last)), pc.replace_substring(s, ',', ''), s)
+    return pc.replace_substring(s, ',', '.')
+
+def _parse_decimal_arrow(texto):
+    s = _normalize_decimal_arrow(texto)
+    simple = pc.match_substring_regex(s, f'^{_SIMPLE_DECIMAL}$')
+    values = pc.cast(pc.if_else(simple, s, pa.scalar(None, pa.string())), pa.float64())
+    values = values.to_numpy(zero_copy_only=False)
+
+    rest = np.flatnonzero(~simple.to_numpy(zero_copy_only=False) & (pc.utf8_length(s).to_numpy() > 0))
+    if len(rest):
+        values[rest] = [_to_float(v) for v in s.take(pa.array(rest)).to_pylist()]
+    return pd.Series(values, index=texto.index)
+
+# até 13 dígitos inteiros e 2 casas o float é exato o bastante para que
+# f'{float(s):.2f}' seja o próprio texto: dá para montar '1234,56' sem float
+_SHORT_DECIMAL = r'^(?P<inteiro>-?(?:0|[1-9][0-9]{0,12}))(?:\.(?P<casas>[0-9]{0,2}))?$'
+
+def _decimal_text_arrow(texto):
+    s = _normalize_decimal_arrow(texto)
+    parts = pc.extract_regex(s, _SHORT_DECIMAL)
+    short = pc.is_valid(parts).to_numpy(zero_copy_only=False)
+    result = pc.binary_join_element_wise(
+        pc.struct_field(parts, 'inteiro'),
+        pc.utf8_rpad(pc.struct_field(parts, 'casas'), width=2, padding='0'),
+        ','
+    ).to_numpy(zero_copy_only=False)
+
+    # o resto passa pelo float e pelo format_decimal
+    rest = np.flatnonzero(~short)
+    if len(rest):
+        outros = pd.Series(s.take(pa.array(rest)).to_numpy(zero_copy_only=False), dtype=object)
+        result[rest] = format_decimal(_parse_decimal_arrow(outros)).to_numpy()
+    return pd.Series(result, index=texto.index, dtype=object)
+
+def parse_decimal(serie: pd.Series) -> pd.Series:
+    """
+    Converte textos decimais em float64, uma vez por valor distinto. Aceita
+    '1.234,56', '1,234.56', 'R$ 10,5'... Vazio, 'NAN', 'NONE' ou texto que
+    não vira número resultam em NaN.
+    """
+    return on_distinct(serie.astype(str), _parse_decimal).astype(float)
+
+def _parse_decimal(texto):
+    return _parse_decimal_text(texto) if pa is None else _parse_decimal_arrow(texto)
+
+def format_decimal(valores: pd.Series) -> pd.Series:
+    """Float -> texto com 2 casas e vírgula (layout ADSNet); NaN vira '0'."""
+    texto = valores.map('{:.2f}'.format).str.replace('.', ',', regex=False)
+    return texto.where(valores.notna(), '0').astype(object)
+
+def decimal_to_text(serie: pd.Series) -> pd.Series:
+    """
+    Decimal no layout ADSNet: parse + format_decimal feitos
+    uma vez por valor distinto ('1.234,56' -> '1234,56'; inválido -> '0').
+    """
+    if pa is None:
+        return on_distinct(serie.astype(str), lambda texto: format_decimal(_parse_decimal_text(texto)))
+    return on_distinct(serie.astype(str), _decimal_text_arrow)
+
+def compose_observation(df: pd.DataFrame, fields, skip_blank=False) -> pd.Series:
+    """
+    Monta a observação de cada linha a partir de pares (rótulo, coluna):
+    'Rótulo: valor' para cada coluna preenchida, separados por quebra de linha.
+    Colunas que não existem no df são ignoradas; NaN conta como vazio.
+    skip_blank: textos só com espaços também contam como vazios.
+    """
+    result = pd.Series('', index=df.index, dtype=object)
+    for label, col in fields:
+        if col not in df.columns:
+            continue
+        text = df[col].fillna('').astype(str)
+        filled = (text.str.strip() if skip_blank else text) != ''
+        part = (label + ': ' + text).where(filled, '')
+        sep = pd.Series(np.where(filled & (result != ''), '\n', ''), index=df.index, dtype=object)
+        result = result + sep + part
+    return result
+
+# ---------------------- Saída compacta ----------------------
+
+# texto em buffer do Arrow (sem um objeto Python por célula); sem pyarrow fica object
+STRING_DTYPE = pd.StringDtype("pyarrow") if pa is not None else None
+
+def compact_frame(df: pd.DataFrame, category_columns=()) -> pd.DataFrame:
+    """
+    Troca as colunas de texto (object) por tipos compactos: category nas de
+    poucos valores distintos (`category_columns`, ex.: uf, cidade) e string
+    do pyarrow nas demais. Os valores continuam os mesmos; colunas numéricas
+    não mudam.
+    """
+    df = df.copy(deep=False)
+    for i, col in enumerate(df.columns):
+        if df.dtypes.iloc[i] != object:
+            continue
+        if col in category_columns:
+            df.isetitem(i, df.iloc[:, i].astype("category"))
+        elif STRING_DTYPE is not None:
+            df.isetitem(i, df.iloc[:, i].astype(STRING_DTYPE))
+    return df
+
+def empty_columns(index, columns, compact=False) -> pd.DataFrame:
+    """
+    DataFrame com as `columns` preenchidas com '', criado de uma vez (um
+    bloco só) em vez de uma atribuição por coluna. compact: cada coluna
+    vira uma category de um valor só (1 byte por linha).
+    """
+    if not compact:
+        return pd.DataFrame('', index=index, columns=columns)
+    return pd.DataFrame({
+        col: pd.Categorical.from_codes(np.zeros(len(index), dtype=np.int8), categories=[''])
+        for col in columns
+    }, index=index)
+
+# ---------------------- Classe base dos tratamentos ----------------------
+
+class TratamentoBase:
+    """
+    Passos comuns do clean_dataframe dos cadastros. As subclasses definem
+    numeric_fields, replacer_mask, uppercase_all e compact no __init__ e
+    category_columns (colunas de saída com poucos valores distintos).
+    """
+
+    compact = False
+    category_columns = ()
+
+    def options_key(self):
+        """Configuração do tratador como chave hashable (cache do preview)."""
+        return type(self).__name__, cache_key(vars(self))
+
+    def normalize_text_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Colunas de texto: str (vazio = ''), caixa alta (se configurado) e remoção do replacer_mask."""
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = on_distinct(cell_text(df[col]), self._normalize_text)
+        return df
+
+    def _normalize_text(self, texto):
+        if self.uppercase_all:
+            texto = texto.str.upper()
+        return _replace_all(texto, self.replacer_mask)
+
+    def extract_numbers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mantém só os dígitos nas colunas de numeric_fields presentes no df."""
+        for col in self.numeric_fields:
+            if col in df.columns:
+                # códigos (CEP, CNPJ, EAN...) sempre como texto, mesmo
+                # que a coluna tenha sido lida como número
+                df[col] = numbers_only(cell_text(df[col]))
+        return df
+
+    def clean_chunks(self, chunks, rename_map=None, ignored_columns=None):
+        """
+        Versão em blocos do clean_dataframe: recebe um iterador de DataFrames
+        (read_csv com chunksize, read_xlsx_chunks...) e gera cada bloco já
+        tratado, sem juntar tudo na memória. rename_map/ignored_columns são o
+        mapeamento da etapa 2 da GUI, aplicado em cada bloco.
+        Os blocos de read_chunks têm o mesmo tipo por coluna (stable_dtypes) e
+        nenhuma coluna é descartada por estar vazia só naquele bloco.
+        """
+        for chunk in chunks:
+            yield self.clean_dataframe(apply_mapping(chunk, rename_map, ignored_columns), drop_empty=False)
+
+    def clean_file(self, in_path, out_path, chunksize=DEFAULT_CHUNKSIZE,
+                   rename_map=None, ignored_columns=None):
+        """
+        Lê `in_path` (.csv/.xlsx) em blocos de `chunksize` linhas, trata e grava
+        em `out_path` (.csv/.xlsx) bloco a bloco. Retorna a lista de arquivos gerados.
+        A memória fica limitada ao tamanho do bloco, não ao do arquivo.
+        """
+        chunks = read_chunks(in_path, chunksize)
+        return export_chunks(self.clean_chunks(chunks, rename_map, ignored_columns), out_path)
+
+    @staticmethod
+    def ensure_columns(df: pd.DataFrame, columns, compact=False) -> pd.DataFrame:
+        """Cria vazias as colunas que faltam (de uma vez) e devolve o df na ordem de `columns`."""
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            df = pd.concat([df, empty_columns(df.index, missing, compact)], axis=1)
+        return df[columns]
+
+    def output_frame(self, df: pd.DataFrame, columns) -> pd.DataFrame:
+        """
+        Último passo do clean_dataframe: colunas finais na ordem de `columns`.
+        Com compact, o texto sai em tipos compactos (ver compact_frame).
+        """
+        if not self.compact:
+            return self.ensure_columns(df, columns)
+        # converte só o que vai para a saída
+        df = compact_frame(df.loc[:, df.columns.isin(columns)], self.category_columns)
+        return self.ensure_columns(df, columns, compact=True)
@@ -0,0 +1,224 @@
+# cadastro_cli.py
+# -*- coding: utf-8 -*-
+# Tratamento dos cadastros em lote, sem interface gráfica: trata todos os
+# arquivos de uma pasta (ou glob) com um perfil de mapeamento/opções salvo,
+# vários arquivos ao mesmo tempo em processos separados. Não importa o
+# tkinter, então sobe rápido em servidor.
+#
+#   python cadastro_cli.py clientes planilhas/ --perfil perfil.json --saida tratados
+#   python cadastro_cli.py produtos "entrada/*.xlsx" --formato adsnet --workers 4
+#
+# Perfil (JSON, todas as chaves opcionais):
+#   {"rename_map": {"coluna original": "coluna final", ...},
+#    "ignored_columns": ["coluna", ...],
+#    "options": {...parâmetros do Tratamento, ex.: "decimal_fields": [...]}}
+# Sem rename_map vale o mapeamento automático da GUI do cadastro (máscara
+# sugerida; em fornecedores, o nome da coluna final contido no da original).
+# Sem --perfil, cada arquivo usa o perfil salvo pelas GUIs para o seu
+# cabeçalho (cadastro_perfis) ou, se não houver, o mapeamento automático.
+import argparse
+import glob
+import json
+import os
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cadastro_clientes import SUGGESTED_MASK, ClientesTratamento
+from cadastro_export import EXPORT_FORMATS, ChunkWriter, parse_split_rows
+from cadastro_fornecedores import FornecedoresTratamento, match_final_columns
+from cadastro_io import DEFAULT_CHUNKSIZE, read_chunks
+from cadastro_perfis import PROFILES_FILE, ProfileStore
+from cadastro_produtos import MASCARA_FIXA, ProdutosTratamento
+
+INPUT_EXTENSIONS = (".xlsx", ".xls", ".csv")
+
+def _mask_mapping(mask):
+    return lambda columns: {col: mask[col] for col in columns if col in mask}
+
+# tipo -> (classe de tratamento, mapeamento automático da GUI: colunas -> rename_map)
+CADASTROS = {
+    "clientes": (ClientesTratamento, _mask_mapping(SUGGESTED_MASK)),
+    "produtos": (ProdutosTratamento, _mask_mapping(MASCARA_FIXA)),
+    "fornecedores": (FornecedoresTratamento, match_final_columns),
+}
+
+# ---------------------- Entradas / perfil ----------------------
+
+def list_inputs(entries):
+    """
+    Arquivos a tratar: cada entrada pode ser uma pasta (todos os
+    .xlsx/.xls/.csv dela), um glob ou um arquivo. Temporários ~$ do Excel
+    e repetidos ficam de fora; a ordem é a das entradas.
+    """
+    paths = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            found = [os.path.join(entry, f) for f in sorted(os.listdir(entry))]
+        elif glob.has_magic(entry):
+            found = sorted(glob.glob(entry))
+        else:
+            found = [entry]
+        for path in found:
+            name = os.path.basename(path)
+            if name.startswith("~$") or not name.lower().endswith(INPUT_EXTENSIONS):
+                continue
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+def load_profile(path):
+    """Lê o perfil JSON (mapeamento + opções); sem arquivo, perfil vazio."""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    unknown = set(profile) - {"rename_map", "ignored_columns", "options"}
+    if unknown:
+        raise ValueError(f"Chaves desconhecidas no perfil: {', '.join(sorted(unknown))}")
+    return profile
+
+def output_path(in_path, out_dir, tipo, fmt):
+    """<saida>/<nome> - Clientes Tratado.xlsx (mesmo padrão do nome sugerido nas GUIs)."""
+    stem = os.path.splitext(os.path.basename(in_path))[0]
+    return os.path.join(out_dir, f"{stem} - {tipo.capitalize()} Tratado{EXPORT_FORMATS[fmt][0]}")
+
+# ---------------------- Tratamento de um arquivo ----------------------
+
+def _profile_for(tipo, columns, store, require_profile):
+    # perfil salvo para este cabeçalho; sem ele, o mapeamento automático:
+    # apelidos conhecidos e, para as outras colunas, o mesmo da GUI
+    profile = store.get(tipo, columns)
+    if profile is None:
+        if require_profile:
+            raise ValueError("Nenhum perfil salvo para o cabeçalho deste arquivo.")
+        profile = store.resolve(tipo, columns)
+        known = set(profile["rename_map"]) | set(profile["ignored_columns"])
+        automatic = CADASTROS[tipo][1]([col for col in columns if col not in known])
+        profile["rename_map"] = {**automatic, **profile["rename_map"]}
+    return profile
+
+def clean_file(tipo, in_path, out_path, profile, fmt, chunksize=DEFAULT_CHUNKSIZE, split_rows=None,
+               store=None, require_profile=False):
+    """
+    Trata um arquivo em blocos e grava a saída; roda dentro do processo do
+    pool (por isso é função de módulo e recebe só dados simples).
+    profile None: escolhido pelo cabeçalho do arquivo no `store` (ProfileStore);
+    com require_profile, arquivo sem perfil salvo é erro.
+    Retorna (arquivos gerados, linhas gravadas).
+    """
+    # o cabeçalho vem do primeiro bloco (perfil salvo / mapeamento automático)
+    raw = read_chunks(in_path, chunksize)
+    first = next(raw, None)
+    columns = [] if first is None else list(first.columns)
+    raw = itertools.chain([] if first is None else [first], raw)
+    if profile is None:
+        profile = _profile_for(tipo, columns, store, require_profile)
+
+    cls, automatic_mapping = CADASTROS[tipo]
+    tratador = cls(**profile.get("options", {}))
+    rename_map = profile.get("rename_map")
+    if rename_map is None:
+        rename_map = automatic_mapping(columns)
+    ignored = profile.get("ignored_columns")
+
+    chunks = tratador.clean_chunks(raw, rename_map, ignored)
+    with ChunkWriter(out_path, fmt, split_rows) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer.paths, writer.rows
+
+def run_batch(tipo, jobs, profile, fmt, chunksize=DEFAULT_CHUNKSIZE, split_rows=None, workers=1,
+              store=None, require_profile=False):
+    """
+    Trata os pares (entrada, saída) de `jobs`; um arquivo com erro não
+    interrompe os outros. Gera (entrada, resultado ou exceção, segundos)
+    na ordem em que os arquivos terminam.
+    workers: nº de processos (1 = tudo no processo atual, em série).
+    """
+    workers = min(workers or 1, len(jobs))
+    if workers <= 1:
+        for in_path, out_path in jobs:
+            start = time.perf_counter()
+            try:
+                result = clean_file(tipo, in_path, out_path, profile, fmt, chunksize, split_rows,
+                                    store, require_profile)
+            except Exception as e:
+                result = e
+            yield in_path, result, time.perf_counter() - start
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        futures = {
+            pool.submit(clean_file, tipo, in_path, out_path, profile, fmt, chunksize, split_rows,
+                        store, require_profile): in_path
+            for in_path, out_path in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            # com vários processos o tempo é desde o início do lote
+            yield futures[future], result, time.perf_counter() - start
+
+# ---------------------- Linha de comando ----------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trata cadastros em lote (sem interface gráfica).")
+    parser.add_argument("tipo", choices=list(CADASTROS), help="cadastro a tratar")
+    parser.add_argument("entradas", nargs="+", help="pastas, globs ou arquivos .xlsx/.xls/.csv")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="JSON com rename_map, ignored_columns e options")
+    parser.add_argument("--perfis", metavar="ARQUIVO", default=PROFILES_FILE,
+                        help="perfis salvos pelas GUIs (usados sem --perfil)")
+    parser.add_argument("--exigir-perfil", action="store_true",
+                        help="sem --perfil, arquivo sem perfil salvo para o cabeçalho é erro")
+    parser.add_argument("--saida", default="tratados", help="pasta dos arquivos tratados")
+    parser.add_argument("--formato", choices=list(EXPORT_FORMATS), default="xlsx")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos (1 = serial)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="linhas lidas por bloco")
+    parser.add_argument("--dividir", default="", metavar="N", help="no máximo N linhas por arquivo de saída")
+    args = parser.parse_args(argv)
+
+    try:
+        profile = load_profile(args.perfil) if args.perfil else None
+        store = None if args.perfil else ProfileStore(args.perfis)
+        split_rows = parse_split_rows(args.dividir)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    inputs = list_inputs(args.entradas)
+    if not inputs:
+        parser.error("Nenhum arquivo .xlsx/.xls/.csv encontrado nas entradas.")
+
+    jobs = [(path, output_path(path, args.saida, args.tipo, args.formato)) for path in inputs]
+    # dois arquivos com o mesmo nome (ex.: a.csv e a.xlsx) iriam para a mesma saída
+    seen = {}
+    for in_path, out_path in jobs:
+        if out_path in seen:
+            parser.error(f"{seen[out_path]} e {in_path} gerariam o mesmo arquivo: {out_path}")
+        seen[out_path] = in_path
+    os.makedirs(args.saida, exist_ok=True)
+
+    failures = 0
+    total_rows = 0
+    for in_path, result, seconds in run_batch(args.tipo, jobs, profile, args.formato,
+                                              args.chunksize, split_rows, args.workers,
+                                              store, args.exigir_perfil):
+        if isinstance(result, Exception):
+            failures += 1
+            print(f"ERRO  {in_path}: {result}")
+            continue
+        paths, rows = result
+        total_rows += rows
+        parts = f" (+{len(paths) - 1} partes)" if len(paths) > 1 else ""
+        print(f"OK    {in_path} -> {paths[0]}{parts} ({rows} linhas, {seconds:.1f}s)")
+
+    print(f"{len(jobs) - failures} de {len(jobs)} arquivos tratados ({total_rows} linhas).")
+    return 1 if failures else 0
+
+
+# o guard é necessário para o ProcessPoolExecutor (spawn no Windows)
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+# cadastro_clientes.py
+# -*- coding: utf-8 -*-
+# Tratamento dos dados de clientes, sem interface gráfica: usado pela GUI
+# (clientes.py) e pelo processamento em lote (cadastro_cli.py).
+import pandas as pd
+
+# ---------------------- Helpers / Tratamento de dados ----------------------
+
+from cadastro_base import TratamentoBase, compose_observation, get_numbers_from_string, remover_itens_na_string
+
+# máscara padrão sugerida (ajustável)
+SUGGESTED_MASK = {
+    'Nome/Razão Social': "nome",
+    'CPF/CNPJ': 'cnpj_cpf',
+    'Nome Fantasia': 'fantasia',
+    'Inscrição Estadual': "ie",
+    'Logradouro': "endereco",
+    'Número': 'numero',
+    'Complemento': 'complemento',
+    'CEP': 'cep',
+    'Bairro': 'bairro',
+    'Cidade': 'cidade',
+    'Estado': 'uf',
+    'Telefone': "fone",
+    'E-mail': 'email',
+    'Funcionário': 'ncompr'
+}
+
+# colunas finais desejadas (ordem)
+FINAL_COLUMNS = [
+    'cliente_id', 'cnpj_cpf', 'cpf', 'ie', 'nome', 'fantasia', 'fone', 'endereco', 'numero',
+    'bairro', 'cidade', 'ibge', 'uf', 'cep', 'email', 'email_danfe', 'classe_id', 'repr_id',
+    'fone2', 'complemento', 'ncompr', 'rota_id', 'rota', 'consumidor_final', 'Observacao'
+]
+
+# (rótulo, coluna) que compõem a Observacao, na ordem em que aparecem
+OBSERVATION_FIELDS = [
+    ('Canal', 'canal'),
+    ('IE/RG', 'ie'),
+    ('Ponto de Referência', 'ponto_referencia'),
+]
+
+# ---------------------- Classe de processamento (sem GUI) ----------------------
+
+class ClientesTratamento(TratamentoBase):
+    """
+    Classe com métodos de transformação dos dados de clientes.
+    """
+
+    category_columns = ('cidade', 'uf')
+
+    def __init__(self,
+                 numeric_fields=None,
+                 replacer_mask=None,
+                 uppercase_all=True,
+                 observation_fields=None,
+                 compact=True):
+        """
+        numeric_fields: lista de colunas que serão tratadas com get_numbers_from_string
+        replacer_mask: dicionário para remover itens indesejados em strings
+        uppercase_all: se True, transforma colunas de texto em caixa alta
+        observation_fields: pares (rótulo, coluna) da Observacao (padrão OBSERVATION_FIELDS)
+        compact: se True, a saída usa string do pyarrow/category em vez de object
+        """
+        # conforme confirmação do usuário
+        if numeric_fields is None:
+            numeric_fields = ['cnpj_cpf','cpf','cep','fone','fone2','ie','cliente_id','ibge']
+        self.numeric_fields = numeric_fields
+
+        if replacer_mask is None:
+            replacer_mask = {'S/N': '', 'SN': '', 'NAN': '', "'": ''}
+        self.replacer_mask = replacer_mask
+
+        self.uppercase_all = uppercase_all
+        self.observation_fields = observation_fields or OBSERVATION_FIELDS
+        self.compact = compact
+
+    def clean_dataframe(self, df: pd.DataFrame, drop_empty=True) -> pd.DataFrame:
+        """
+        Aplica limpeza geral: remove colunas vazias, normaliza textos, aplica remover_itens_na_string e get_numbers...
+        Retorna dataframe reordenado com FINAL_COLUMNS.
+        drop_empty=False mantém as colunas vazias (blocos do clean_chunks).
+        """
+        # remover colunas totalmente vazias
+        df = df.dropna(axis=1, how='all').copy() if drop_empty else df.copy()
+
+        # textos em string, caixa alta se configurado e sem os itens indesejados
+        df = self.normalize_text_columns(df)
+
+        # aplicar extração de números nas colunas configuradas
+        df = self.extract_numbers(df)
+
+        # criar Observacao se existirem canal/ie/ponto_referencia (compat com notebook)
+        if any(col in df.columns for _, col in self.observation_fields):
+            df['Observacao'] = compose_observation(df, self.observation_fields)
+
+        # Garantir todas as colunas finais estão presentes, na ordem desejada
+        return self.output_frame(df, FINAL_COLUMNS)
@@ -0,0 +1,298 @@
+# cadastro_export.py
+# -*- coding: utf-8 -*-
+# Exportação dos cadastros tratados para importação no ERP. Os formatos são
+# plugáveis (EXPORT_FORMATS): xlsx em modo write-only (memória constante),
+# csv e o layout de texto do ADSNet. A saída pode ser dividida em vários
+# arquivos de N linhas e o progresso é avisado a cada bloco gravado.
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+# linhas gravadas por vez: limita a memória das listas de linhas e define
+# de quanto em quanto tempo o progresso é avisado
+EXPORT_BLOCK = 10_000
+
+# ---------------------- Formatos ----------------------
+
+def _rows(df: pd.DataFrame):
+    # cada coluna vira lista Python de uma vez (NaN/NA -> None) e as linhas
+    # saem do zip: bem mais rápido que itertuples + isna por célula em
+    # string do pyarrow/category, e igual para object
+    columns = []
+    for i in range(df.shape[1]):
+        serie = df.iloc[:, i]
+        columns.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return zip(*columns)
+
+class XlsxExporter:
+    """
+    Planilha .xlsx com o openpyxl em modo write-only: as linhas vão sendo
+    descarregadas em disco, a memória não cresce com o tamanho do arquivo.
+    NaN/None viram célula vazia, como no to_excel.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Sheet1")
+        self._ws.append(list(columns))
+
+    def write(self, df: pd.DataFrame):
+        for row in _rows(df):
+            self._ws.append(row)
+
+    def close(self):
+        if self._wb is not None:
+            self._wb.save(self.path)
+            self._wb = None
+
+class CsvExporter:
+    """CSV (utf-8, separador ',') com o cabeçalho na primeira linha."""
+
+    sep = ","
+    encoding = "utf-8"
+    decimal = "."
+    lineterminator = "\n"
+
+    def __init__(self, path, columns):
+        self.path = path
+        self._file = open(path, "w", encoding=self.encoding, errors="strict", newline="")
+        self._to_csv(pd.DataFrame(columns=list(columns)), header=True)
+
+    def write(self, df: pd.DataFrame):
+        self._to_csv(df, header=False)
+
+    def _to_csv(self, df, header):
+        df.to_csv(self._file, header=header, index=False, sep=self.sep,
+                  decimal=self.decimal, lineterminator=self.lineterminator)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def adsnet_layouts():
+    """Colunas aceitas pelo layout ADSNet: as FINAL_COLUMNS* de cada cadastro."""
+    # import tardio: os módulos de cadastro importam cadastro_base, que importa este
+    from cadastro_clientes import FINAL_COLUMNS
+    from cadastro_fornecedores import FINAL_COLUMNS_FORNECEDORES
+    from cadastro_produtos import FINAL_COLUMNS_ADSNET
+    return [FINAL_COLUMNS, FINAL_COLUMNS_FORNECEDORES, FINAL_COLUMNS_ADSNET]
+
+def _adsnet_columns(columns):
+    # as colunas de um dos layouts, em qualquer ordem: saem na ordem do layout
+    columns = list(columns)
+    if not columns:
+        return columns
+    for layout in adsnet_layouts():
+        if sorted(columns) == sorted(layout):
+            return list(layout)
+    raise ValueError("As colunas não correspondem a nenhum layout ADSNet (FINAL_COLUMNS* dos cadastros).")
+
+class AdsnetExporter(CsvExporter):
+    """
+    Layout de texto para a importação do ADSNet: colunas na ordem das listas
+    FINAL_COLUMNS* (reordenadas se vierem em outra ordem; colunas diferentes
+    são erro), separador ';', decimal com vírgula, cp1252 e fim de linha CRLF
+    (padrão dos importadores Windows). Texto com caractere fora do cp1252 é
+    erro com a linha e a coluna, em vez de sair trocado por '?'.
+    """
+
+    sep = ";"
+    encoding = "cp1252"
+    decimal = ","
+    lineterminator = "\r\n"
+
+    def __init__(self, path, columns):
+        self.columns = _adsnet_columns(columns)
+        self.rows = 0
+        super().__init__(path, self.columns)
+
+    def write(self, df: pd.DataFrame):
+        df = df[self.columns]
+        self._check_encoding(df)
+        super().write(df)
+        self.rows += len(df)
+
+    def _check_encoding(self, df):
+        # só os valores distintos das colunas de texto são testados
+        for i, col in enumerate(df.columns):
+            serie = df.iloc[:, i]
+            if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+                continue
+            texts = pd.unique(serie.dropna().astype(str))
+            try:
+                "".join(texts).encode(self.encoding)
+            except UnicodeEncodeError:
+                self._encoding_error(serie, col, texts)
+
+    def _encoding_error(self, serie, col, texts):
+        for text in texts:
+            try:
+                text.encode(self.encoding)
+            except UnicodeEncodeError as exc:
+                position = (serie.astype(str) == text).to_numpy(dtype=bool) & serie.notna().to_numpy()
+                # linha do arquivo: a 1 é o cabeçalho
+                line = self.rows + int(position.argmax()) + 2
+                raise ValueError(
+                    f"Linha {line}, coluna '{col}': o caractere {text[exc.start]!r} de {text!r} "
+                    f"não existe no {self.encoding}."
+                ) from None
+
+# formato -> (extensão, classe exportadora)
+EXPORT_FORMATS = {
+    "xlsx": (".xlsx", XlsxExporter),
+    "csv": (".csv", CsvExporter),
+    "adsnet": (".txt", AdsnetExporter),
+}
+
+# tipos de arquivo para o asksaveasfilename das GUIs
+EXPORT_FILETYPES = [
+    ("Excel Files", "*.xlsx"),
+    ("CSV Files", "*.csv"),
+    ("ADSNet (texto)", "*.txt"),
+]
+
+def format_from_path(path):
+    """Formato de exportação pela extensão do arquivo."""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, (extension, _) in EXPORT_FORMATS.items():
+        if ext == extension:
+            return fmt
+    raise ValueError(f"Formato de arquivo não suportado: {path}")
+
+def part_path(path, number):
+    """Nome da parte `number` de uma saída dividida: clientes.xlsx -> clientes_002.xlsx."""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{number:03d}{ext}"
+
+def parse_split_rows(text):
+    """Campo 'dividir a cada N linhas' das GUIs: vazio/0 = arquivo único."""
+    text = str(text).strip().replace(".", "")
+    if not text:
+        return None
+    rows = int(text)
+    if rows < 0:
+        raise ValueError("O número de linhas por arquivo não pode ser negativo.")
+    return rows or None
+
+def progress_text(rows, total=None):
+    """Texto de progresso para as GUIs: 'Gravando... 10.000 de 100.000 linhas'."""
+    text = f"Gravando... {rows:,}" + (f" de {total:,}" if total else "") + " linhas"
+    return text.replace(",", ".")
+
+# ---------------------- Gravação em blocos ----------------------
+
+class ChunkWriter:
+    """
+    Grava blocos de um mesmo DataFrame em sequência, no formato `fmt` (pela
+    extensão de `path` se não informado). O cabeçalho sai uma vez por arquivo.
+    split_rows: no máximo N linhas por arquivo (nome_001.xlsx, nome_002.xlsx...);
+    se tudo couber em um arquivo só, ele fica com o nome de `path`.
+    progress(linhas_gravadas, total): chamado a cada bloco gravado (total pode
+    ser None quando não se sabe o tamanho de antemão).
+    As partes são gravadas com nome temporário e só trocadas no close(): um
+    arquivo pela metade nunca fica no lugar do final. Em caso de erro dentro
+    do with, os temporários são apagados.
+    Uso: with ChunkWriter(path) as writer: writer.write(df)
+    """
+
+    def __init__(self, path, fmt=None, split_rows=None, progress=None, total=None):
+        self.path = path
+        self.fmt = fmt or format_from_path(path)
+        self.split_rows = split_rows
+        self.progress = progress
+        self.total = total
+        self.rows = 0
+        self.paths = []
+        self._columns = None
+        self._exporter = None
+        self._part_rows = 0
+        self._tmp_paths = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def write(self, df: pd.DataFrame):
+        if self._columns is None:
+            self._columns = list(df.columns)
+            self._next_part()
+        elif list(df.columns) != self._columns:
+            raise ValueError("Bloco com colunas diferentes do primeiro bloco.")
+
+        start = 0
+        while start < len(df):
+            if self.split_rows and self._part_rows >= self.split_rows:
+                self._next_part()
+            stop = min(len(df), start + EXPORT_BLOCK)
+            if self.split_rows:
+                stop = min(stop, start + self.split_rows - self._part_rows)
+            self._exporter.write(df.iloc[start:stop])
+            self._part_rows += stop - start
+            self.rows += stop - start
+            start = stop
+            if self.progress is not None:
+                self.progress(self.rows, self.total)
+
+    def _next_part(self):
+        if self._exporter is not None:
+            self._exporter.close()
+        tmp_path = f"{self.path}.tmp{len(self._tmp_paths) + 1}{EXPORT_FORMATS[self.fmt][0]}"
+        self._tmp_paths.append(tmp_path)
+        self._exporter = EXPORT_FORMATS[self.fmt][1](tmp_path, self._columns)
+        self._part_rows = 0
+
+    def close(self):
+        if not self._tmp_paths and self.paths:
+            return  # já fechado
+        if self._columns is None:
+            # nenhum bloco: grava o arquivo vazio
+            self._columns = []
+            self._next_part()
+        self._exporter.close()
+        self._exporter = None
+
+        if len(self._tmp_paths) == 1:
+            finals = [self.path]
+        else:
+            finals = [part_path(self.path, i + 1) for i in range(len(self._tmp_paths))]
+        for tmp_path, final in zip(self._tmp_paths, finals):
+            os.replace(tmp_path, final)
+        self._tmp_paths = []
+        self.paths = finals
+
+    def abort(self):
+        """Descarta o que foi gravado até aqui (apaga os temporários)."""
+        try:
+            if self._exporter is not None:
+                self._exporter.close()
+        finally:
+            self._exporter = None
+            for tmp_path in self._tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._tmp_paths = []
+
+def export_chunks(chunks, path, fmt=None, split_rows=None, progress=None, total=None):
+    """Como export_dataframe, para um iterador de blocos (ex.: clean_chunks)."""
+    with ChunkWriter(path, fmt, split_rows, progress, total) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer.paths
+
+def export_dataframe(df: pd.DataFrame, path, fmt=None, split_rows=None, progress=None):
+    """
+    Grava o cadastro tratado para importação no ERP (substitui o to_excel
+    das GUIs). Retorna a lista de arquivos gerados (mais de um com split_rows).
+    """
+    with ChunkWriter(path, fmt, split_rows, progress, total=len(df)) as writer:
+        writer.write(df)
+    return writer.paths
@@ -0,0 +1,89 @@
+# cadastro_fornecedores.py
+# -*- coding: utf-8 -*-
+# Tratamento dos dados de fornecedores, sem interface gráfica: usado pela
+# GUI (fornecedores.py) e pelo processamento em lote (cadastro_cli.py).
+import pandas as pd
+
+# ---------------------- Helpers ----------------------
+
+from cadastro_base import TratamentoBase, compose_observation, get_numbers_from_string, remover_itens_na_string
+
+
+# ---------------------- MÁSCARA PADRÃO ----------------------
+
+DEFAULT_REPLACER_MASK = {
+    "S/N": "",
+    "SN": "",
+    "NAN": "",
+    "'": ""
+}
+
+FINAL_COLUMNS_FORNECEDORES = [
+    "fornecedor_id", "cnpj_cpf", "ie", "razao", "fantasia", "fone", "fone2", "email",
+    "email_nfe", "endereco", "numero", "complemento", "bairro",
+    "cidade", "uf", "cep", "ibge", "contato", "observacao"
+]
+
+# (rótulo, coluna) que compõem a observação, na ordem em que aparecem
+OBSERVATION_FIELDS = [
+    ("Contato", "contato"),
+    ("IE/RG", "ie"),
+]
+
+
+def match_final_columns(columns):
+    """
+    Mapeamento automático da etapa 2 (GUI e lote): cada coluna vai para a
+    coluna final cujo nome aparece no dela (sem diferenciar maiúsculas); com
+    mais de uma, vale a de nome mais longo ('Email_NFe' -> 'email_nfe', não
+    'email'). Colunas sem correspondência ficam fora do mapeamento.
+    """
+    mapping = {}
+    for col in columns:
+        found = [final for final in FINAL_COLUMNS_FORNECEDORES if final.lower() in str(col).lower()]
+        if found:
+            mapping[col] = max(found, key=len)
+    return mapping
+
+
+# ---------------------- Classe de Tratamento ----------------------
+
+class FornecedoresTratamento(TratamentoBase):
+
+    category_columns = ("cidade", "uf")
+
+    def __init__(self,
+                 numeric_fields=None,
+                 replacer_mask=None,
+                 uppercase_all=True,
+                 observation_fields=None,
+                 compact=True):
+
+        if numeric_fields is None:
+            numeric_fields = [
+                "cnpj_cpf", "cep", "fone", "fone2", "ie", "ibge", "fornecedor_id"
+            ]
+
+        self.numeric_fields = numeric_fields
+        self.replacer_mask = replacer_mask or DEFAULT_REPLACER_MASK.copy()
+        self.uppercase_all = uppercase_all
+        self.observation_fields = observation_fields or OBSERVATION_FIELDS
+        self.compact = compact
+
+    def clean_dataframe(self, df: pd.DataFrame, drop_empty=True) -> pd.DataFrame:
+
+        # drop_empty=False mantém as colunas vazias (blocos do clean_chunks)
+        df = df.dropna(axis=1, how="all").copy() if drop_empty else df.copy()
+
+        # padronizar texto
+        df = self.normalize_text_columns(df)
+
+        # aplicar extração numérica
+        df = self.extract_numbers(df)
+
+        # gerar OBSERVAÇÃO final a partir de campos importantes
+        # (texto só com espaços conta como vazio)
+        df["observacao"] = compose_observation(df, self.observation_fields, skip_blank=True)
+
+        # garantir todas as colunas finais
+        return self.output_frame(df, FINAL_COLUMNS_FORNECEDORES)
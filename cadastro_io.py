@@ -0,0 +1,153 @@
+# cadastro_io.py
+# -*- coding: utf-8 -*-
+# Leitura em blocos (chunks) das planilhas de cadastro, para tratar arquivos
+# com milhões de linhas sem carregá-los inteiros na memória. A gravação em
+# blocos fica em cadastro_export.
+import math
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from valores_na import VALORES_NA
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# ---------------------- Leitura em blocos ----------------------
+
+def _convert_cell(value):
+    # mesmo tratamento do pd.read_excel: vazio e os textos de VALORES_NA
+    # viram NaN e números inteiros gravados como float voltam a ser int
+    if value is None or (isinstance(value, str) and value in VALORES_NA):
+        return math.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _frame_from_rows(rows, columns):
+    df = pd.DataFrame(rows, columns=columns)
+    # colunas só de números viram int/float, como no read_excel
+    # (o tipo final de cada coluna é fixado depois, em stable_dtypes)
+    return df.infer_objects()
+
+def read_xlsx_chunks(path, chunksize=DEFAULT_CHUNKSIZE, sheet_name=None):
+    """
+    Lê a planilha (primeira aba ou `sheet_name`) em blocos de `chunksize`
+    linhas com o openpyxl em modo read-only. A primeira linha é o cabeçalho.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {i}" if c is None else str(c) for i, c in enumerate(header)]
+
+        batch = []
+        empty = True
+        for row in rows:
+            row = [_convert_cell(v) for v in row[:len(columns)]]
+            row += [math.nan] * (len(columns) - len(row))
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield _frame_from_rows(batch, columns)
+                batch = []
+                empty = False
+        if batch or empty:
+            # só cabeçalho: um bloco vazio com as colunas, como o read_csv
+            yield _frame_from_rows(batch, columns)
+    finally:
+        wb.close()
+
+def _slices(df, chunksize):
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+# ---------------------- Tipos estáveis entre blocos ----------------------
+
+def _integral(values):
+    return bool(np.all(np.isfinite(values) & (values == np.trunc(values))))
+
+def _column_kind(serie):
+    """'int', 'float' ou 'text' pelos valores da coluna; None se só tem vazios."""
+    values = serie.dropna()
+    if values.empty:
+        return None
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == "integer":
+        return "int"
+    if inferred in ("floating", "mixed-integer-float"):
+        return "int" if _integral(values.to_numpy(dtype=float)) else "float"
+    if inferred in ("string", "mixed", "mixed-integer", "bytes"):
+        return "text"
+    # datas, booleanos etc. ficam com o tipo que o leitor deu
+    return "other"
+
+def _as_text(serie):
+    # object com os valores originais; inteiro que veio como float (por causa
+    # de um vazio no bloco) volta a ser int, para não virar '1310100.0'
+    values = serie.to_numpy(dtype=object)
+    if pd.api.types.is_float_dtype(serie):
+        numbers = serie.to_numpy(dtype=float)
+        integral = np.isfinite(numbers) & (numbers == np.trunc(numbers)) & (np.abs(numbers) < 2 ** 63)
+        values[integral] = numbers[integral].astype(np.int64).tolist()
+    return pd.Series(values, index=serie.index, name=serie.name, dtype=object)
+
+def _as_kind(serie, kind):
+    if kind in ("int", "float"):
+        try:
+            numbers = pd.to_numeric(serie)
+        except (ValueError, TypeError):
+            # texto numa coluna fixada como número: o bloco fica com o texto
+            return _as_text(serie)
+        if kind == "int" and _integral(numbers.dropna().to_numpy(dtype=float)):
+            return numbers.astype("Int64")
+        return numbers.astype(float)
+    if kind == "text" or kind is None:
+        return _as_text(serie)
+    return serie
+
+def stable_dtypes(chunks):
+    """
+    Fixa o tipo de cada coluna no primeiro bloco em que ela tem valor e
+    converte os blocos seguintes para ele: número inteiro sai Int64 (aceita
+    vazio, então um bloco com vazio não vira float), número com casas
+    decimais float e coluna com algum texto ('S/N' no numero) sai texto em
+    todos os blocos. Só um bloco que traga texto numa coluna já fixada como
+    número sai com o texto (não há como voltar nos blocos já entregues).
+    """
+    kinds = {}
+    for chunk in chunks:
+        chunk = chunk.copy()
+        for i, col in enumerate(chunk.columns):
+            if kinds.get(col) is None:
+                kinds[col] = _column_kind(chunk.iloc[:, i])
+            chunk.isetitem(i, _as_kind(chunk.iloc[:, i], kinds[col]))
+        yield chunk
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Iterador de DataFrames com `chunksize` linhas cada (.csv, .xlsx ou .xls),
+    com o tipo de cada coluna igual em todos os blocos (ver stable_dtypes).
+    """
+    if path.lower().endswith(".csv"):
+        chunks = pd.read_csv(path, chunksize=chunksize)
+    elif path.lower().endswith(".xls"):
+        # o openpyxl não lê .xls: lido inteiro pelo pandas e entregue em fatias
+        chunks = _slices(pd.read_excel(path), chunksize)
+    else:
+        chunks = read_xlsx_chunks(path, chunksize)
+    return stable_dtypes(chunks)
+
+def read_sample(path, nrows):
+    """Só as primeiras `nrows` linhas do arquivo (cabeçalho incluído)."""
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, nrows=nrows)
+    if path.lower().endswith(".xls"):
+        return pd.read_excel(path, nrows=nrows)
+    chunks = read_xlsx_chunks(path, nrows)
+    try:
+        return next(chunks, pd.DataFrame())
+    finally:
+        chunks.close()
@@ -0,0 +1,177 @@
+# cadastro_perfis.py
+# -*- coding: utf-8 -*-
+# Perfis de mapeamento de colunas (etapa 2 das GUIs) salvos em disco. Cada
+# perfil é guardado pela "impressão digital" do cabeçalho do arquivo de
+# origem: a mesma exportação, no mês seguinte, já vem mapeada. Para
+# cabeçalhos novos, os nomes são comparados sem acento/maiúsculas com um
+# índice de apelidos conhecidos (máscaras padrão + perfis já salvos).
+import difflib
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime
+
+from cadastro_clientes import FINAL_COLUMNS, SUGGESTED_MASK
+from cadastro_fornecedores import FINAL_COLUMNS_FORNECEDORES
+from cadastro_produtos import FINAL_COLUMNS_ADSNET, MASCARA_FIXA
+
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cadastro_perfis.json")
+
+# semelhança mínima (difflib) para aceitar um cabeçalho parecido com um apelido
+FUZZY_CUTOFF = 0.85
+
+# tipo -> (máscara padrão, colunas finais): apelidos iniciais de cada cadastro
+DEFAULT_ALIASES = {
+    "clientes": (SUGGESTED_MASK, FINAL_COLUMNS),
+    "produtos": (MASCARA_FIXA, FINAL_COLUMNS_ADSNET),
+    "fornecedores": ({}, FINAL_COLUMNS_FORNECEDORES),
+}
+
+# ---------------------- Normalização / impressão digital ----------------------
+
+def normalize_header(name):
+    """'Inscrição  Estadual' / 'INSCRICAO_ESTADUAL' -> 'inscricao estadual'."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return " ".join(re.split(r"[^0-9a-z]+", text)).strip()
+
+def _token_key(normalized):
+    # mesmas palavras em outra ordem: 'razao social nome' == 'nome razao social'
+    return " ".join(sorted(normalized.split()))
+
+def header_fingerprint(columns):
+    """Identifica o layout do arquivo: cabeçalhos normalizados, na ordem."""
+    text = "\n".join(normalize_header(c) for c in columns)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+# ---------------------- Índice de apelidos ----------------------
+
+class AliasIndex:
+    """
+    Cabeçalho normalizado -> coluna destino ('' = ignorar). Procura primeiro
+    o nome exato, depois as mesmas palavras em outra ordem e por último um
+    nome parecido (difflib), sem repetir um destino já usado.
+    """
+
+    def __init__(self):
+        self.exact = {}
+        self.tokens = {}
+
+    def add(self, header, target):
+        normalized = normalize_header(header)
+        if normalized:
+            self.exact[normalized] = target
+            self.tokens[_token_key(normalized)] = target
+
+    def match(self, columns):
+        """Sugestões {coluna original: destino} para as colunas reconhecidas."""
+        found = {}
+        used = set()
+        pending = []
+        for col in columns:
+            normalized = normalize_header(col)
+            target = self.exact.get(normalized)
+            if target is None:
+                target = self.tokens.get(_token_key(normalized))
+            if target is None or (target and target in used):
+                pending.append((col, normalized))
+                continue
+            found[col] = target
+            used.add(target)
+
+        keys = list(self.exact)
+        for col, normalized in pending:
+            for key in difflib.get_close_matches(normalized, keys, n=3, cutoff=FUZZY_CUTOFF):
+                target = self.exact[key]
+                if target and target not in used:
+                    found[col] = target
+                    used.add(target)
+                    break
+        return found
+
+# ---------------------- Perfis salvos ----------------------
+
+class ProfileStore:
+    """
+    Perfis por cadastro em um JSON:
+      {"clientes": {"<impressão digital>": {"columns": [...], "rename_map": {...},
+                    "ignored_columns": [...], "options": {...}, "updated": "..."}}}
+    options são parâmetros do Tratamento (usados pelo cadastro_cli).
+    """
+
+    def __init__(self, path=PROFILES_FILE):
+        self.path = path
+        self.profiles = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.profiles = json.load(f)
+        self._indexes = {}
+
+    def get(self, tipo, columns):
+        """Perfil salvo para exatamente este cabeçalho (ou None)."""
+        return self.profiles.get(tipo, {}).get(header_fingerprint(columns))
+
+    def index(self, tipo):
+        """Índice de apelidos do cadastro: máscara padrão < perfis (o mais recente vale)."""
+        if tipo not in self._indexes:
+            index = AliasIndex()
+            mask, final_columns = DEFAULT_ALIASES.get(tipo, ({}, []))
+            for target in list(final_columns) + list(mask.values()):
+                index.add(target, target)
+            for header, target in mask.items():
+                index.add(header, target)
+            saved = sorted(self.profiles.get(tipo, {}).values(), key=lambda p: p.get("updated", ""))
+            for profile in saved:
+                for header in profile.get("ignored_columns", []):
+                    index.add(header, "")
+                for header, target in profile.get("rename_map", {}).items():
+                    index.add(header, target)
+            self._indexes[tipo] = index
+        return self._indexes[tipo]
+
+    def suggest(self, tipo, columns):
+        """
+        Mapeamento sugerido para a etapa 2: (sugestões, perfil).
+        Com perfil salvo para o cabeçalho, as sugestões são as dele (colunas
+        ignoradas com ''); senão, só as colunas reconhecidas pelo índice e
+        perfil None.
+        """
+        profile = self.get(tipo, columns)
+        if profile is not None:
+            suggestions = {col: "" for col in profile.get("ignored_columns", [])}
+            suggestions.update(profile.get("rename_map", {}))
+            return suggestions, profile
+        return self.index(tipo).match(columns), None
+
+    def resolve(self, tipo, columns):
+        """Perfil completo para o processamento em lote (salvo ou montado pelo índice)."""
+        suggestions, profile = self.suggest(tipo, columns)
+        if profile is not None:
+            return profile
+        return {
+            "rename_map": {col: target for col, target in suggestions.items() if target},
+            "ignored_columns": [col for col, target in suggestions.items() if not target],
+        }
+
+    def save(self, tipo, columns, rename_map, ignored_columns=(), options=None):
+        """Grava (ou atualiza) o perfil do cabeçalho; options=None mantém as já salvas."""
+        key = header_fingerprint(columns)
+        previous = self.profiles.get(tipo, {}).get(key, {})
+        profile = {
+            "columns": [str(c) for c in columns],
+            "rename_map": {str(k): v for k, v in rename_map.items()},
+            "ignored_columns": sorted(str(c) for c in ignored_columns),
+            "options": previous.get("options", {}) if options is None else options,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.profiles.setdefault(tipo, {})[key] = profile
+        self._indexes.pop(tipo, None)
+
+        # troca atômica: um erro no meio da gravação não corrompe os perfis
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, indent=2, ensure_ascii=False)
+        os.replace(temp, self.path)
+        return profile
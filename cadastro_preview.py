@@ -0,0 +1,260 @@
+# cadastro_preview.py
+# -*- coding: utf-8 -*-
+# Grade de preview virtualizada: a Treeview só tem as linhas que cabem na
+# tela, e o conteúdo delas é trocado conforme a rolagem. Filtro e ordenação
+# rodam no DataFrame inteiro (vetorizados), sem criar um item por linha.
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+import pandas as pd
+
+ALL_COLUMNS = "(todas as colunas)"
+WHEEL_ROWS = 3
+
+def parse_preview_rows(text):
+    """Campo 'linhas no preview' das GUIs: inteiro positivo."""
+    rows = int(str(text).strip().replace(".", ""))
+    if rows <= 0:
+        raise ValueError("O preview precisa de pelo menos uma linha.")
+    return rows
+
+# ---------------------- Filtro / ordenação (sem Tk) ----------------------
+
+class FrameView:
+    """
+    Filtro e ordenação sobre um DataFrame sem copiá-lo: guarda só as
+    posições das linhas que passam no filtro, na ordem escolhida. As colunas
+    são referenciadas pela posição (nomes repetidos não atrapalham).
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.filter_text = ""
+        self.filter_column = None
+        self.sort_column = None
+        self.ascending = True
+        self._texts = {}
+        self._filtered = np.arange(len(df))
+        self.positions = self._filtered
+
+    def __len__(self):
+        return len(self.positions)
+
+    def text(self, column):
+        """Coluna como texto (vazio para NaN), calculada uma vez."""
+        if column not in self._texts:
+            serie = self.df.iloc[:, column]
+            self._texts[column] = serie.astype(object).where(serie.notna(), "").astype(str)
+        return self._texts[column]
+
+    def set_filter(self, text, column=None):
+        """Linhas que contêm `text` (sem diferenciar maiúsculas) na coluna ou em qualquer coluna."""
+        self.filter_text = text.strip()
+        self.filter_column = column
+        if not self.filter_text:
+            self._filtered = np.arange(len(self.df))
+        else:
+            columns = [column] if column is not None else range(self.df.shape[1])
+            mask = np.zeros(len(self.df), dtype=bool)
+            for col in columns:
+                mask |= self.text(col).str.contains(self.filter_text, case=False, regex=False).to_numpy()
+            self._filtered = np.flatnonzero(mask)
+        self._apply_sort()
+
+    def sort_by(self, column, ascending=None):
+        """Ordena pela coluna; sem `ascending`, clicar de novo inverte a ordem."""
+        if ascending is None:
+            ascending = not self.ascending if column == self.sort_column else True
+        self.sort_column = column
+        self.ascending = ascending
+        self._apply_sort()
+
+    def _apply_sort(self):
+        if self.sort_column is None:
+            self.positions = self._filtered
+            return
+        serie = self.df.iloc[:, self.sort_column]
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            keys = serie.to_numpy()[self._filtered]
+        else:
+            keys = self.text(self.sort_column).to_numpy()[self._filtered]
+        order = pd.Series(keys).sort_values(ascending=self.ascending, kind="stable",
+                                            na_position="last").index.to_numpy()
+        self.positions = self._filtered[order]
+
+    def rows(self, start, stop):
+        """Linhas [start, stop) da visão, já como texto para a Treeview."""
+        block = self.df.iloc[self.positions[start:stop]]
+        return [["" if pd.isna(v) else str(v) for v in row]
+                for row in block.itertuples(index=False, name=None)]
+
+# ---------------------- Treeview virtualizada ----------------------
+
+class VirtualTable(ttk.Frame):
+    """
+    Treeview com no máximo uma tela de itens; a barra de rolagem vertical é
+    controlada aqui (posição na visão filtrada), não pela Treeview.
+    on_change(): chamado depois de filtrar/ordenar (ex.: atualizar contagem).
+    """
+
+    def __init__(self, parent, df: pd.DataFrame, column_width=140, on_change=None):
+        super().__init__(parent)
+        self.view = FrameView(df)
+        self.names = [str(c) for c in df.columns]
+        self.on_change = on_change
+        self.offset = 0
+        self._page = 1
+
+        ids = [f"c{i}" for i in range(len(self.names))]
+        self.tree = ttk.Treeview(self, columns=ids, show="headings", selectmode="browse")
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.hsb.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for i, cid in enumerate(ids):
+            self.tree.heading(cid, text=self.names[i], command=lambda i=i: self.sort_by(i))
+            self.tree.column(cid, width=column_width, anchor="w", stretch=False)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(WHEEL_ROWS))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self._page))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self._page))
+        self.tree.bind("<Home>", lambda e: self._scroll_to(0))
+        self.tree.bind("<End>", lambda e: self._scroll_to(len(self.view)))
+        self.refresh()
+
+    # ---- filtro / ordenação ----
+    def set_filter(self, text, column=None):
+        self.view.set_filter(text, column)
+        self.offset = 0
+        self._changed()
+
+    def sort_by(self, column):
+        self.view.sort_by(column)
+        self.offset = 0
+        for i, name in enumerate(self.names):
+            arrow = ""
+            if i == self.view.sort_column:
+                arrow = " ▲" if self.view.ascending else " ▼"
+            self.tree.heading(f"c{i}", text=name + arrow)
+        self._changed()
+
+    def _changed(self):
+        self.refresh()
+        if self.on_change is not None:
+            self.on_change()
+
+    # ---- rolagem ----
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # descontando o cabeçalho (mais ou menos uma linha)
+        page = max(1, event.height // rowheight - 1)
+        if page != self._page:
+            self._page = page
+            self.refresh()
+
+    def _on_wheel(self, event):
+        # Windows: múltiplos de 120; macOS: valores pequenos
+        steps = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_by(-steps * WHEEL_ROWS)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = self._page if args[2] == "pages" else 1
+            self._scroll_by(int(args[1]) * step)
+
+    def _scroll_by(self, rows):
+        return self._scroll_to(self.offset + rows)
+
+    def _scroll_to(self, offset):
+        self.offset = offset
+        self.tree.selection_remove(self.tree.selection())
+        self.refresh()
+        return "break"
+
+    def refresh(self):
+        """Redesenha só as linhas visíveis a partir de self.offset."""
+        total = len(self.view)
+        self.offset = max(0, min(self.offset, total - self._page))
+        rows = self.view.rows(self.offset, self.offset + self._page)
+
+        # os itens são reaproveitados: só os valores mudam
+        items = self.tree.get_children()
+        for i, values in enumerate(rows):
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        if total:
+            self.vsb.set(self.offset / total, (self.offset + len(rows)) / total)
+        else:
+            self.vsb.set(0, 1)
+
+# ---------------------- Janela de preview ----------------------
+
+class PreviewWindow:
+    """Janela com a grade virtualizada, filtro por texto e ordenação pelo cabeçalho."""
+
+    def __init__(self, master, df_preview: pd.DataFrame, title="Preview - primeiras linhas"):
+        self.win = tk.Toplevel(master)
+        self.win.title(title)
+        # tamanho ajustável; usuário pode redimensionar
+        self.win.geometry("1000x520")
+
+        frame = ttk.Frame(self.win, padding=6)
+        frame.pack(fill="both", expand=True)
+
+        # filtro: texto em uma coluna ou em todas
+        bar = ttk.Frame(frame)
+        bar.pack(fill="x", pady=(0, 6))
+        ttk.Label(bar, text="Filtrar:").pack(side="left", padx=(0, 4))
+        self.filter_column_var = tk.StringVar(value=ALL_COLUMNS)
+        ttk.Combobox(bar, textvariable=self.filter_column_var, state="readonly", width=24,
+                     values=[ALL_COLUMNS] + [str(c) for c in df_preview.columns]).pack(side="left", padx=4)
+        self.filter_text_var = tk.StringVar()
+        entry = ttk.Entry(bar, textvariable=self.filter_text_var, width=30)
+        entry.pack(side="left", padx=4)
+        entry.bind("<Return>", lambda e: self._apply_filter())
+        ttk.Button(bar, text="Aplicar", command=self._apply_filter).pack(side="left", padx=4)
+        ttk.Button(bar, text="Limpar", command=self._clear_filter).pack(side="left", padx=4)
+        self.count_label = ttk.Label(bar, text="")
+        self.count_label.pack(side="right", padx=4)
+
+        self.table = VirtualTable(frame, df_preview, on_change=self._update_count)
+        self.table.pack(fill="both", expand=True)
+        self._update_count()
+
+        # barra de fechamento
+        btns = ttk.Frame(frame)
+        btns.pack(fill="x", pady=6)
+        ttk.Label(btns, text="Clique no cabeçalho para ordenar.").pack(side="left", padx=6)
+        ttk.Button(btns, text="Fechar", command=self.win.destroy).pack(side="right", padx=6)
+
+    def _apply_filter(self):
+        column = self.filter_column_var.get()
+        index = None if column == ALL_COLUMNS else self.table.names.index(column)
+        self.table.set_filter(self.filter_text_var.get(), index)
+
+    def _clear_filter(self):
+        self.filter_text_var.set("")
+        self.table.set_filter("")
+
+    def _update_count(self):
+        total = len(self.table.view.df)
+        shown = len(self.table.view)
+        text = f"{shown:,} de {total:,} linhas" if shown != total else f"{total:,} linhas"
+        self.count_label.config(text=text.replace(",", "."))
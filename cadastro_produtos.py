@@ -0,0 +1,83 @@
+# cadastro_produtos.py
+# -*- coding: utf-8 -*-
+# Tratamento dos dados de produtos (layout ADSNet), sem interface gráfica:
+# usado pela GUI (produtos.py) e pelo processamento em lote (cadastro_cli.py).
+import pandas as pd
+
+DEFAULT_REPLACER_MASK = {'S/N': '', 'SN': '', 'NAN': '', "'": ''}
+DEFAULT_NUMERIC = ['ncm', 'origem', 'ean13', 'cest']
+
+# ---------------------- Helpers / tratamento ----------------------
+
+from cadastro_base import TratamentoBase, decimal_to_text, parse_decimal
+
+# ---------------------- Máscara e colunas finais (ADSNet) ----------------------
+
+MASCARA_FIXA = {
+    'Nome do Produto (120)': 'descricao',
+    'Fornecedor': 'fornece',
+    'Marca (25)': 'marca',
+    'Estoque Atual': 'estoque',
+    'Unidade (06)': 'unidade',
+    'Valor Venda (Tabela Padrão)': 'prvenda',
+    'Valor Custo': 'ccompra',
+    'Peso': 'pesobr',
+    'Código CEST': 'cest',
+    'NCM (8)': 'ncm',
+    'Origem (0 a 8)': 'origem',
+    'Código de Barras (GTIN-8,12,13,14)': 'ean13'
+}
+
+FINAL_COLUMNS_ADSNET = [
+    "produto_id", "descricao", "apresentacao", "marca", "codfab", "ean13",
+    "ncm", "cest", "estoque", "unidade", "fator_cv", "muv", "localizacao",
+    "descricao2", "divisao_id", "fornece", "fornec_id", "trib_icms", "cst",
+    "csosn", "aliq_icms", "pFCP", "pauta", "cicms", "cIpi", "cst_pis",
+    "cst_cofins", "origem", "pesobr", "u_nota", "ccompra", "cmedio",
+    "prvenda", "comissao", "unidade2", "dun14", "pno"
+]
+
+# ---------------------- Classe de tratamento (sem GUI) ----------------------
+
+class ProdutosTratamento(TratamentoBase):
+    category_columns = ('marca', 'unidade', 'origem')
+
+    def __init__(self, numeric_fields=None, decimal_fields=None,replacer_mask=None, uppercase_all=True,
+                 decimal_as_text=True, compact=True):
+        """
+        decimal_as_text: True grava os decimais como texto '1234,56' (ADSNet);
+        False devolve colunas float (vazio/inválido = 0.0).
+        compact: se True, a saída usa string do pyarrow/category em vez de object.
+        """
+        self.numeric_fields = numeric_fields or DEFAULT_NUMERIC.copy()
+        self.decimal_fields = decimal_fields or []
+        self.replacer_mask = replacer_mask or DEFAULT_REPLACER_MASK.copy()
+        self.uppercase_all = uppercase_all
+        self.decimal_as_text = decimal_as_text
+        self.compact = compact
+
+    def clean_dataframe(self, df: pd.DataFrame, drop_empty=True) -> pd.DataFrame:
+        # drop_empty=False mantém as colunas vazias (blocos do clean_chunks)
+        df = df.dropna(axis=1, how='all').copy() if drop_empty else df.copy()
+
+        # transformar textos e aplicar uppercase se solicitado
+        df = self.normalize_text_columns(df)
+
+        # tratar decimais (preços/pesos) se existirem
+        for col in self.decimal_fields:
+            if col in df.columns:
+                if self.decimal_as_text:
+                    df[col] = decimal_to_text(df[col])
+                else:
+                    df[col] = parse_decimal(df[col]).fillna(0.0)
+
+        # aplicar extração numérica nas colunas configuradas
+        df = self.extract_numbers(df)
+
+        # remover trailing ".0" que costumam aparecer em colunas de códigos
+        for c in ['ean13', 'ncm', 'cest']:
+            if c in df.columns:
+                df[c] = df[c].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+        # garantir todas as colunas ADSNet existam (preencher vazias), reordenar e retornar
+        return self.output_frame(df, FINAL_COLUMNS_ADSNET)
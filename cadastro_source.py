@@ -0,0 +1,79 @@
+# cadastro_source.py
+# -*- coding: utf-8 -*-
+# Arquivo de origem dos cadastros aberto sob demanda: as etapas de
+# mapeamento e preview das GUIs só precisam do cabeçalho e de algumas
+# linhas; o arquivo inteiro só é lido, em blocos, no processamento final.
+from collections import OrderedDict
+
+import pandas as pd
+
+from cadastro_base import apply_mapping, cache_key
+from cadastro_io import DEFAULT_CHUNKSIZE, read_chunks, read_sample
+
+SAMPLE_ROWS = 1_000
+# linhas tratadas no preview e quantos previews ficam guardados por arquivo
+PREVIEW_ROWS = 200
+PREVIEW_CACHE_SIZE = 16
+
+class LazySource:
+    """
+    Planilha/CSV de cadastro sem carregar tudo na memória.
+    columns/sample: cabeçalho e primeiras `sample_rows` linhas (lidos uma vez).
+    preview(): clean_dataframe nas primeiras linhas da amostra, com cache.
+    chunks(): o arquivo inteiro em blocos, relido a cada chamada.
+    """
+
+    def __init__(self, path, sample_rows=SAMPLE_ROWS):
+        self.path = path
+        self.sample_rows = sample_rows
+        self._sample = None
+        self._previews = OrderedDict()
+
+    @classmethod
+    def open(cls, path, sample_rows=SAMPLE_ROWS):
+        """Cria a fonte já lendo cabeçalho e amostra: erro de leitura aparece aqui."""
+        source = cls(path, sample_rows)
+        source._sample = read_sample(path, sample_rows)
+        return source
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        if self._sample is None:
+            self._sample = read_sample(self.path, self.sample_rows)
+        return self._sample
+
+    @property
+    def columns(self):
+        return list(self.sample.columns)
+
+    def mapped_sample(self, rename_map=None, ignored_columns=None) -> pd.DataFrame:
+        """Amostra já com o mapeamento da etapa 2 (cópia: pode ser alterada)."""
+        return apply_mapping(self.sample, rename_map, ignored_columns).copy()
+
+    def head(self, rows) -> pd.DataFrame:
+        """Primeiras `rows` linhas: da amostra, ou relidas do arquivo se a amostra for menor."""
+        if rows <= len(self.sample) or len(self.sample) < self.sample_rows:
+            return self.sample.head(rows)
+        return read_sample(self.path, rows)
+
+    def preview(self, tratador, rename_map=None, ignored_columns=None, rows=PREVIEW_ROWS) -> pd.DataFrame:
+        """
+        Resultado do tratamento só nas primeiras `rows` linhas (o preview mostra
+        apenas essas). Fica guardado pela combinação mapeamento + opções do
+        tratador: clicar de novo sem mudar nada não reprocessa. Não altere o
+        DataFrame devolvido (é o mesmo objeto do cache).
+        """
+        key = (rows, cache_key(rename_map), cache_key(ignored_columns), tratador.options_key())
+        if key in self._previews:
+            self._previews.move_to_end(key)
+            return self._previews[key]
+
+        df = apply_mapping(self.head(rows), rename_map, ignored_columns).copy()
+        result = tratador.clean_dataframe(df)
+        self._previews[key] = result
+        if len(self._previews) > PREVIEW_CACHE_SIZE:
+            self._previews.popitem(last=False)
+        return result
+
+    def chunks(self, chunksize=DEFAULT_CHUNKSIZE):
+        return read_chunks(self.path, chunksize)
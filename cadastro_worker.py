@@ -0,0 +1,137 @@
+# cadastro_worker.py
+# -*- coding: utf-8 -*-
+# Trabalho pesado das GUIs (tratar + gravar) fora da thread do Tk. O Tk não
+# aceita chamadas de outras threads: o trabalho só conversa com a janela por
+# uma fila, lida pela thread do Tk com after().
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+POLL_MS = 100
+
+class JobCancelled(Exception):
+    """Interrompe o trabalho quando o usuário clica em Cancelar."""
+
+class BackgroundJob:
+    """
+    Roda work(report) em uma thread separada.
+    report(texto, feito=None, total=None): chamado pelo trabalho para avisar o
+    progresso; levanta JobCancelled se o usuário cancelou (o cancelamento vale
+    no próximo aviso, ex.: a cada bloco gravado).
+    on_done(resultado), on_error(exceção), on_progress(texto, feito, total) e
+    on_cancelled() rodam na thread do Tk.
+    """
+
+    def __init__(self, root, work, on_done, on_error, on_progress=None, on_cancelled=None):
+        self.root = root
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancelled = on_cancelled
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def report(self, text, done=None, total=None):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self._queue.put(("progress", (text, done, total)))
+
+    def _run(self):
+        try:
+            result = self.work(self.report)
+        except JobCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
+
+    def _poll(self):
+        try:
+            alive = bool(self.root.winfo_exists())
+        except tk.TclError:
+            alive = False
+        if not alive:
+            # janela fechada no meio do trabalho: para no próximo aviso
+            self.cancel()
+            return
+
+        try:
+            while True:
+                kind, value = self._queue.get_nowait()
+                if kind == "progress":
+                    if self.on_progress is not None:
+                        self.on_progress(*value)
+                elif kind == "done":
+                    self.on_done(value)
+                    return
+                elif kind == "error":
+                    self.on_error(value)
+                    return
+                else:
+                    if self.on_cancelled is not None:
+                        self.on_cancelled()
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(POLL_MS, self._poll)
+
+class ProgressPanel:
+    """
+    Barra de progresso, texto e botão Cancelar para acompanhar um
+    BackgroundJob. Sem total conhecido a barra fica em modo indeterminado.
+    """
+
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent)
+        self.bar = ttk.Progressbar(self.frame, mode="indeterminate", length=220)
+        self.label = ttk.Label(self.frame, text="")
+        self.cancel_button = ttk.Button(self.frame, text="Cancelar", state="disabled")
+        self._spinning = False
+        self.bar.pack(side="left", padx=6)
+        self.label.pack(side="left", padx=6)
+        self.cancel_button.pack(side="left", padx=6)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def attach(self, job):
+        self.cancel_button.config(command=job.cancel, state="normal")
+        self.update("Iniciando...")
+
+    def update(self, text, done=None, total=None):
+        self.label.config(text=text)
+        if total:
+            self._stop()
+            self.bar.config(mode="determinate", maximum=total, value=done or 0)
+        elif not self._spinning:
+            self.bar.config(mode="indeterminate")
+            self.bar.start(15)
+            self._spinning = True
+
+    def reset(self, text=""):
+        self._stop()
+        self.bar.config(mode="determinate", value=0)
+        self.label.config(text=text)
+        self.cancel_button.config(state="disabled")
+
+    def _stop(self):
+        if self._spinning:
+            self.bar.stop()
+            self._spinning = False
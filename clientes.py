@@ -2,139 +2,17 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import re
 import os
 
-# ---------------------- Helpers / Tratamento de dados ----------------------
-
-def get_numbers_from_string(s):
-    """Extrai apenas os dígitos de uma string. Retorna '' se vazio ou somente zeros."""
-    try:
-        s = str(s)
-    except:
-        return ''
-    numbers = re.findall(r'\d+', s)
-    texto = ''.join(numbers)
-    if texto == "":
-        return ""
-    if all(caractere == '0' for caractere in texto):
-        return ''
-    return texto
-
-def remover_itens_na_string(s, replacer_mask):
-    """Substitui itens indesejados em uma string conforme replacer_mask dict."""
-    try:
-        s = str(s)
-    except:
-        return ''
-    for item, rep in replacer_mask.items():
-        s = s.replace(item, rep)
-    return s
-
-# máscara padrão sugerida (ajustável)
-SUGGESTED_MASK = {
-    'Nome/Razão Social': "nome",
-    'CPF/CNPJ': 'cnpj_cpf',
-    'Nome Fantasia': 'fantasia',
-    'Inscrição Estadual': "ie",
-    'Logradouro': "endereco",
-    'Número': 'numero',
-    'Complemento': 'complemento',
-    'CEP': 'cep',
-    'Bairro': 'bairro',
-    'Cidade': 'cidade',
-    'Estado': 'uf',
-    'Telefone': "fone",
-    'E-mail': 'email',
-    'Funcionário': 'ncompr'
-}
-
-# colunas finais desejadas (ordem)
-FINAL_COLUMNS = [
-    'cliente_id', 'cnpj_cpf', 'cpf', 'ie', 'nome', 'fantasia', 'fone', 'endereco', 'numero',
-    'bairro', 'cidade', 'ibge', 'uf', 'cep', 'email', 'email_danfe', 'classe_id', 'repr_id',
-    'fone2', 'complemento', 'ncompr', 'rota_id', 'rota', 'consumidor_final', 'Observacao'
-]
-
-# ---------------------- Classe de processamento (sem GUI) ----------------------
-
-class ClientesTratamento:
-    """
-    Classe com métodos de transformação dos dados de clientes.
-    """
+# ---------------------- Tratamento (sem GUI) ----------------------
 
-    def __init__(self,
-                 numeric_fields=None,
-                 replacer_mask=None,
-                 uppercase_all=True):
-        """
-        numeric_fields: lista de colunas que serão tratadas com get_numbers_from_string
-        replacer_mask: dicionário para remover itens indesejados em strings
-        uppercase_all: se True, transforma colunas de texto em caixa alta
-        """
-        # conforme confirmação do usuário
-        if numeric_fields is None:
-            numeric_fields = ['cnpj_cpf','cpf','cep','fone','fone2','ie','cliente_id','ibge']
-        self.numeric_fields = numeric_fields
-
-        if replacer_mask is None:
-            replacer_mask = {'S/N': '', 'SN': '', 'NAN': '', "'": ''}
-        self.replacer_mask = replacer_mask
-
-        self.uppercase_all = uppercase_all
-
-    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Aplica limpeza geral: remove colunas vazias, normaliza textos, aplica remover_itens_na_string e get_numbers...
-        Retorna dataframe reordenado com FINAL_COLUMNS.
-        """
-        # remover colunas totalmente vazias
-        df = df.dropna(axis=1, how='all').copy()
-
-        # transformar todos objetos em string e aplicar caixa alta se configurado
-        for col in df.columns:
-            if df[col].dtype == object:
-                df[col] = df[col].astype(str)
-                if self.uppercase_all:
-                    df[col] = df[col].str.upper()
-
-        # remover itens indesejados em colunas texto
-        for col in df.columns:
-            if df[col].dtype == object:
-                df[col] = [remover_itens_na_string(s, self.replacer_mask) for s in df[col].values]
-
-        # aplicar extração de números nas colunas configuradas
-        for c in self.numeric_fields:
-            if c in df.columns:
-                df[c] = [get_numbers_from_string(x) for x in df[c].astype(str).values]
-
-        # criar Observacao se existirem canais/ie/ponto_referencia (compat com notebook)
-        if {'canal', 'ie', 'ponto_referencia'}.intersection(set(df.columns)):
-            observacoes = []
-            # preencher com '' caso alguma coluna não exista para evitar erro
-            cols_to_use = [c for c in ['canal', 'ie', 'ponto_referencia'] if c in df.columns]
-            df_fill = df[cols_to_use].fillna('')
-            for row in df_fill.itertuples(index=False, name=None):
-                obss = []
-                if 'canal' in cols_to_use and row[cols_to_use.index('canal')] != "":
-                    obss.append(f"Canal: {row[cols_to_use.index('canal')]}")
-                if 'ie' in cols_to_use and row[cols_to_use.index('ie')] != "":
-                    obss.append(f"IE/RG: {row[cols_to_use.index('ie')]}")
-                if 'ponto_referencia' in cols_to_use and row[cols_to_use.index('ponto_referencia')] != "":
-                    obss.append(f"Ponto de Referência: {row[cols_to_use.index('ponto_referencia')]}")
-                observacoes.append("\n".join(obss) if obss else "")
-            df['Observacao'] = observacoes
-
-        # Garantir todas as colunas finais estão presentes
-        for c in FINAL_COLUMNS:
-            if c not in df.columns:
-                df[c] = ''
-
-        # Reordenar para a ordem desejada
-        df = df[FINAL_COLUMNS]
-
-        return df
+# get_numbers_from_string/remover_itens_na_string: reexportados, código antigo os importa daqui
+from cadastro_clientes import SUGGESTED_MASK, ClientesTratamento, get_numbers_from_string, remover_itens_na_string
+from cadastro_export import EXPORT_FILETYPES, export_chunks, parse_split_rows, progress_text
+from cadastro_perfis import ProfileStore
+from cadastro_preview import PreviewWindow, parse_preview_rows
+from cadastro_source import PREVIEW_ROWS, LazySource
+from cadastro_worker import BackgroundJob, ProgressPanel
 
 # ---------------------- GUI para Clientes (3 etapas) ----------------------
 
@@ -153,11 +31,12 @@ class ClientesGUI:
         self.root.title("Tratamento - Clientes")
         self.root.geometry("900x650")
         self.filepath = initial_filepath
-        self.df_original = None
-        self.df_mapped = None
+        self.source = None  # arquivo de origem (cabeçalho + amostra; lido inteiro só ao processar)
+        self.df_sample = None  # amostra já mapeada (colunas da etapa 3 e preview)
         self.rename_map = {}
         self.ignored_columns = set()
         self.suggested_mask = SUGGESTED_MASK.copy()
+        self.profiles = None  # perfis de mapeamento salvos (carregados na etapa 2)
 
         # variáveis de etapa 3
         self.numeric_vars = {}  # col -> tk.IntVar
@@ -165,6 +44,8 @@ class ClientesGUI:
         # default replacer mask string (aparece no input)
         self.replacer_entry_var = tk.StringVar(value="S/N,SN,NAN,'")
         self.extra_numeric_var = tk.StringVar(value="")  # comma separated
+        self.split_rows_var = tk.StringVar(value="")  # vazio = arquivo único
+        self.preview_rows_var = tk.StringVar(value=str(PREVIEW_ROWS))
 
         self._build_step1()
 
@@ -209,17 +90,13 @@ class ClientesGUI:
             messagebox.showwarning("Aviso", "Selecione um arquivo antes de avançar.")
             return
         try:
-            if self.filepath.lower().endswith('.csv'):
-                df = pd.read_csv(self.filepath)
-            else:
-                df = pd.read_excel(self.filepath, skiprows=0)
+            # só cabeçalho e amostra: o arquivo inteiro é lido em blocos ao processar
+            source = LazySource.open(self.filepath)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao ler o arquivo:\n{e}")
             return
 
-        # drop empty columns
-        df = df.dropna(axis=1, how='all')
-        self.df_original = df
+        self.source = source
         self._build_step2()
 
     # ---------------------- Step 2 ----------------------
@@ -251,6 +128,7 @@ class ClientesGUI:
         hsb.pack(side="bottom", fill="x")
 
         self.column_entries = {}  # original_col -> Entry widget
+        suggestions = self._load_profile_suggestions()
 
         # header
         hdr = ttk.Frame(scroll_frame)
@@ -258,12 +136,12 @@ class ClientesGUI:
         ttk.Label(hdr, text="Coluna original", width=50).grid(row=0, column=0, padx=2)
         ttk.Label(hdr, text="Nome destino (deixe em branco para IGNORAR)", width=50).grid(row=0, column=1, padx=2)
 
-        for idx, col in enumerate(self.df_original.columns, start=1):
+        for idx, col in enumerate(self.source.columns, start=1):
             lbl = ttk.Label(scroll_frame, text=str(col), width=50, anchor='w')
             lbl.grid(row=idx, column=0, padx=2, pady=2, sticky='w')
 
-            # sugestão de rename: se estiver em SUGGESTED_MASK, usar; senão pegar nome simplificado
-            sugest = self.suggested_mask.get(col, col)
+            # sugestão de rename: perfil salvo / apelido conhecido; senão SUGGESTED_MASK ou o próprio nome
+            sugest = suggestions.get(col, self.suggested_mask.get(col, col))
             ent = ttk.Entry(scroll_frame, width=50)
             ent.insert(0, sugest)
             ent.grid(row=idx, column=1, padx=2, pady=2, sticky='w')
@@ -272,8 +150,36 @@ class ClientesGUI:
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(fill='x', pady=8)
         ttk.Button(btn_frame, text="← Voltar", command=self._build_step1).pack(side='left', padx=6)
+        ttk.Label(btn_frame, text=self.profile_text).pack(side='left', padx=6)
         ttk.Button(btn_frame, text="Avançar →", command=self._process_step2).pack(side='right', padx=6)
 
+    def _load_profile_suggestions(self):
+        # mesmo layout de arquivo já mapeado antes: vem do perfil salvo;
+        # senão, colunas reconhecidas pelos apelidos (sem acento/maiúsculas)
+        try:
+            self.profiles = ProfileStore()
+        except (OSError, ValueError) as e:
+            self.profiles = None
+            self.profile_text = "Perfis de mapeamento indisponíveis"
+            messagebox.showwarning("Aviso", f"Não foi possível ler os perfis de mapeamento:\n{e}")
+            return {}
+        suggestions, profile = self.profiles.suggest("clientes", self.source.columns)
+        if profile is not None:
+            self.profile_text = f"Perfil salvo aplicado ({profile['updated'][:10]})"
+        else:
+            self.profile_text = f"{len(suggestions)} de {len(self.source.columns)} colunas reconhecidas"
+        return suggestions
+
+    def _save_profile(self, rename_map, ignored, options=None):
+        # lembrar o mapeamento (e as opções da etapa 3, ao processar) deste
+        # layout de arquivo para a próxima vez; o cadastro_cli usa as mesmas
+        if self.profiles is None:
+            return
+        try:
+            self.profiles.save("clientes", self.source.columns, rename_map, ignored, options)
+        except OSError as e:
+            messagebox.showwarning("Aviso", f"Não foi possível salvar o perfil de mapeamento:\n{e}")
+
     def _process_step2(self):
         # Build rename_map and ignored list: agora campo em branco = ignorar
         rename_map = {}
@@ -285,15 +191,11 @@ class ClientesGUI:
             else:
                 rename_map[orig] = val
 
-        # aplicar renome temporariamente
-        df = self.df_original.rename(columns=rename_map).copy()
-
-        # remover colunas ignoradas (usando orig names)
-        df.drop(columns=list(ignored), inplace=True, errors='ignore')
-
-        self.df_mapped = df
+        # aplicar renome na amostra (o arquivo inteiro só é lido ao processar)
+        self.df_sample = self.source.mapped_sample(rename_map, ignored)
         self.rename_map = rename_map
         self.ignored_columns = ignored
+        self._save_profile(rename_map, ignored)
 
         self._build_step3()
 
@@ -319,6 +221,13 @@ class ClientesGUI:
         ttk.Label(frame, text="Colunas adicionais para extrair apenas números (separe por vírgula):").pack(anchor='w', pady=4)
         ttk.Entry(frame, textvariable=self.extra_numeric_var, width=60).pack(anchor='w')
 
+        # importadores do ERP travam com arquivos muito grandes
+        ttk.Label(frame, text="Dividir o arquivo final a cada N linhas (vazio = arquivo único):").pack(anchor='w', pady=4)
+        ttk.Entry(frame, textvariable=self.split_rows_var, width=12).pack(anchor='w')
+
+        ttk.Label(frame, text="Linhas no preview (lidas do início do arquivo):").pack(anchor='w', pady=4)
+        ttk.Entry(frame, textvariable=self.preview_rows_var, width=12).pack(anchor='w')
+
         ttk.Label(frame, text="Marque as colunas que devem ficar apenas com números:", font=("Arial", 11)).pack(anchor='w', pady=8)
 
         cols_container = ttk.Frame(frame)
@@ -337,7 +246,7 @@ class ClientesGUI:
         vsb.pack(side='right', fill='y')
 
         self.numeric_vars = {}
-        for idx, col in enumerate(self.df_mapped.columns):
+        for idx, col in enumerate(self.df_sample.columns):
             # padrão: marcar como numéricas as colunas confirmadas
             initial = 1 if col.lower() in ['cnpj_cpf','cpf','cep','fone','fone2','ie','cliente_id','ibge'] else 0
             var = tk.IntVar(value=initial)
@@ -347,20 +256,37 @@ class ClientesGUI:
 
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(fill='x', pady=8)
-        ttk.Button(btn_frame, text="← Voltar", command=self._build_step2).pack(side='left', padx=6)
+        self.back_button = ttk.Button(btn_frame, text="← Voltar", command=self._build_step2)
+        self.back_button.pack(side='left', padx=6)
         ttk.Button(btn_frame, text="Visualizar preview", command=self._show_preview).pack(side='left', padx=6)
-        ttk.Button(btn_frame, text="Processar e Salvar", command=self._process_and_save).pack(side='right', padx=6)
+        self.process_button = ttk.Button(btn_frame, text="Processar e Salvar", command=self._process_and_save)
+        self.process_button.pack(side='right', padx=6)
+
+        # progresso do processamento em segundo plano (com Cancelar)
+        self.progress = ProgressPanel(self.root)
+        self.progress.pack(fill='x', padx=8, pady=4)
 
     def _show_preview(self):
+        try:
+            rows = parse_preview_rows(self.preview_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas para o preview.")
+            return
+
         tratador = self._build_tratador_from_ui()
         try:
-            df_preview = tratador.clean_dataframe(self.df_mapped.copy())
+            # só as linhas exibidas, com cache por mapeamento + opções
+            df_preview = self.source.preview(tratador, self.rename_map, self.ignored_columns, rows)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar preview:\n{e}")
             return
-        PreviewWindow(self.root, df_preview.head(200))
+        PreviewWindow(self.root, df_preview)
 
     def _build_tratador_from_ui(self):
+        return ClientesTratamento(**self._options_from_ui())
+
+    def _options_from_ui(self):
+        # opções da etapa 3 como argumentos do ClientesTratamento (vão para o perfil)
         # get numeric selection
         numeric_selected = [c for c, var in self.numeric_vars.items() if var.get() == 1]
         extra_txt = self.extra_numeric_var.get().strip()
@@ -376,41 +302,72 @@ class ClientesGUI:
         # combine numeric_selected with extra_list (unique)
         numeric_final = list(dict.fromkeys(numeric_selected + extra_list))
 
-        tratador = ClientesTratamento(
-            numeric_fields=numeric_final,
-            replacer_mask=replacer_mask,
-            uppercase_all=bool(self.uppercase_var.get())
-        )
-        return tratador
+        return {
+            "numeric_fields": numeric_final,
+            "replacer_mask": replacer_mask,
+            "uppercase_all": bool(self.uppercase_var.get()),
+        }
 
     def _process_and_save(self):
-        tratador = self._build_tratador_from_ui()
         try:
-            df_final = tratador.clean_dataframe(self.df_mapped.copy())
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar dados:\n{e}")
+            split_rows = parse_split_rows(self.split_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas por arquivo (ou deixe vazio).")
             return
 
-        # Pergunta onde salvar
+        options = self._options_from_ui()
+        tratador = ClientesTratamento(**options)
+
+        # Pergunta onde salvar antes: o processamento roda em segundo plano
         default_dir = os.path.dirname(self.filepath) if self.filepath else os.getcwd()
         suggested_name = os.path.join(default_dir, os.path.basename(os.path.splitext(self.filepath)[0]) + " - Clientes Tratado.xlsx")
         out_path = filedialog.asksaveasfilename(defaultextension=".xlsx",
                                                 initialfile=os.path.basename(suggested_name),
                                                 initialdir=default_dir,
-                                                filetypes=[("Excel Files", "*.xlsx *.xls")])
+                                                filetypes=EXPORT_FILETYPES)
         if not out_path:
             return
-        try:
-            df_final.to_excel(out_path, index=False)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao salvar o arquivo:\n{e}")
-            return
-
-        messagebox.showinfo("Concluído", f"Arquivo salvo em:\n{out_path}")
+        self._save_profile(self.rename_map, self.ignored_columns, options)
+
+        source, rename_map, ignored = self.source, self.rename_map, self.ignored_columns
+
+        def work(report):
+            # roda fora da thread do Tk: nada de widgets aqui, só report()
+            report("Lendo e tratando dados...")
+            # o arquivo é lido, tratado e gravado em blocos (memória limitada ao bloco)
+            chunks = tratador.clean_chunks(source.chunks(), rename_map, ignored)
+            # formato pela extensão: .xlsx, .csv ou .txt (ADSNet)
+            return export_chunks(chunks, out_path, split_rows=split_rows,
+                                 progress=lambda rows, total: report(progress_text(rows, total), rows, total))
+
+        self._set_running(True)
+        job = BackgroundJob(self.root, work, self._on_saved, self._on_save_error,
+                            on_progress=self.progress.update, on_cancelled=self._on_save_cancelled)
+        self.progress.attach(job)
+        job.start()
+
+    def _set_running(self, running):
+        state = 'disabled' if running else 'normal'
+        self.process_button.config(state=state)
+        self.back_button.config(state=state)
+
+    def _on_saved(self, paths):
+        self._set_running(False)
+        self.progress.reset("Concluído")
+        messagebox.showinfo("Concluído", "Arquivo salvo em:\n" + "\n".join(paths))
         # fechar janela se for Toplevel
         if isinstance(self.root, tk.Toplevel):
             self.root.destroy()
 
+    def _on_save_error(self, e):
+        self._set_running(False)
+        self.progress.reset()
+        messagebox.showerror("Erro", f"Erro ao processar/salvar os dados:\n{e}")
+
+    def _on_save_cancelled(self):
+        self._set_running(False)
+        self.progress.reset("Cancelado: nenhum arquivo foi gravado.")
+
     # ---------------------- start / helper ----------------------
     def start(self):
         # iniciar mainloop se esta janela é a root
@@ -420,60 +377,6 @@ class ClientesGUI:
             # se é Toplevel, apenas retorna para que o caller mantenha o mainloop
             return
 
-# ---------------------- Janela de Preview (Treeview com scrollbars) ----------------------
-
-class PreviewWindow:
-    def __init__(self, master, df_preview: pd.DataFrame):
-        self.win = tk.Toplevel(master)
-        self.win.title("Preview - primeiras linhas")
-        # tamanho ajustável; usuário pode redimensionar
-        self.win.geometry("1000x500")
-
-        frame = ttk.Frame(self.win, padding=6)
-        frame.pack(fill='both', expand=True)
-
-        cols = list(df_preview.columns)
-
-        # Treeview com scrollbars configuradas (vertical + horizontal)
-        tree_frame = ttk.Frame(frame)
-        tree_frame.pack(fill='both', expand=True)
-
-        # vertical and horizontal scrollbars
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
-
-        tree = ttk.Treeview(tree_frame, columns=cols, show='headings',
-                            yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        # configurar scrollbars para controlar tree
-        vsb.config(command=tree.yview)
-        hsb.config(command=tree.xview)
-
-        # layout grid para tree + scrollbars
-        tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
-
-        # cabeçalhos e largura inicial
-        for c in cols:
-            tree.heading(c, text=c)
-            # ajustar width dinamicamente (padrão 140)
-            tree.column(c, width=140, anchor='w')
-
-        # inserir linhas (convertendo tudo para string)
-        for row in df_preview.itertuples(index=False):
-            tree.insert('', 'end', values=[str(x) for x in row])
-
-        # permitir redimensionar coluna ao clicar no separador de header (comportamento padrão)
-
-        # barra de fechamento
-        btns = ttk.Frame(frame)
-        btns.pack(fill='x', pady=6)
-        ttk.Button(btns, text="Fechar", command=self.win.destroy).pack(side='right', padx=6)
-
 # ---------------------- Módulo de teste ----------------------
 if __name__ == "__main__":
     gui = ClientesGUI()
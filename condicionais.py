@@ -0,0 +1,164 @@
+# =========================================================
+# CONVERSÃO DE CONDICIONAIS EM VENDAS (PYTHON)
+# Autor: Victor
+# Descrição: Mesma saída da consulta "Conversão de
+#            condicionais em vendas", calculada com pandas a
+#            partir de extrações (vendas, parceiros,
+#            condicionais e vendas_itens), sem o banco do ERP.
+#            As condicionais são lidas uma vez só: vendidas e
+#            entregues saem do mesmo agrupamento, com colunas
+#            mascaradas por condição.
+# Uso:
+#   python condicionais.py --vendas vendas.parquet --parceiros parceiros.parquet \
+#       --condicionais condicionais.parquet --vendas-itens vendas_itens.parquet \
+#       --data-ini 2024-01-01 --data-fim 2024-12-31 --vendedor 0 --saida conversao.xlsx
+# =========================================================
+
+import argparse
+import os
+
+import pandas as pd
+
+from etl_formatos import ler_arquivo
+
+# nomes da consulta (inclusive o 'condiocional_entregue'); o segundo QTD
+# ganha o sufixo 1, como nas ferramentas que exibem o resultado
+COLUNAS_SAIDA = [
+    "vendedor", "nome", "dev_venda", "total_venda", "total_venda_liquido",
+    "condicional_vendida", "condiocional_entregue", "qtd", "qtd1",
+]
+
+
+def _no_periodo(datas, data_ini, data_fim):
+    # BETWEEN :pDataIni AND :pDataFim (inclusive; NULL fica de fora)
+    datas = pd.to_datetime(datas)
+    return ((datas >= pd.Timestamp(data_ini)) & (datas <= pd.Timestamp(data_fim))).to_numpy()
+
+
+# ---------------------- vendas e devoluções (vd) ----------------------
+
+def resumo_vendas(vendas, data_ini, data_fim, vendedor=0):
+    """
+    dev_venda e total_venda por vendedor: notas não canceladas do período,
+    devoluções (tipo_nd 'D') e vendas normais ('N') somadas no mesmo
+    agrupamento. vendedor 0 = todos (inclusive vendedor NULL, como no SQL).
+    """
+    # NULL (NaN/<NA> em colunas Int64/string) não casa, como no WHERE do SQL
+    mascara = _no_periodo(vendas["dtacomp"], data_ini, data_fim)
+    mascara &= vendas["idn_cancelada"].eq("N").to_numpy(dtype=bool, na_value=False)
+    if vendedor:
+        mascara &= vendas["vendedor"].eq(vendedor).to_numpy(dtype=bool, na_value=False)
+    vendas = vendas.loc[mascara]
+
+    # iif(tipo_nd = X, total_venda, 0): fora da condição soma 0; total NULL continua NULL
+    tipo = vendas["tipo_nd"]
+    total = vendas["total_venda"]
+    colunas = pd.DataFrame({
+        "vendedor": vendas["vendedor"],
+        "dev_venda": total.where(tipo == "D", 0),
+        "total_venda": total.where(tipo == "N", 0),
+    })
+    return colunas.groupby("vendedor", dropna=False, sort=False).sum(min_count=1).reset_index()
+
+
+# ---------------------- condicionais (cd e cd1) ----------------------
+
+def resumo_condicionais(condicionais, vendas_itens, data_ini, data_fim):
+    """
+    Por vendedor, em uma passada sobre as condicionais:
+      - cd (vendidas): condicionais com item de venda no período. O LEFT
+        JOIN com vendas_itens repete a condicional uma vez por item, então
+        o valor entra multiplicado pelo nº de itens dela no período;
+      - cd1 (entregues): condicionais com dtacomp no período.
+    qtd/qtd1 são COUNT(DISTINCT numcondicional) de cada lado (NULL quando o
+    vendedor não tem nenhuma linha daquele lado, como no LEFT JOIN).
+    """
+    itens = vendas_itens.loc[_no_periodo(vendas_itens["dtacomp"], data_ini, data_fim), "condicional_id"]
+    n_itens = condicionais["condicional_id"].map(itens.value_counts()).fillna(0).to_numpy()
+    vendida = n_itens > 0
+    entregue = _no_periodo(condicionais["dtacomp"], data_ini, data_fim)
+
+    valor = condicionais["valor"]
+    numero = condicionais["numcondicional"]
+    colunas = pd.DataFrame({
+        "vendedor": condicionais["vendedor"],
+        "condicional_vendida": (valor * n_itens).where(vendida),
+        "condiocional_entregue": valor.where(entregue),
+        "qtd": numero.where(vendida),
+        "qtd1": numero.where(entregue),
+        "_linhas_cd": vendida,
+        "_linhas_cd1": entregue,
+    })
+    # vendedor NULL nunca casa no JOIN com vd: fica de fora (dropna)
+    grupos = colunas.groupby("vendedor", sort=False)
+    resumo = pd.DataFrame({
+        "condicional_vendida": grupos["condicional_vendida"].sum(min_count=1),
+        "condiocional_entregue": grupos["condiocional_entregue"].sum(min_count=1),
+        "qtd": grupos["qtd"].nunique(),
+        "qtd1": grupos["qtd1"].nunique(),
+        "_linhas_cd": grupos["_linhas_cd"].any(),
+        "_linhas_cd1": grupos["_linhas_cd1"].any(),
+    })
+    resumo["qtd"] = resumo["qtd"].astype("Int64").where(resumo.pop("_linhas_cd"))
+    resumo["qtd1"] = resumo["qtd1"].astype("Int64").where(resumo.pop("_linhas_cd1"))
+    return resumo.reset_index()
+
+
+# ---------------------- relatório ----------------------
+
+def conversao_condicionais(vendas, parceiros, condicionais, vendas_itens, data_ini, data_fim, vendedor=0):
+    """
+    Relatório completo: vd LEFT JOIN parceiros, cd e cd1 e o GROUP BY final
+    (feito sobre o resultado já pequeno, uma linha por vendedor). A consulta
+    não tem ORDER BY; aqui as linhas saem ordenadas por vendedor.
+    """
+    vd = resumo_vendas(vendas, data_ini, data_fim, vendedor)
+    cd = resumo_condicionais(condicionais, vendas_itens, data_ini, data_fim)
+
+    nomes = parceiros[["parceiro", "nome"]].rename(columns={"parceiro": "vendedor"})
+    # o JOIN não casa vendedor NULL: o merge do pandas casaria NaN com NaN
+    nomes = nomes[nomes["vendedor"].notna()]
+    cd = cd[cd["vendedor"].notna()]
+    df = vd.merge(nomes, on="vendedor", how="left").merge(cd, on="vendedor", how="left")
+
+    chaves = ["vendedor", "nome", "condiocional_entregue", "qtd", "qtd1"]
+    df = (
+        df.groupby(chaves, dropna=False, sort=False)[["dev_venda", "total_venda", "condicional_vendida"]]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    # SUM(total) - SUM(dev): NULL em qualquer lado dá NULL
+    df["total_venda_liquido"] = df["total_venda"] - df["dev_venda"]
+    df = df.sort_values("vendedor", na_position="first", kind="stable")
+    return df[COLUNAS_SAIDA].reset_index(drop=True)
+
+
+# ---------------------- linha de comando ----------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversão de condicionais em vendas a partir de extrações do ERP.")
+    parser.add_argument("--vendas", required=True, help="extração da vendas (.csv, .parquet, .feather, .pkl, .xlsx)")
+    parser.add_argument("--parceiros", required=True, help="extração da parceiros (parceiro, nome)")
+    parser.add_argument("--condicionais", required=True, help="extração da condicionais")
+    parser.add_argument("--vendas-itens", required=True, help="extração da vendas_itens (condicional_id, dtacomp)")
+    parser.add_argument("--data-ini", required=True, help="pDataIni (ex.: 2024-01-01)")
+    parser.add_argument("--data-fim", required=True, help="pDataFim (inclusive)")
+    parser.add_argument("--vendedor", type=int, default=0, help="0 = todos os vendedores")
+    parser.add_argument("--saida", default="conversao_condicionais.xlsx", help="arquivo de saída (.xlsx ou .csv)")
+    args = parser.parse_args(argv)
+
+    resultado = conversao_condicionais(
+        ler_arquivo(args.vendas), ler_arquivo(args.parceiros),
+        ler_arquivo(args.condicionais), ler_arquivo(args.vendas_itens),
+        args.data_ini, args.data_fim, args.vendedor,
+    )
+    if os.path.splitext(args.saida)[1].lower() == ".csv":
+        resultado.to_csv(args.saida, index=False)
+    else:
+        resultado.to_excel(args.saida, index=False)
+    print(f"Relatório gravado em: {args.saida} ({len(resultado)} vendedores)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
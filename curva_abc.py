@@ -0,0 +1,263 @@
+# =========================================================
+# CURVA ABC DE VENDAS (PYTHON)
+# Autor: Victor
+# Descrição: Mesma saída da consulta "Curva ABC de Vendas",
+#            calculada com pandas/NumPy a partir de uma
+#            extração da vendas_itens (CSV, Parquet, XLSX...),
+#            sem acessar o banco do ERP:
+#              - total e quantidade por produto/classificação
+#              - perc e perc_acu (participação e acumulada)
+#              - classe A/B/C (80% / 95%) e somatórios por classe
+# Uso:
+#   python curva_abc.py vendas_itens.parquet --vendas vendas.parquet \
+#       --produtos produtos.parquet --produtos-clas produtos_clas.parquet \
+#       --data-ini 2024-01-01 --data-fim 2024-12-31 --filial 0 --saida curva_abc.xlsx
+# =========================================================
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from etl_formatos import ler_arquivo
+
+# limites da classe pelo percentual acumulado (A até 80%, B até 95%, resto C)
+LIMITE_A = 80
+LIMITE_B = 95
+
+# escala do NUMERIC(15,3) do CAST e da divisão (3 + 3 casas) no Firebird
+ESCALA_CAST = 10 ** 3
+ESCALA_PERC = 10 ** 6
+
+COLUNAS_SAIDA = [
+    "codproduto", "descprod", "total_prod", "qtd", "total_geral", "perc", "perc_acu", "clase",
+    "soma_qtd_A", "soma_total_A", "soma_qtd_B", "soma_total_B", "soma_qtd_C", "soma_total_C",
+    "soma_itens_A", "soma_itens_B", "soma_itens_C",
+]
+
+
+# ---------------------- agregação (subconsulta d) ----------------------
+
+def texto_sql(serie):
+    """
+    Coluna como texto para o '||' do SQL: NULL continua NULL e códigos
+    inteiros lidos como float (por causa de NaN) saem sem o '.0'.
+    """
+    if pd.api.types.is_float_dtype(serie):
+        valores = serie.dropna()
+        if (valores == np.trunc(valores)).all():
+            serie = serie.astype("Int64")
+    # o map sozinho devolve float64 quando é tudo NULL: força object
+    return serie.astype(object).map(lambda v: np.nan if pd.isna(v) else str(v)).astype(object)
+
+
+def _concatenar(esquerda, direita):
+    # a || '/' || b: NULL em qualquer lado dá NULL (como no Firebird); sem o
+    # .str, que recusa uma coluna object só com NaN (classificação toda NULL)
+    esquerda, direita = texto_sql(esquerda), texto_sql(direita)
+    return (esquerda + "/" + direita).where(esquerda.notna() & direita.notna())
+
+
+def filtro_vendas(itens, data_ini=None, data_fim=None, filial=0, vendas=None):
+    """
+    Máscara do WHERE: período (BETWEEN, inclusive; None = sem limite),
+    filial (0 = todas), idn_cancelada = 'N' e tipo_nd = 'N'. Com `vendas`
+    (venda_id único, como a chave da tabela) o LEFT JOIN + WHERE vira um
+    filtro por venda_id; sem ela, as colunas da venda já devem estar na
+    extração.
+    """
+    datas = pd.to_datetime(itens["dtacomp"])
+    mascara = pd.Series(True, index=itens.index)
+    if data_ini is not None:
+        mascara &= datas >= pd.Timestamp(data_ini)
+    if data_fim is not None:
+        mascara &= datas <= pd.Timestamp(data_fim)
+
+    cabecalho = vendas if vendas is not None else itens
+    valida = (cabecalho["idn_cancelada"] == "N") & (cabecalho["tipo_nd"] == "N")
+    if filial:
+        valida &= cabecalho["codfilial"] == filial
+
+    if vendas is not None:
+        mascara &= itens["venda_id"].isin(vendas.loc[valida, "venda_id"])
+    else:
+        mascara &= valida
+    return mascara.to_numpy()
+
+
+def agregar_vendas(itens, data_ini, data_fim, filial=0, vendas=None, produtos=None, produtos_clas=None):
+    """
+    Total vendido (total_prod) e quantidade (qtd) por codproduto/descprod,
+    como a subconsulta base da Curva ABC.
+    itens: vendas_itens (codproduto, codproduto_clas, dtacomp, total, qtd e
+    venda_id). vendas/produtos/produtos_clas: tabelas dos JOINs; quando não
+    forem informadas, as colunas delas (codfilial, idn_cancelada, tipo_nd,
+    dscproduto, dscproduto_clas) devem estar em `itens`.
+    O agrupamento é feito pelos códigos (rápido em milhões de linhas); as
+    descrições e os textos vêm depois, em rotular_produtos.
+    """
+    itens = itens.loc[filtro_vendas(itens, data_ini, data_fim, filial, vendas)]
+
+    chaves = ["codproduto", "codproduto_clas"]
+    if produtos is None:
+        chaves.append("dscproduto")
+    if produtos_clas is None:
+        chaves.append("dscproduto_clas")
+    agregado = (
+        itens.groupby(chaves, dropna=False, sort=False)[["total", "qtd"]]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    return rotular_produtos(agregado, produtos, produtos_clas)
+
+
+def rotular_produtos(agregado, produtos=None, produtos_clas=None):
+    """
+    Junta as descrições (quando produtos/produtos_clas são informadas) a um
+    agregado por codproduto/codproduto_clas (colunas total e qtd) e monta
+    os textos 'código/classificação' e 'descrição/classificação',
+    reagrupando por eles: códigos com classificação NULL viram um só grupo
+    NULL, como no GROUP BY 1,2.
+    """
+    if produtos is not None:
+        agregado = agregado.merge(produtos[["codproduto", "dscproduto"]], on="codproduto", how="left")
+    if produtos_clas is not None:
+        agregado = agregado.merge(
+            produtos_clas[["codproduto", "codproduto_clas", "dscproduto_clas"]],
+            on=["codproduto", "codproduto_clas"], how="left",
+        )
+
+    agregado["codproduto"] = _concatenar(agregado["codproduto"], agregado["codproduto_clas"])
+    agregado["descprod"] = _concatenar(agregado["dscproduto"], agregado["dscproduto_clas"])
+    return (
+        agregado.groupby(["codproduto", "descprod"], dropna=False, sort=False)[["total", "qtd"]]
+        .sum(min_count=1)
+        .rename(columns={"total": "total_prod"})
+        .reset_index()
+    )
+
+
+# ---------------------- classificação (d1, d2 e d3) ----------------------
+
+def _numeric_15_3(valores):
+    """CAST(x AS NUMERIC(15,3)): inteiro em milésimos, arredondado (metade para longe do zero)."""
+    return np.trunc(valores * ESCALA_CAST + np.copysign(0.5, valores)).astype(np.int64)
+
+
+def _dividir_truncando(numerador, denominador):
+    # divisão de NUMERIC no Firebird: escala somada (3 + 3) e resultado truncado
+    sinal = np.sign(numerador) * np.sign(denominador)
+    if np.abs(numerador).max(initial=0) > np.iinfo(np.int64).max // ESCALA_PERC:
+        # evita estouro do int64: inteiros do Python (mais lento, só em valores enormes)
+        numerador = numerador.astype(object)
+    return np.abs(numerador) * ESCALA_PERC // abs(denominador) * sinal
+
+
+def _acumulado_range(valores):
+    """
+    SUM(perc) OVER (ORDER BY perc DESC) com o frame padrão (RANGE): empates
+    recebem o mesmo acumulado, já somando todos os empatados. `valores` são
+    inteiros já ordenados de forma decrescente.
+    """
+    acumulado = np.cumsum(valores)
+    if len(valores) == 0:
+        return acumulado
+    inicio = np.r_[True, valores[1:] != valores[:-1]]
+    fim = np.flatnonzero(np.r_[valores[1:] != valores[:-1], True])
+    return acumulado[fim][np.cumsum(inicio) - 1]
+
+
+def classificar_abc(agregado):
+    """
+    perc, perc_acu, clase e somatórios por classe sobre a saída de
+    agregar_vendas, na ordem final (total_prod decrescente).
+    perc segue a aritmética do Firebird: total_prod e total_geral arredondados
+    para NUMERIC(15,3), divisão truncada em 6 casas e * 100. O acumulado é
+    somado em inteiros, então não há erro de ponto flutuante nos limites de
+    80% e 95%.
+    """
+    df = agregado.reset_index(drop=True)
+    total = df["total_prod"].to_numpy(dtype=float)
+    valido = ~np.isnan(total)
+    total_geral = np.nansum(total) if valido.any() else np.nan
+
+    perc = np.full(len(df), np.nan)
+    perc_acu = np.full(len(df), np.nan)
+    if valido.any():
+        denominador = int(_numeric_15_3(np.array([total_geral]))[0])
+        if denominador == 0:
+            raise ZeroDivisionError("Faturamento total zero: perc não pode ser calculado.")
+        perc_int = _dividir_truncando(_numeric_15_3(total[valido]), denominador) * 100
+
+        # ORDER BY perc DESC; NULL fica por último, empatado entre si,
+        # e recebe o acumulado de todos
+        ordem = np.argsort(-perc_int, kind="stable")
+        acu_int = np.empty(len(df), dtype=perc_int.dtype)
+        acu_int[np.flatnonzero(valido)[ordem]] = _acumulado_range(perc_int[ordem])
+        acu_int[~valido] = np.sum(perc_int)
+
+        perc[valido] = np.asarray(perc_int, dtype=float) / ESCALA_PERC
+        perc_acu = np.asarray(acu_int, dtype=float) / ESCALA_PERC
+        # classe comparada nos inteiros (sem arredondamento do float)
+        clase = np.where(acu_int <= LIMITE_A * ESCALA_PERC, "A",
+                         np.where(acu_int <= LIMITE_B * ESCALA_PERC, "B", "C"))
+    else:
+        clase = np.full(len(df), "C")
+
+    df["total_geral"] = total_geral
+    df["perc"] = perc
+    df["perc_acu"] = perc_acu
+    df["clase"] = clase
+
+    # CASE WHEN clase = X THEN SUM(...) OVER (PARTITION BY clase = X) ELSE '' END:
+    # o valor da classe só nas linhas dela (o '' do SQL fica vazio/NaN)
+    for classe in ("A", "B", "C"):
+        da_classe = df["clase"] == classe
+        df[f"soma_qtd_{classe}"] = np.where(da_classe, df.loc[da_classe, "qtd"].sum(min_count=1), np.nan)
+        df[f"soma_total_{classe}"] = np.where(da_classe, df.loc[da_classe, "total_prod"].sum(min_count=1), np.nan)
+        contagem = df.loc[da_classe, "codproduto"].notna().sum()
+        df[f"soma_itens_{classe}"] = pd.Series(contagem, index=df.index, dtype="Int64").where(da_classe)
+
+    # ORDER BY total_prod DESC (NULL por último); empates pelo código
+    df = df.sort_values(["total_prod", "codproduto"], ascending=[False, True],
+                        na_position="last", kind="stable")
+    return df[COLUNAS_SAIDA].reset_index(drop=True)
+
+
+def curva_abc(itens, data_ini, data_fim, filial=0, vendas=None, produtos=None, produtos_clas=None):
+    """Curva ABC completa: agregar_vendas + classificar_abc."""
+    agregado = agregar_vendas(itens, data_ini, data_fim, filial, vendas, produtos, produtos_clas)
+    return classificar_abc(agregado)
+
+
+# ---------------------- linha de comando ----------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Curva ABC de vendas a partir de extrações do ERP.")
+    parser.add_argument("itens", help="extração da vendas_itens (.csv, .parquet, .feather, .pkl, .xlsx)")
+    parser.add_argument("--vendas", help="extração da vendas (sem ela, as colunas da venda estão nos itens)")
+    parser.add_argument("--produtos", help="extração da produtos (dscproduto)")
+    parser.add_argument("--produtos-clas", help="extração da produtos_clas (dscproduto_clas)")
+    parser.add_argument("--data-ini", required=True, help="DataIni (ex.: 2024-01-01)")
+    parser.add_argument("--data-fim", required=True, help="DataFim (inclusive)")
+    parser.add_argument("--filial", type=int, default=0, help="0 = todas as filiais")
+    parser.add_argument("--saida", default="curva_abc.xlsx", help="arquivo de saída (.xlsx ou .csv)")
+    args = parser.parse_args(argv)
+
+    ler = lambda caminho: ler_arquivo(caminho) if caminho else None
+    resultado = curva_abc(
+        ler(args.itens), args.data_ini, args.data_fim, args.filial,
+        vendas=ler(args.vendas), produtos=ler(args.produtos), produtos_clas=ler(args.produtos_clas),
+    )
+
+    if os.path.splitext(args.saida)[1].lower() == ".csv":
+        resultado.to_csv(args.saida, index=False)
+    else:
+        resultado.to_excel(args.saida, index=False)
+    print(f"Curva ABC gravada em: {args.saida} ({len(resultado)} produtos)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+# =========================================================
+# CURVA ABC - AGREGADOS DIÁRIOS MATERIALIZADOS
+# Autor: Victor
+# Descrição: Guarda em um arquivo SQLite o total e a
+#            quantidade vendidos por dia, filial, produto e
+#            classificação (só vendas válidas). A cada carga
+#            entram só as vendas novas (venda_id acima da
+#            marca d'água); a curva de qualquer período sai
+#            da soma dos dias, sem reler os itens.
+# Uso:
+#   python curva_abc_store.py atualizar vendas_itens.parquet --vendas vendas.parquet \
+#       --produtos produtos.parquet --produtos-clas produtos_clas.parquet
+#   python curva_abc_store.py curva --data-ini 2022-01-01 --data-fim 2024-12-31 --saida curva.xlsx
+# =========================================================
+
+import argparse
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from curva_abc import classificar_abc, filtro_vendas, rotular_produtos, texto_sql
+from etl_formatos import ler_arquivo
+
+ARQUIVO_BASE = "curva_abc.sqlite"
+
+# as chaves não podem ser NULL no upsert (NULL nunca conflita no SQLite):
+# código NULL é gravado como '' e volta a ser NULL na leitura
+NULO = ""
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS abc_diario (
+    dia             TEXT NOT NULL,  -- AAAA-MM-DD (dtacomp)
+    codfilial       TEXT NOT NULL,
+    codproduto      TEXT NOT NULL,
+    codproduto_clas TEXT NOT NULL,
+    total           REAL,           -- SUM(vi.total); NULL se todos NULL
+    qtd             REAL,           -- SUM(vi.qtd)
+    PRIMARY KEY (dia, codfilial, codproduto, codproduto_clas)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS abc_produtos (
+    codproduto TEXT PRIMARY KEY,
+    dscproduto TEXT
+);
+
+CREATE TABLE IF NOT EXISTS abc_produtos_clas (
+    codproduto      TEXT NOT NULL,
+    codproduto_clas TEXT NOT NULL,
+    dscproduto_clas TEXT,
+    PRIMARY KEY (codproduto, codproduto_clas)
+);
+
+CREATE TABLE IF NOT EXISTS abc_estado (
+    chave TEXT PRIMARY KEY,
+    valor
+);
+"""
+
+# soma que respeita o NULL do SUM: NULL só se os dois lados forem NULL
+_SOMA = "CASE WHEN {c} IS NULL THEN excluded.{c} WHEN excluded.{c} IS NULL THEN {c} ELSE {c} + excluded.{c} END"
+
+UPSERT_DIARIO = f"""
+INSERT INTO abc_diario (dia, codfilial, codproduto, codproduto_clas, total, qtd)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (dia, codfilial, codproduto, codproduto_clas) DO UPDATE SET
+    total = {_SOMA.format(c="total")},
+    qtd = {_SOMA.format(c="qtd")}
+"""
+
+
+def abrir(caminho=ARQUIVO_BASE):
+    """Conexão com a base de agregados (cria as tabelas na primeira vez)."""
+    con = sqlite3.connect(caminho)
+    con.executescript(ESQUEMA)
+    return con
+
+
+def marca_dagua(con):
+    """Maior venda_id já agregado (None = base vazia)."""
+    linha = con.execute("SELECT valor FROM abc_estado WHERE chave = 'ultima_venda_id'").fetchone()
+    return None if linha is None else linha[0]
+
+
+def _chave(serie):
+    # texto do código (como no '||' da consulta), NULL -> ''
+    return texto_sql(serie).fillna(NULO)
+
+
+def _nulo(serie):
+    # NaN -> None para o sqlite3 gravar NULL
+    return serie.astype(object).where(serie.notna(), None)
+
+
+# ---------------------- carga incremental ----------------------
+
+def _agregar_dias(itens, vendas):
+    """Total/qtd por dia, filial, produto e classificação dos itens válidos."""
+    itens = itens.loc[filtro_vendas(itens, vendas=vendas)]
+    if vendas is not None:
+        filiais = vendas.drop_duplicates("venda_id").set_index("venda_id")["codfilial"]
+        codfilial = itens["venda_id"].map(filiais)
+    else:
+        codfilial = itens["codfilial"]
+
+    chaves = pd.DataFrame({
+        "dia": pd.to_datetime(itens["dtacomp"]).dt.normalize(),
+        "codfilial": codfilial,
+        "codproduto": itens["codproduto"],
+        "codproduto_clas": itens["codproduto_clas"],
+    })
+    agregado = (
+        pd.concat([chaves, itens[["total", "qtd"]]], axis=1)
+        .groupby(list(chaves.columns), dropna=False, sort=False)[["total", "qtd"]]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    agregado["dia"] = agregado["dia"].dt.strftime("%Y-%m-%d")
+    for coluna in ("codfilial", "codproduto", "codproduto_clas"):
+        agregado[coluna] = _chave(agregado[coluna])
+    return agregado
+
+
+def _gravar_descricoes(con, itens, produtos, produtos_clas):
+    # descrições atuais (como o JOIN da consulta): tabelas informadas ou,
+    # na extração única, os pares código/descrição que vieram nos itens
+    if produtos is None and "dscproduto" in itens:
+        produtos = itens[["codproduto", "dscproduto"]].dropna().drop_duplicates("codproduto", keep="last")
+    if produtos_clas is None and "dscproduto_clas" in itens:
+        produtos_clas = (
+            itens[["codproduto", "codproduto_clas", "dscproduto_clas"]].dropna()
+            .drop_duplicates(["codproduto", "codproduto_clas"], keep="last")
+        )
+    if produtos is not None:
+        con.executemany(
+            "INSERT OR REPLACE INTO abc_produtos VALUES (?, ?)",
+            zip(_chave(produtos["codproduto"]), _nulo(produtos["dscproduto"])),
+        )
+    if produtos_clas is not None:
+        con.executemany(
+            "INSERT OR REPLACE INTO abc_produtos_clas VALUES (?, ?, ?)",
+            zip(_chave(produtos_clas["codproduto"]), _chave(produtos_clas["codproduto_clas"]),
+                _nulo(produtos_clas["dscproduto_clas"])),
+        )
+
+
+def atualizar(itens, vendas=None, produtos=None, produtos_clas=None, caminho=ARQUIVO_BASE,
+              refazer_desde=None):
+    """
+    Soma na base só os itens de vendas novas (venda_id acima da marca
+    d'água) e avança a marca. Tudo em uma transação: se falhar no meio,
+    a base fica como estava.
+    refazer_desde: dia (ex.: '2024-06-01') a partir do qual os agregados são
+    apagados e recalculados com todos os itens informados, para incluir
+    vendas canceladas/alteradas depois da carga. A extração precisa trazer
+    todos os itens desde esse dia.
+    A extração de vendas precisa ser do mesmo momento da de itens: item de
+    venda que ainda não está nela fica de fora (como no JOIN) e só volta
+    com refazer_desde.
+    Retorna um resumo (linhas lidas, agregados gravados, marca d'água).
+    """
+    inicio = time.perf_counter()
+    con = abrir(caminho)
+    try:
+        with con:
+            marca = marca_dagua(con)
+            novos = pd.Series(True, index=itens.index) if marca is None else itens["venda_id"] > marca
+            if refazer_desde is not None:
+                dia = pd.Timestamp(refazer_desde).strftime("%Y-%m-%d")
+                con.execute("DELETE FROM abc_diario WHERE dia >= ?", (dia,))
+                novos |= pd.to_datetime(itens["dtacomp"]) >= pd.Timestamp(dia)
+            itens = itens.loc[novos.to_numpy()]
+
+            agregado = _agregar_dias(itens, vendas)
+            con.executemany(UPSERT_DIARIO, zip(*(_nulo(agregado[c]) for c in agregado.columns)))
+            _gravar_descricoes(con, itens, produtos, produtos_clas)
+
+            if len(itens):
+                ultima = int(itens["venda_id"].max())
+                if marca is None or ultima > marca:
+                    marca = ultima
+                    con.execute(
+                        "INSERT OR REPLACE INTO abc_estado VALUES ('ultima_venda_id', ?)", (marca,)
+                    )
+    finally:
+        con.close()
+    return {
+        "linhas_lidas": len(itens),
+        "agregados": len(agregado),
+        "ultima_venda_id": marca,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+
+
+# ---------------------- consulta por período ----------------------
+
+def agregado_periodo(data_ini, data_fim, filial=0, caminho=ARQUIVO_BASE):
+    """
+    Mesmo resultado do agregar_vendas para o período, somando os dias já
+    agregados (o período é em dias inteiros, como dtacomp).
+    """
+    sql = """
+        SELECT codproduto, codproduto_clas, SUM(total) AS total, SUM(qtd) AS qtd
+        FROM abc_diario
+        WHERE dia BETWEEN ? AND ?{filtro}
+        GROUP BY codproduto, codproduto_clas
+    """
+    parametros = [pd.Timestamp(data_ini).strftime("%Y-%m-%d"), pd.Timestamp(data_fim).strftime("%Y-%m-%d")]
+    filtro = ""
+    if filial:
+        filtro = " AND codfilial = ?"
+        parametros.append(str(filial))
+
+    con = abrir(caminho)
+    try:
+        agregado = pd.read_sql_query(sql.format(filtro=filtro), con, params=parametros)
+        produtos = pd.read_sql_query("SELECT * FROM abc_produtos", con)
+        produtos_clas = pd.read_sql_query("SELECT * FROM abc_produtos_clas", con)
+    finally:
+        con.close()
+
+    # '' -> NULL coluna a coluna com mask: o replace transformava uma coluna
+    # toda '' em float64, que não casa com as chaves texto do merge
+    for coluna in ("codproduto", "codproduto_clas"):
+        agregado[coluna] = agregado[coluna].mask(agregado[coluna] == NULO)
+    return rotular_produtos(agregado, produtos, produtos_clas)
+
+
+def curva_abc_periodo(data_ini, data_fim, filial=0, caminho=ARQUIVO_BASE):
+    """Curva ABC do período a partir da base de agregados."""
+    return classificar_abc(agregado_periodo(data_ini, data_fim, filial, caminho))
+
+
+# ---------------------- linha de comando ----------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agregados diários da Curva ABC (SQLite).")
+    parser.add_argument("--base", default=ARQUIVO_BASE, help="arquivo SQLite dos agregados")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    carga = comandos.add_parser("atualizar", help="soma na base as vendas novas da extração")
+    carga.add_argument("itens", help="extração da vendas_itens (.csv, .parquet, .feather, .pkl, .xlsx)")
+    carga.add_argument("--vendas", help="extração da vendas (sem ela, as colunas da venda estão nos itens)")
+    carga.add_argument("--produtos", help="extração da produtos (dscproduto)")
+    carga.add_argument("--produtos-clas", help="extração da produtos_clas (dscproduto_clas)")
+    carga.add_argument("--refazer-desde", metavar="DIA", help="recalcula os agregados a partir deste dia")
+
+    curva = comandos.add_parser("curva", help="curva ABC de um período a partir da base")
+    curva.add_argument("--data-ini", required=True, help="DataIni (ex.: 2024-01-01)")
+    curva.add_argument("--data-fim", required=True, help="DataFim (inclusive)")
+    curva.add_argument("--filial", type=int, default=0, help="0 = todas as filiais")
+    curva.add_argument("--saida", default="curva_abc.xlsx", help="arquivo de saída (.xlsx ou .csv)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "atualizar":
+        ler = lambda caminho: ler_arquivo(caminho) if caminho else None
+        resumo = atualizar(
+            ler(args.itens), ler(args.vendas), ler(args.produtos), ler(args.produtos_clas),
+            caminho=args.base, refazer_desde=args.refazer_desde,
+        )
+        print(f"{resumo['linhas_lidas']} itens novos, {resumo['agregados']} agregados gravados "
+              f"(última venda: {resumo['ultima_venda_id']}, {resumo['segundos']}s)")
+        return 0
+
+    inicio = time.perf_counter()
+    resultado = curva_abc_periodo(args.data_ini, args.data_fim, args.filial, args.base)
+    if os.path.splitext(args.saida)[1].lower() == ".csv":
+        resultado.to_csv(args.saida, index=False)
+    else:
+        resultado.to_excel(args.saida, index=False)
+    print(f"Curva ABC gravada em: {args.saida} ({len(resultado)} produtos, "
+          f"{time.perf_counter() - inicio:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
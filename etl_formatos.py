@@ -0,0 +1,109 @@
+# =========================================================
+# ETL - FORMATOS DAS BASES ENTRE ETAPAS
+# Autor: Victor
+# Descrição: Gravação/leitura plugável das bases intermediárias
+#            (EXTRACT → TRANSFORM). O padrão é colunar
+#            (Parquet), que preserva os tipos; XLSX fica como
+#            exportação opcional da etapa final (LOAD).
+# =========================================================
+
+import pandas as pd
+import os
+
+from etl_metricas import medir
+
+
+def _salvar_xlsx(df, caminho):
+    df.to_excel(caminho, index=False)
+
+
+def _salvar_feather(df, caminho):
+    # feather não grava índice: a base segue com índice padrão
+    df.reset_index(drop=True).to_feather(caminho)
+
+
+# formato -> (extensão, gravar(df, caminho), ler(caminho))
+FORMATOS = {
+    "parquet": (".parquet", lambda df, caminho: df.to_parquet(caminho), pd.read_parquet),
+    "feather": (".feather", _salvar_feather, pd.read_feather),
+    "pickle": (".pkl", lambda df, caminho: df.to_pickle(caminho), pd.read_pickle),
+    "xlsx": (".xlsx", _salvar_xlsx, pd.read_excel),
+}
+
+try:
+    import pyarrow  # noqa: F401 (parquet/feather dependem do pyarrow)
+    FORMATO_PADRAO = "parquet"
+except ImportError:
+    FORMATO_PADRAO = "pickle"
+
+
+def caminho_base(pasta, nome, formato=FORMATO_PADRAO):
+    """Caminho da base `nome` na pasta, com a extensão do formato."""
+    return os.path.join(pasta, nome + FORMATOS[formato][0])
+
+
+def salvar_base(df, pasta, nome, formato=FORMATO_PADRAO):
+    """
+    Grava a base da etapa e devolve o caminho gerado. Cópias da mesma
+    base em outros formatos são removidas para que ler_base() nunca
+    pegue uma versão antiga.
+    Parquet/Feather não aceitam colunas com tipos misturados (ex.: texto e
+    número na mesma coluna); nesse caso a base é gravada em pickle.
+    """
+    caminho = caminho_base(pasta, nome, formato)
+    with medir("passo", f"salvar {nome}", linhas_entrada=len(df)) as registro:
+        try:
+            FORMATOS[formato][1](df, caminho)
+        except Exception as e:
+            if formato not in ("parquet", "feather") or not _erro_arrow(e):
+                raise
+            print(f"Aviso: {nome} não pôde ser gravada em {formato} ({e}); usando pickle.")
+            formato = "pickle"
+            caminho = caminho_base(pasta, nome, formato)
+            FORMATOS[formato][1](df, caminho)
+        registro["formato"] = formato
+
+    for outro in FORMATOS:
+        antigo = caminho_base(pasta, nome, outro)
+        if outro != formato and os.path.exists(antigo):
+            os.remove(antigo)
+    return caminho
+
+
+def localizar_base(pasta, nome):
+    """Caminho da base `nome` já gravada na pasta (qualquer formato) ou None."""
+    for formato in FORMATOS:
+        caminho = caminho_base(pasta, nome, formato)
+        if os.path.exists(caminho):
+            return caminho
+    return None
+
+
+def ler_base(pasta, nome):
+    """Lê a base `nome` da pasta, no formato em que ela foi gravada."""
+    caminho = localizar_base(pasta, nome)
+    if caminho is None:
+        raise FileNotFoundError(f"Base '{nome}' não encontrada em {pasta}")
+    with medir("passo", f"ler {nome}", formato=os.path.splitext(caminho)[1]) as registro:
+        df = ler_arquivo(caminho)
+        registro["linhas_saida"] = len(df)
+    return df
+
+
+def ler_arquivo(caminho):
+    """Lê um arquivo de base escolhendo o leitor pela extensão."""
+    ext = os.path.splitext(caminho)[1].lower()
+    for extensao, _, ler in FORMATOS.values():
+        if ext == extensao:
+            return ler(caminho)
+    if ext == ".csv":
+        return pd.read_csv(caminho)
+    raise ValueError(f"Formato de arquivo não suportado: {caminho}")
+
+
+def _erro_arrow(e):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    return isinstance(e, pa.ArrowException)
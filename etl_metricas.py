@@ -0,0 +1,155 @@
+# =========================================================
+# ETL - MÉTRICAS DE EXECUÇÃO
+# Autor: Victor
+# Descrição: Tempo, linhas de entrada/saída e memória por
+#            etapa, arquivo e aba, gravados em JSON lines
+#            (um registro por linha) a cada execução.
+#            Opcional: tracemalloc e dump do cProfile.
+# =========================================================
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# coletor ativo no processo (None = instrumentação desligada)
+_ativo = None
+
+
+def rss_pico_mb():
+    """Pico de memória residente do processo até agora, em MB (None se indisponível)."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB, macOS em bytes
+        return round(pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024, 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / 1024 ** 2, 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+class Metricas:
+    """
+    Coletor de registros de medição.
+    usar_tracemalloc: mede alocações do Python (delta e pico) por bloco.
+    Deixa o código mais lento e, com etapas em paralelo (threads), os picos
+    se misturam; para números exatos rode o runner com --serial.
+    """
+
+    def __init__(self, usar_tracemalloc=False):
+        self.usar_tracemalloc = usar_tracemalloc
+        self.registros = []
+        self.execucao = datetime.now().isoformat(timespec="seconds")
+        self._lock = threading.Lock()
+        self._pilhas = threading.local()
+
+    def adicionar(self, registros):
+        with self._lock:
+            self.registros.extend(registros)
+
+    def salvar_jsonl(self, caminho):
+        """Acrescenta os registros desta execução ao arquivo JSON lines."""
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho, "a", encoding="utf-8") as f:
+            for registro in self.registros:
+                f.write(json.dumps({"execucao": self.execucao, **registro}, ensure_ascii=False, default=str) + "\n")
+
+    def resumo(self, tipo="etapa"):
+        """Linhas de texto com o tempo de cada registro do tipo informado."""
+        linhas = []
+        for r in self.registros:
+            if r["tipo"] != tipo:
+                continue
+            texto = f"{r['nome']}: {r['segundos']:.2f}s"
+            if "situacao" in r:
+                texto += f" ({r['situacao']})"
+            if "linhas_entrada" in r or "linhas_saida" in r:
+                texto += f" | linhas {r.get('linhas_entrada', '-')} → {r.get('linhas_saida', '-')}"
+            if r.get("mem_pico_mb") is not None:
+                texto += f" | pico {r['mem_pico_mb']} MB"
+            linhas.append(texto)
+        return linhas
+
+    def _pilha(self):
+        if not hasattr(self._pilhas, "itens"):
+            self._pilhas.itens = []
+        return self._pilhas.itens
+
+
+def ativar(metricas):
+    """Liga a instrumentação no processo com o coletor informado."""
+    global _ativo
+    _ativo = metricas
+    if metricas.usar_tracemalloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desativar():
+    global _ativo
+    if _ativo is not None and _ativo.usar_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _ativo = None
+
+
+def coletor():
+    return _ativo
+
+
+@contextmanager
+def medir(tipo, nome, **campos):
+    """
+    Mede o bloco e registra no coletor ativo (sem coletor, não faz nada).
+    O dict devolvido aceita campos extras, ex.: registro["linhas_saida"] = len(df).
+    """
+    registro = {"tipo": tipo, "nome": nome, **campos}
+    metricas = _ativo
+    if metricas is None:
+        yield registro
+        return
+
+    rastrear = metricas.usar_tracemalloc and tracemalloc.is_tracing()
+    pilha = metricas._pilha()
+    if rastrear:
+        mem_inicio, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        # pico visto pelos blocos internos (que zeram o pico global)
+        pilha.append(0)
+
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        registro["segundos"] = round(time.perf_counter() - inicio, 4)
+        if rastrear:
+            mem_fim, pico = tracemalloc.get_traced_memory()
+            pico = max(pico, pilha.pop())
+            if pilha:
+                pilha[-1] = max(pilha[-1], pico)
+            registro["mem_delta_mb"] = round((mem_fim - mem_inicio) / 1024 ** 2, 2)
+            registro["mem_pico_mb"] = round((pico - mem_inicio) / 1024 ** 2, 2)
+        registro["rss_pico_mb"] = rss_pico_mb()
+        registro["pid"] = os.getpid()
+        metricas.adicionar([registro])
+
+
+@contextmanager
+def perfil(caminho):
+    """Roda o bloco sob cProfile e grava o dump em `caminho` (abrir com pstats/snakeviz)."""
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(caminho)
@@ -0,0 +1,275 @@
+# =========================================================
+# ETL - RUNNER (RECEITAS / DESPESAS)
+# Autor: Victor
+# Descrição: Executa o ETL como um DAG:
+#              extract_receitas → transform_receitas
+#              extract_despesas → transform_despesas
+#            Ramos independentes rodam ao mesmo tempo e
+#            etapas cujas entradas não mudaram são puladas.
+#            Pastas e opções vêm do etl_config.json.
+#            Tempo/memória de cada etapa vão para um
+#            relatório JSON lines (etl_metricas).
+# =========================================================
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import extract_receitas
+import extract_despesas
+import transform_receitas
+import transform_despesas
+import etl_metricas
+from etl_metricas import medir
+from extract_base import listar_arquivos
+from etl_formatos import localizar_base, FORMATO_PADRAO
+from transform_base import assinatura_regras
+
+ARQUIVO_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl_config.json")
+
+# valores usados quando a chave não existe no arquivo de configuração
+CONFIG_PADRAO = {
+    "pasta_extract": extract_receitas.PASTA_LOAD,
+    "pasta_transform": extract_receitas.PASTA_SAIDA,
+    "pasta_load": transform_receitas.PASTA_SAIDA,
+    "pasta_cache": os.path.dirname(extract_receitas.PASTA_CACHE),
+    "formato_intermediario": FORMATO_PADRAO,
+    "formato_saida": transform_receitas.FORMATO_SAIDA,
+    "workers": extract_receitas.WORKERS,
+    "incremental": extract_receitas.INCREMENTAL,
+    "paralelo": True,
+    # estado das últimas execuções (None = etl_estado.json na pasta_transform)
+    "arquivo_estado": None,
+    # métricas de cada execução (None = etl_relatorio.jsonl na pasta_transform)
+    "arquivo_relatorio": None,
+}
+
+
+def carregar_config(caminho=ARQUIVO_CONFIG):
+    """Lê o JSON de configuração; chaves ausentes ficam com CONFIG_PADRAO."""
+    config = dict(CONFIG_PADRAO)
+    if caminho and os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            config.update(json.load(f))
+    if not config["arquivo_estado"]:
+        config["arquivo_estado"] = os.path.join(config["pasta_transform"], "etl_estado.json")
+    if not config["arquivo_relatorio"]:
+        config["arquivo_relatorio"] = os.path.join(config["pasta_transform"], "etl_relatorio.jsonl")
+    return config
+
+
+# ---------------------- DAG ----------------------
+
+class Etapa:
+    """
+    Uma etapa do DAG.
+    executar: função sem argumentos que roda a etapa
+    depende: nomes das etapas que precisam terminar antes
+    entradas: função que devolve os arquivos/parâmetros de entrada (para
+              decidir se a etapa pode ser pulada)
+    saida: função que devolve o caminho da saída já gerada (ou None)
+    """
+
+    def __init__(self, nome, executar, depende=(), entradas=None, saida=None):
+        self.nome = nome
+        self.executar = executar
+        self.depende = tuple(depende)
+        self.entradas = entradas or (lambda: [])
+        self.saida = saida or (lambda: None)
+
+
+def impressao_digital(entradas):
+    """Arquivos viram [caminho, tamanho, mtime]; demais valores entram como estão."""
+    digital = []
+    for item in entradas:
+        if isinstance(item, str) and os.path.isfile(item):
+            st = os.stat(item)
+            digital.append([os.path.abspath(item), st.st_size, st.st_mtime_ns])
+        else:
+            digital.append(item)
+    # normaliza tuplas/listas para comparar com o que veio do JSON
+    return json.loads(json.dumps(digital, default=str))
+
+
+def _rodar_etapa(etapa, anterior, forcar):
+    with medir("etapa", etapa.nome) as registro:
+        digital = impressao_digital(etapa.entradas())
+        if not forcar and anterior == digital and etapa.saida():
+            registro["situacao"] = "pulada"
+            return "pulada", digital, 0.0
+
+        inicio = time.perf_counter()
+        etapa.executar()
+        registro["situacao"] = "executada"
+        return "executada", digital, time.perf_counter() - inicio
+
+
+class _ExecutorSerial:
+    """Executor que roda cada etapa na própria thread de quem chama (usado sem paralelo)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+    def submit(self, func, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(func(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+
+def executar_dag(etapas, arquivo_estado=None, forcar=False, paralelo=True):
+    """
+    Roda as etapas respeitando as dependências. Com `paralelo`, etapas
+    prontas rodam ao mesmo tempo (threads; a extração já usa processos).
+    Retorna dict nome -> (situação, segundos).
+    """
+    estado = {}
+    if arquivo_estado and os.path.exists(arquivo_estado):
+        with open(arquivo_estado, encoding="utf-8") as f:
+            estado = json.load(f)
+
+    pendentes = {e.nome: e for e in etapas}
+    resultado = {}
+    em_execucao = {}
+
+    # em série as etapas rodam na thread principal (o cProfile só enxerga ela)
+    with ThreadPoolExecutor(max_workers=len(etapas)) if paralelo else _ExecutorSerial() as pool:
+        while pendentes or em_execucao:
+            for nome, etapa in list(pendentes.items()):
+                falhou = [d for d in etapa.depende if resultado.get(d, ("",))[0] in ("falhou", "cancelada")]
+                if falhou:
+                    resultado[nome] = ("cancelada", 0.0)
+                    del pendentes[nome]
+                elif all(resultado.get(d, ("",))[0] in ("executada", "pulada") for d in etapa.depende):
+                    futuro = pool.submit(_rodar_etapa, etapa, estado.get(nome), forcar)
+                    em_execucao[futuro] = nome
+                    del pendentes[nome]
+
+            if not em_execucao:
+                if pendentes:
+                    raise ValueError(f"Dependências inválidas ou circulares: {sorted(pendentes)}")
+                break
+
+            prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                nome = em_execucao.pop(futuro)
+                try:
+                    situacao, digital, segundos = futuro.result()
+                except Exception as e:
+                    print(f"[{nome}] ERRO: {e}")
+                    resultado[nome] = ("falhou", 0.0)
+                    estado.pop(nome, None)
+                    continue
+                resultado[nome] = (situacao, segundos)
+                estado[nome] = digital
+                print(f"[{nome}] {situacao} ({segundos:.1f}s)")
+
+    if arquivo_estado:
+        os.makedirs(os.path.dirname(os.path.abspath(arquivo_estado)), exist_ok=True)
+        with open(arquivo_estado, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=2, ensure_ascii=False)
+
+    return resultado
+
+
+# ---------------------- etapas do ETL ----------------------
+
+def montar_etapas(config):
+    """Monta as 4 etapas do ETL de receitas/despesas a partir da configuração."""
+    extract = config["pasta_extract"]
+    transform = config["pasta_transform"]
+    load = config["pasta_load"]
+    parametros_extract = [
+        config["formato_intermediario"], config["workers"], config["incremental"]
+    ]
+
+    def arquivos_extract():
+        return listar_arquivos(extract) + parametros_extract
+
+    etapas = []
+    # regras de receitas ficam no código: a assinatura delas entra como entrada
+    for tipo, mod_extract, mod_transform, tabelas in [
+        ("receitas", extract_receitas, transform_receitas,
+         [assinatura_regras(transform_receitas.REGRAS_RECEITAS)]),
+        ("despesas", extract_despesas, transform_despesas,
+         [transform_despesas.arquivo_regras, transform_despesas.arquivo_categorias]),
+    ]:
+        nome_raw = mod_extract.NOME_SAIDA
+        etapas.append(Etapa(
+            f"extract_{tipo}",
+            executar=lambda m=mod_extract, t=tipo: m.executar(
+                pasta_load=extract,
+                pasta_saida=transform,
+                formato=config["formato_intermediario"],
+                workers=config["workers"],
+                incremental=config["incremental"],
+                pasta_cache=os.path.join(config["pasta_cache"], t)
+            ),
+            entradas=arquivos_extract,
+            saida=lambda n=nome_raw: localizar_base(transform, n),
+        ))
+        etapas.append(Etapa(
+            f"transform_{tipo}",
+            executar=lambda m=mod_transform: m.executar(
+                transform, load, config["formato_saida"]
+            ),
+            depende=[f"extract_{tipo}"],
+            entradas=lambda n=nome_raw, tab=tabelas: [localizar_base(transform, n)] + tab + [config["formato_saida"]],
+            saida=lambda t=tipo: localizar_base(load, f"{t}_tratadas"),
+        ))
+    return etapas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa o ETL de receitas e despesas (DAG).")
+    parser.add_argument("--config", default=ARQUIVO_CONFIG, help="arquivo JSON de configuração")
+    parser.add_argument("--forcar", action="store_true", help="roda todas as etapas, mesmo sem mudanças")
+    parser.add_argument("--serial", action="store_true", help="roda uma etapa por vez")
+    parser.add_argument("--relatorio", help="arquivo JSON lines das métricas (padrão: config)")
+    parser.add_argument("--tracemalloc", action="store_true", help="mede memória alocada por etapa/passo (mais lento)")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="grava o cProfile da execução (roda em série)")
+    args = parser.parse_args(argv)
+
+    config = carregar_config(args.config)
+    metricas = etl_metricas.Metricas(usar_tracemalloc=args.tracemalloc)
+    etl_metricas.ativar(metricas)
+    # o cProfile só enxerga a thread em que foi ligado: com --perfil roda em série
+    # (a extração em processos aparece só como espera do pool; use workers 1)
+    paralelo = config["paralelo"] and not args.serial and not args.perfil
+    try:
+        if args.perfil:
+            with etl_metricas.perfil(args.perfil):
+                resultado = executar_dag(
+                    montar_etapas(config), config["arquivo_estado"], args.forcar, paralelo=False
+                )
+        else:
+            resultado = executar_dag(
+                montar_etapas(config),
+                arquivo_estado=config["arquivo_estado"],
+                forcar=args.forcar,
+                paralelo=paralelo
+            )
+    finally:
+        etl_metricas.desativar()
+        metricas.salvar_jsonl(args.relatorio or config["arquivo_relatorio"])
+
+    for linha in metricas.resumo():
+        print(linha)
+
+    if any(situacao in ("falhou", "cancelada") for situacao, _ in resultado.values()):
+        print("ETL FINALIZADO COM ERROS!")
+        return 1
+    print("ETL FINALIZADO COM SUCESSO!")
+    return 0
+
+
+# o guard é necessário para o ProcessPoolExecutor (spawn no Windows)
+if __name__ == "__main__":
+    raise SystemExit(main())
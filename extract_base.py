@@ -0,0 +1,167 @@
+# =========================================================
+# ETL - BASE DE EXTRAÇÃO (RECEITAS / DESPESAS)
+# Autor: Victor
+# Descrição: Motor de leitura das planilhas anuais. Cada
+#            arquivo é aberto UMA única vez (read-only) e
+#            apenas o intervalo necessário de cada aba (mês)
+#            é lido, em vez de reabrir o .xlsx por aba.
+# =========================================================
+
+import pandas as pd
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from openpyxl import load_workbook
+from openpyxl.utils import range_boundaries
+
+import etl_metricas
+from etl_metricas import medir
+from valores_na import VALORES_NA
+
+# colunas padrão das bases raw (receitas e despesas)
+COLUNAS = ["descricao", "teto", "realizado"]
+
+
+def listar_arquivos(pasta):
+    """Lista os .xlsx da pasta (ignorando temporários ~$) em ordem alfabética."""
+    return [
+        os.path.join(pasta, f)
+        for f in sorted(os.listdir(pasta))
+        if f.endswith(".xlsx") and not f.startswith("~$")
+    ]
+
+
+def extrair_ano(arquivo):
+    """Ano (4 dígitos) presente no nome do arquivo, como inteiro."""
+    return int(re.search(r"\d{4}", os.path.basename(arquivo)).group())
+
+
+def _converter_celula(valor):
+    # mesmo tratamento do pd.read_excel: vazio e os textos de VALORES_NA
+    # viram NaN e números inteiros gravados como float voltam a ser int
+    if valor is None or (isinstance(valor, str) and valor in VALORES_NA):
+        return float("nan")
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def ler_abas(arquivo, usecols, skiprows=1, nrows=None):
+    """
+    Lê o intervalo `usecols` de todas as abas com uma única abertura do arquivo.
+    Equivale a pd.read_excel(arquivo, sheet_name=aba, usecols=usecols,
+    skiprows=skiprows, nrows=nrows) para cada aba, descartando o cabeçalho.
+    Retorna lista de (nome_aba, DataFrame) na ordem das abas.
+    """
+    min_col, _, max_col, _ = range_boundaries(usecols)
+    # pula `skiprows` linhas + a linha de cabeçalho
+    primeira_linha = skiprows + 2
+    ultima_linha = primeira_linha + nrows - 1 if nrows else None
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True, keep_links=False)
+    try:
+        abas = []
+        for mes in wb.sheetnames:
+            with medir("aba", mes, arquivo=os.path.basename(arquivo)) as registro:
+                linhas = [
+                    [_converter_celula(v) for v in linha]
+                    for linha in wb[mes].iter_rows(
+                        min_row=primeira_linha,
+                        max_row=ultima_linha,
+                        min_col=min_col,
+                        max_col=max_col,
+                        values_only=True
+                    )
+                ]
+                abas.append((mes, pd.DataFrame(linhas, columns=COLUNAS)))
+                registro["linhas_saida"] = len(linhas)
+        return abas
+    finally:
+        wb.close()
+
+
+def extrair_arquivo(arquivo, usecols, skiprows=1, nrows=None, colunas_extras=None):
+    """Extrai todas as abas (meses) de um arquivo e devolve a lista de DataFrames."""
+    ano = extrair_ano(arquivo)
+    print(f"Processando arquivo: {os.path.basename(arquivo)} | Ano: {ano}")
+
+    with medir("arquivo", os.path.basename(arquivo), ano=ano) as registro:
+        lista = []
+        for mes, df in ler_abas(arquivo, usecols, skiprows, nrows):
+            df["mes"] = mes
+            df["ano"] = ano
+            for coluna, valor in (colunas_extras or {}).items():
+                df[coluna] = valor
+
+            df = df.dropna(subset=["descricao"])
+            lista.append(df)
+        registro["linhas_saida"] = sum(len(df) for df in lista)
+    return lista
+
+
+def _extrair_medido(arquivo, usar_tracemalloc, **parametros):
+    # roda no processo filho: as métricas são coletadas localmente e
+    # devolvidas junto com as abas para o coletor do processo principal
+    local = etl_metricas.Metricas(usar_tracemalloc)
+    etl_metricas.ativar(local)
+    try:
+        abas = extrair_arquivo(arquivo, **parametros)
+    finally:
+        etl_metricas.desativar()
+    return abas, local.registros
+
+
+def extrair_arquivos(arquivos, usecols, skiprows=1, nrows=None, colunas_extras=None, workers=1):
+    """
+    Extrai cada arquivo e devolve uma lista (na ordem de `arquivos`) com a
+    lista de DataFrames das abas de cada um.
+    workers: nº de processos para ler os arquivos em paralelo (1 = serial).
+    """
+    if not arquivos:
+        return []
+
+    extrair = partial(
+        extrair_arquivo,
+        usecols=usecols,
+        skiprows=skiprows,
+        nrows=nrows,
+        colunas_extras=colunas_extras
+    )
+
+    workers = min(workers or 1, len(arquivos))
+    if workers <= 1:
+        return [extrair(arquivo) for arquivo in arquivos]
+
+    # cada ano é independente; map devolve na ordem dos arquivos
+    metricas = etl_metricas.coletor()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if metricas is None:
+            return list(pool.map(extrair, arquivos))
+
+        medido = partial(
+            _extrair_medido,
+            usar_tracemalloc=metricas.usar_tracemalloc,
+            usecols=usecols,
+            skiprows=skiprows,
+            nrows=nrows,
+            colunas_extras=colunas_extras
+        )
+        resultados = []
+        for abas, registros in pool.map(medido, arquivos):
+            metricas.adicionar(registros)
+            resultados.append(abas)
+        return resultados
+
+
+def extrair_planilhas(arquivos, usecols, skiprows=1, nrows=None, colunas_extras=None, workers=1):
+    """
+    Consolida todas as abas de todos os arquivos em um único DataFrame
+    (ordem arquivo → aba).
+    colunas_extras: dict coluna -> valor constante (ex.: {"tipo_receita": ""})
+    workers: nº de processos para ler os arquivos em paralelo (1 = serial).
+             O resultado é o mesmo da execução serial, na mesma ordem.
+    """
+    resultados = extrair_arquivos(arquivos, usecols, skiprows, nrows, colunas_extras, workers)
+    lista = [df for abas in resultados for df in abas]
+    return pd.concat(lista, ignore_index=True)
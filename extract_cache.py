@@ -0,0 +1,124 @@
+# =========================================================
+# ETL - CACHE INCREMENTAL DA EXTRAÇÃO
+# Autor: Victor
+# Descrição: Mantém um manifesto (caminho, tamanho, mtime,
+#            hash) de cada planilha anual e as linhas já
+#            extraídas. Só arquivos novos ou alterados são
+#            lidos de novo; a base consolidada é remontada
+#            a partir do cache.
+# =========================================================
+
+import pandas as pd
+import hashlib
+import json
+import os
+
+from extract_base import extrair_arquivos
+
+MANIFESTO = "manifesto.json"
+# incrementar quando o formato das linhas extraídas mudar
+VERSAO_CACHE = 2
+
+
+def hash_arquivo(caminho, bloco=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo (lido em blocos)."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _assinatura(**parametros):
+    # parâmetros da extração: se mudarem, todo o cache é invalidado
+    return json.dumps(parametros, sort_keys=True, default=str)
+
+
+def _carregar_manifesto(pasta_cache, assinatura):
+    caminho = os.path.join(pasta_cache, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as f:
+        manifesto = json.load(f)
+    if manifesto.get("assinatura") != assinatura:
+        return {}
+    return manifesto.get("arquivos", {})
+
+
+def _salvar_manifesto(pasta_cache, assinatura, arquivos):
+    caminho = os.path.join(pasta_cache, MANIFESTO)
+    temp = caminho + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({"assinatura": assinatura, "arquivos": arquivos}, f, indent=2, ensure_ascii=False)
+    # troca atômica: um manifesto pela metade nunca fica no disco
+    os.replace(temp, caminho)
+
+
+def _arquivo_cache(pasta_cache, caminho):
+    nome = hashlib.sha1(caminho.encode("utf-8")).hexdigest()
+    return os.path.join(pasta_cache, f"{nome}.pkl")
+
+
+def _situacao(caminho, entrada):
+    """
+    Compara o arquivo com a entrada do manifesto.
+    Retorna (reaproveitar, nova_entrada). Tamanho + mtime iguais dispensam
+    o hash; se só o mtime mudou, o hash decide.
+    """
+    st = os.stat(caminho)
+    nova = {"tamanho": st.st_size, "mtime": st.st_mtime_ns}
+
+    if entrada and entrada["tamanho"] == st.st_size and entrada["mtime"] == st.st_mtime_ns:
+        nova["hash"] = entrada["hash"]
+        return True, nova
+
+    nova["hash"] = hash_arquivo(caminho)
+    reaproveitar = bool(entrada) and entrada["hash"] == nova["hash"]
+    return reaproveitar, nova
+
+
+def extrair_incremental(arquivos, pasta_cache, usecols, skiprows=1, nrows=None,
+                        colunas_extras=None, workers=1):
+    """
+    Mesmo resultado de extrair_planilhas(), relendo apenas os arquivos novos
+    ou alterados desde a última execução. As abas de cada arquivo ficam em
+    `pasta_cache` e o manifesto guarda tamanho, mtime e hash de cada um.
+    Arquivos que sumiram da pasta saem do manifesto.
+    """
+    os.makedirs(pasta_cache, exist_ok=True)
+    assinatura = _assinatura(
+        versao=VERSAO_CACHE,
+        usecols=usecols, skiprows=skiprows, nrows=nrows, colunas_extras=colunas_extras
+    )
+    manifesto = _carregar_manifesto(pasta_cache, assinatura)
+
+    novo_manifesto = {}
+    pendentes = []
+    for arquivo in arquivos:
+        caminho = os.path.abspath(arquivo)
+        entrada = manifesto.get(caminho)
+        reaproveitar, nova = _situacao(caminho, entrada)
+        if reaproveitar and os.path.exists(_arquivo_cache(pasta_cache, caminho)):
+            print(f"Sem alterações (cache): {os.path.basename(arquivo)}")
+        else:
+            pendentes.append(caminho)
+        novo_manifesto[caminho] = nova
+
+    # relê só o que mudou (em paralelo, se configurado)
+    resultados = extrair_arquivos(pendentes, usecols, skiprows, nrows, colunas_extras, workers)
+    for caminho, abas in zip(pendentes, resultados):
+        pd.to_pickle(abas, _arquivo_cache(pasta_cache, caminho))
+
+    # remove do cache arquivos que não existem mais
+    for caminho in set(manifesto) - set(novo_manifesto):
+        antigo = _arquivo_cache(pasta_cache, caminho)
+        if os.path.exists(antigo):
+            os.remove(antigo)
+
+    _salvar_manifesto(pasta_cache, assinatura, novo_manifesto)
+
+    # remonta a base consolidada na ordem arquivo → aba
+    lista = []
+    for arquivo in arquivos:
+        lista.extend(pd.read_pickle(_arquivo_cache(pasta_cache, os.path.abspath(arquivo))))
+    return pd.concat(lista, ignore_index=True)
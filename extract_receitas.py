@@ -6,54 +6,49 @@
 #            consolida e gera base tratada.
 # =========================================================
 
-import pandas as pd
-import os
-import re
+from extract_base import listar_arquivos, extrair_planilhas
+from extract_cache import extrair_incremental
+from etl_formatos import salvar_base, FORMATO_PADRAO
+from etl_metricas import medir
 
 # CONFIGURAÇÕES
 PASTA_LOAD = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\EXTRACT"
-ARQUIVO_SAIDA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\TRANSFORM\receitas_raw.xlsx"
-
-# LISTA DE ARQUIVOS EXCEL
-arquivos = [
-    os.path.join(PASTA_LOAD, f)
-    for f in os.listdir(PASTA_LOAD)
-    if f.endswith(".xlsx") and not f.startswith("~$")
-]
-
-lista_receitas = []
-
-for arquivo in arquivos:
-
-    nome_arquivo = os.path.basename(arquivo)
-    ano = re.search(r"\d{4}", nome_arquivo).group()
-    print(f"Processando arquivo: {nome_arquivo} | Ano: {ano}")
-    base = pd.ExcelFile(arquivo)
-
-    # LOOP POR ABA (MÊS)
-
-    for mes in base.sheet_names:
-        # RECEITAS TRIBUTADAS (A2:C9)
-        df_trib = pd.read_excel(
-            arquivo,
-            sheet_name=mes,
-            usecols="A:C",
-            skiprows=1,
-            nrows=30
-        )
-
-        df_trib.columns = ["descricao", "teto", "realizado"]
-        df_trib["mes"] = mes
-        df_trib["ano"] = ano
-        df_trib["tipo_receita"] = ""
-
-        df_trib = df_trib.dropna(subset=["descricao"])
-        lista_receitas.append(df_trib)
-
-
-# CONSOLIDAÇÃO FINAL
-df_receitas = pd.concat(lista_receitas, ignore_index=True)
-df_receitas.to_excel(ARQUIVO_SAIDA, index=False)
-
-print("ETL FINALIZADO COM SUCESSO!")
-print(f"Arquivo gerado em: {ARQUIVO_SAIDA}")
\ No newline at end of file
+PASTA_SAIDA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\TRANSFORM"
+NOME_SAIDA = "receitas_raw"
+# formato da base intermediária (parquet, feather, pickle ou xlsx)
+FORMATO = FORMATO_PADRAO
+# nº de processos para ler os arquivos (1 = serial)
+WORKERS = 4
+# cache incremental: só relê planilhas novas ou alteradas
+INCREMENTAL = True
+PASTA_CACHE = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\CACHE\receitas"
+
+def executar(pasta_load=PASTA_LOAD, pasta_saida=PASTA_SAIDA, formato=FORMATO,
+             workers=WORKERS, incremental=INCREMENTAL, pasta_cache=PASTA_CACHE):
+    """Extrai todas as planilhas da pasta e grava a base raw. Retorna o caminho gerado."""
+    # LISTA DE ARQUIVOS EXCEL
+    arquivos = listar_arquivos(pasta_load)
+
+    # CONSOLIDAÇÃO FINAL
+    # leitura única por arquivo: todas as abas (meses) no intervalo A:C
+    parametros = dict(
+        usecols="A:C",
+        skiprows=1,
+        nrows=30,
+        colunas_extras={"tipo_receita": ""},
+        workers=workers
+    )
+    with medir("passo", "extrair receitas", arquivos=len(arquivos)) as registro:
+        if incremental:
+            df_receitas = extrair_incremental(arquivos, pasta_cache, **parametros)
+        else:
+            df_receitas = extrair_planilhas(arquivos, **parametros)
+        registro["linhas_saida"] = len(df_receitas)
+    return salvar_base(df_receitas, pasta_saida, NOME_SAIDA, formato)
+
+# o guard é necessário para o ProcessPoolExecutor (spawn no Windows)
+if __name__ == "__main__":
+    arquivo_saida = executar()
+
+    print("ETL FINALIZADO COM SUCESSO!")
+    print(f"Arquivo gerado em: {arquivo_saida}")
\ No newline at end of file
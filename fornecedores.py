@@ -2,107 +2,18 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import re
 import os
 
-# ---------------------- Helpers ----------------------
+# ---------------------- Tratamento (sem GUI) ----------------------
 
-def get_numbers_from_string(s):
-    try:
-        s = str(s)
-    except:
-        return ""
-    nums = re.findall(r"\d+", s)
-    if not nums:
-        return ""
-    texto = "".join(nums)
-    if all(ch == "0" for ch in texto):
-        return ""
-    return texto
-
-def remover_itens_na_string(s, replacer_mask):
-    try:
-        s = str(s)
-    except:
-        return ""
-    for item, rep in replacer_mask.items():
-        s = s.replace(item, rep)
-    return s
-
-
-# ---------------------- MÁSCARA PADRÃO ----------------------
-
-DEFAULT_REPLACER_MASK = {
-    "S/N": "",
-    "SN": "",
-    "NAN": "",
-    "'": ""
-}
-
-FINAL_COLUMNS_FORNECEDORES = [
-    "fornecedor_id", "cnpj_cpf", "ie", "razao", "fantasia", "fone", "fone2", "email",
-    "email_nfe", "endereco", "numero", "complemento", "bairro",
-    "cidade", "uf", "cep", "ibge", "contato", "observacao"
-]
-
-
-# ---------------------- Classe de Tratamento ----------------------
-
-class FornecedoresTratamento:
-
-    def __init__(self,
-                 numeric_fields=None,
-                 replacer_mask=None,
-                 uppercase_all=True):
-
-        if numeric_fields is None:
-            numeric_fields = [
-                "cnpj_cpf", "cep", "fone", "fone2", "ie", "ibge", "fornecedor_id"
-            ]
-
-        self.numeric_fields = numeric_fields
-        self.replacer_mask = replacer_mask or DEFAULT_REPLACER_MASK.copy()
-        self.uppercase_all = uppercase_all
-
-    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-
-        df = df.dropna(axis=1, how="all").copy()
-
-        # padronizar texto
-        for col in df.columns:
-            if df[col].dtype == object:
-                df[col] = df[col].astype(str)
-                if self.uppercase_all:
-                    df[col] = df[col].str.upper()
-                df[col] = [remover_itens_na_string(x, self.replacer_mask) for x in df[col]]
-
-        # aplicar extração numérica
-        for col in self.numeric_fields:
-            if col in df.columns:
-                df[col] = [get_numbers_from_string(x) for x in df[col].astype(str)]
-
-        # gerar OBSERVAÇÃO final a partir de campos importantes
-        obs_list = []
-        for _, row in df.fillna("").iterrows():
-            temp = []
-
-            if "contato" in df.columns and row["contato"].strip():
-                temp.append(f"Contato: {row['contato']}")
-
-            if "ie" in df.columns and row["ie"].strip():
-                temp.append(f"IE/RG: {row['ie']}")
-
-            obs_list.append("\n".join(temp) if temp else "")
-
-        df["observacao"] = obs_list
-
-        # garantir todas as colunas finais
-        for col in FINAL_COLUMNS_FORNECEDORES:
-            if col not in df.columns:
-                df[col] = ""
-
-        return df[FINAL_COLUMNS_FORNECEDORES]
+# get_numbers_from_string/remover_itens_na_string: reexportados, código antigo os importa daqui
+from cadastro_fornecedores import (FornecedoresTratamento, get_numbers_from_string, match_final_columns,
+                                   remover_itens_na_string)
+from cadastro_export import EXPORT_FORMATS, export_chunks, parse_split_rows, progress_text
+from cadastro_perfis import ProfileStore
+from cadastro_preview import PreviewWindow, parse_preview_rows
+from cadastro_source import LazySource
+from cadastro_worker import BackgroundJob, ProgressPanel
 
 
 # ---------------------- GUI (3 passos) ----------------------
@@ -116,11 +27,11 @@ class FornecedoresGUI:
         self.root.geometry("900x650")
 
         self.filepath = initial_filepath
-        self.df_original = None
-        self.df_mapped = None
+        self.source = None  # arquivo de origem (cabeçalho + amostra; lido inteiro só ao salvar)
 
         # mapeamento das colunas
         self.rename_map = {}
+        self.profiles = None  # perfis de mapeamento salvos (carregados na etapa 2)
 
         self.numeric_vars = {}
         self.uppercase_var = tk.IntVar(value=1)
@@ -128,6 +39,11 @@ class FornecedoresGUI:
         self.replacer_entry_var = tk.StringVar(value="S/N,SN,NAN,'")
         self.extra_numeric_var = tk.StringVar(value="")
 
+        # exportação: formato (xlsx, csv, adsnet) e divisão em arquivos de N linhas
+        self.export_format_var = tk.StringVar(value="xlsx")
+        self.split_rows_var = tk.StringVar(value="")
+        self.preview_rows_var = tk.StringVar(value="50")
+
         self._build_step1()
 
     # ---------------- STEP 1 ----------------
@@ -176,16 +92,13 @@ class FornecedoresGUI:
             return
 
         try:
-            if self.filepath.lower().endswith(".csv"):
-                df = pd.read_csv(self.filepath)
-            else:
-                df = pd.read_excel(self.filepath)
+            # só cabeçalho e amostra: o arquivo inteiro é lido em blocos ao salvar
+            source = LazySource.open(self.filepath)
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao ler arquivo:\n{e}")
             return
 
-        df = df.dropna(axis=1, how="all")
-        self.df_original = df
+        self.source = source
         self._build_step2()
 
     # ---------------- STEP 2 ----------------
@@ -214,22 +127,43 @@ class FornecedoresGUI:
 
         # construir widgets
         self.column_entries = {}
+        suggestions = self._load_profile_suggestions()
+        auto = match_final_columns(self.source.columns)
 
-        for idx, col in enumerate(self.df_original.columns):
+        for idx, col in enumerate(self.source.columns):
             ttk.Label(inner, text=f"{col}").grid(row=idx, column=0, padx=5, pady=3, sticky="w")
 
             entry = ttk.Entry(inner, width=30)
             entry.grid(row=idx, column=1, padx=5, pady=3)
 
-            # se tiver correspondência automática
-            for final_col in FINAL_COLUMNS_FORNECEDORES:
-                if final_col.lower() in col.lower():
-                    entry.insert(0, final_col)
+            # perfil salvo / apelido conhecido; senão correspondência pelo nome
+            if col in suggestions:
+                entry.insert(0, suggestions[col])
+            elif col in auto:
+                entry.insert(0, auto[col])
 
             self.column_entries[col] = entry
 
+        ttk.Label(self.root, text=self.profile_text).pack()
         ttk.Button(self.root, text="Avançar →", command=self._go_step3).pack(pady=12)
 
+    def _load_profile_suggestions(self):
+        # mesmo layout de arquivo já mapeado antes: vem do perfil salvo;
+        # senão, colunas reconhecidas pelos apelidos (sem acento/maiúsculas)
+        try:
+            self.profiles = ProfileStore()
+        except (OSError, ValueError) as e:
+            self.profiles = None
+            self.profile_text = "Perfis de mapeamento indisponíveis"
+            messagebox.showwarning("Aviso", f"Não foi possível ler os perfis de mapeamento:\n{e}")
+            return {}
+        suggestions, profile = self.profiles.suggest("fornecedores", self.source.columns)
+        if profile is not None:
+            self.profile_text = f"Perfil salvo aplicado ({profile['updated'][:10]})"
+        else:
+            self.profile_text = f"{len(suggestions)} de {len(self.source.columns)} colunas reconhecidas"
+        return suggestions
+
     def _go_step3(self):
         mapping = {}
         for orig, entry in self.column_entries.items():
@@ -237,8 +171,20 @@ class FornecedoresGUI:
             mapping[orig] = new_name if new_name else None
 
         self.rename_map = mapping
+        self._save_profile({k: v for k, v in mapping.items() if v},
+                           [k for k, v in mapping.items() if not v])
         self._build_step3()
 
+    def _save_profile(self, rename_map, ignored, options=None):
+        # lembrar o mapeamento (e as opções da etapa 3, ao salvar) deste
+        # layout de arquivo para a próxima vez; o cadastro_cli usa as mesmas
+        if self.profiles is None:
+            return
+        try:
+            self.profiles.save("fornecedores", self.source.columns, rename_map, ignored, options)
+        except OSError as e:
+            messagebox.showwarning("Aviso", f"Não foi possível salvar o perfil de mapeamento:\n{e}")
+
     # ---------------- STEP 3 ----------------
     def _build_step3(self):
         for w in self.root.winfo_children():
@@ -262,18 +208,35 @@ class FornecedoresGUI:
         ttk.Entry(frame, textvariable=self.extra_numeric_var,
                   width=50).pack(anchor="w", pady=4)
 
+        ttk.Label(frame, text="Formato do arquivo final:").pack(anchor="w")
+        ttk.Combobox(frame, textvariable=self.export_format_var,
+                     values=list(EXPORT_FORMATS), state="readonly",
+                     width=12).pack(anchor="w", pady=4)
+
+        # importadores do ERP travam com arquivos muito grandes
+        ttk.Label(frame, text="Dividir o arquivo final a cada N linhas (vazio = arquivo único):").pack(anchor="w")
+        ttk.Entry(frame, textvariable=self.split_rows_var,
+                  width=12).pack(anchor="w", pady=4)
+
+        ttk.Label(frame, text="Linhas no preview (lidas do início do arquivo):").pack(anchor="w")
+        ttk.Entry(frame, textvariable=self.preview_rows_var,
+                  width=12).pack(anchor="w", pady=4)
+
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(pady=10)
 
         ttk.Button(btn_frame, text="Gerar preview",
                    command=self._preview).pack(side="left", padx=10)
 
-        ttk.Button(btn_frame, text="Salvar arquivo final",
-                   command=self._save).pack(side="left", padx=10)
+        self.save_button = ttk.Button(btn_frame, text="Salvar arquivo final",
+                                      command=self._save)
+        self.save_button.pack(side="left", padx=10)
 
-    def _apply_mapping(self):
-        df = self.df_original.copy()
+        # progresso do processamento em segundo plano (com Cancelar)
+        self.progress = ProgressPanel(self.root)
+        self.progress.pack(pady=4)
 
+    def _mapping(self):
         new_cols = {}
         ignored = []
 
@@ -290,22 +253,10 @@ class FornecedoresGUI:
             )
             return None
 
-        df = df.rename(columns=new_cols)
-
-        # drop seguro
-        if ignored:
-            df = df.drop(columns=ignored, errors="ignore")
-
-        return df
-
-    def _preview(self):
-        df = self._apply_mapping()
-        if df is None or df.empty:
-            messagebox.showwarning("Aviso", "Nada a processar após o mapeamento.")
-            return
-
-        df = df.dropna(axis=1, how="all")
+        return new_cols, ignored
 
+    def _options_from_ui(self):
+        # opções da etapa 3 como argumentos do FornecedoresTratamento (vão para o perfil)
         replacer = {
             x.strip(): ""
             for x in self.replacer_entry_var.get().split(",")
@@ -320,83 +271,95 @@ class FornecedoresGUI:
         ]
         extra_numeric = extra_raw if extra_raw else None
 
-        try:
-            tratamento = FornecedoresTratamento(
-                numeric_fields=extra_numeric,
-                replacer_mask=replacer,
-                uppercase_all=bool(self.uppercase_var.get())
-            )
-
-            df_final = tratamento.clean_dataframe(df)
+        return {
+            "numeric_fields": extra_numeric,
+            "replacer_mask": replacer,
+            "uppercase_all": bool(self.uppercase_var.get()),
+        }
 
-        except Exception as e:
-            messagebox.showerror("Erro no Preview", f"Falha ao processar dados:\n{e}")
+    def _preview(self):
+        try:
+            rows = parse_preview_rows(self.preview_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas para o preview.")
             return
 
-        # janela de preview
-        win = tk.Toplevel(self.root)
-        win.title("Preview")
-        win.geometry("900x500")
-
-        tree = ttk.Treeview(win, columns=list(df_final.columns), show="headings")
-        tree.pack(fill="both", expand=True)
-
-        for col in df_final.columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120)
-
-        for _, row in df_final.head(50).iterrows():
-            tree.insert("", "end", values=list(row.values))
-
-        ttk.Button(win, text="Fechar", command=win.destroy).pack(pady=10)
-
-    def _save(self):
-        df = self._apply_mapping()
-        if df is None or df.empty:
+        mapping = self._mapping()
+        if mapping is None:
+            return
+        if self.source.sample.empty:
             messagebox.showwarning("Aviso", "Nada a processar após o mapeamento.")
             return
 
-        df = df.dropna(axis=1, how="all")
+        try:
+            tratamento = FornecedoresTratamento(**self._options_from_ui())
 
-        replacer = {
-            x.strip(): ""
-            for x in self.replacer_entry_var.get().split(",")
-            if x.strip()
-        }
+            # só as linhas exibidas, com cache por mapeamento + opções
+            df_final = self.source.preview(tratamento, *mapping, rows=rows)
 
-        # extra numeric → manter padrão se vazio
-        extra_raw = [
-            x.strip()
-            for x in self.extra_numeric_var.get().split(",")
-            if x.strip()
-        ]
-        extra_numeric = extra_raw if extra_raw else None
+        except Exception as e:
+            messagebox.showerror("Erro no Preview", f"Falha ao processar dados:\n{e}")
+            return
 
-        try:
-            tratamento = FornecedoresTratamento(
-                numeric_fields=extra_numeric,
-                replacer_mask=replacer,
-                uppercase_all=bool(self.uppercase_var.get())
-            )
+        # janela de preview (grade virtualizada, com filtro e ordenação)
+        PreviewWindow(self.root, df_final, title="Preview")
 
-            df_final = tratamento.clean_dataframe(df)
+    def _save(self):
+        try:
+            split_rows = parse_split_rows(self.split_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas por arquivo (ou deixe vazio).")
+            return
 
-        except Exception as e:
-            messagebox.showerror("Erro ao salvar", f"Falha ao processar dados:\n{e}")
+        mapping = self._mapping()
+        if mapping is None:
+            return
+        if self.source.sample.empty:
+            messagebox.showwarning("Aviso", "Nada a processar após o mapeamento.")
             return
+        new_cols, ignored = mapping
+        source = self.source
 
+        options = self._options_from_ui()
+        tratamento = FornecedoresTratamento(**options)
+        self._save_profile(new_cols, ignored, options)
+
+        fmt = self.export_format_var.get()
         out_path = os.path.join(
             os.path.dirname(self.filepath),
-            "fornecedores_tratado.xlsx"
+            "fornecedores_tratado" + EXPORT_FORMATS[fmt][0]
         )
 
-        try:
-            df_final.to_excel(out_path, index=False)
-        except Exception as e:
-            messagebox.showerror("Erro ao salvar arquivo", f"Não foi possível salvar:\n{e}")
-            return
+        def work(report):
+            # roda fora da thread do Tk: nada de widgets aqui, só report()
+            report("Lendo e tratando dados...")
+            # o arquivo é lido, tratado e gravado em blocos (memória limitada ao bloco)
+            chunks = tratamento.clean_chunks(source.chunks(), new_cols, ignored)
+            return export_chunks(
+                chunks, out_path, fmt=fmt, split_rows=split_rows,
+                progress=lambda rows, total: report(progress_text(rows, total), rows, total)
+            )
 
-        messagebox.showinfo("Sucesso", f"Arquivo salvo em:\n{out_path}")
+        self.save_button.config(state="disabled")
+        job = BackgroundJob(self.root, work, self._on_saved, self._on_save_error,
+                            on_progress=self.progress.update,
+                            on_cancelled=self._on_save_cancelled)
+        self.progress.attach(job)
+        job.start()
+
+    def _on_saved(self, paths):
+        self.save_button.config(state="normal")
+        self.progress.reset("Concluído")
+        messagebox.showinfo("Sucesso", "Arquivo salvo em:\n" + "\n".join(paths))
+
+    def _on_save_error(self, e):
+        self.save_button.config(state="normal")
+        self.progress.reset()
+        messagebox.showerror("Erro ao salvar", f"Falha ao processar/salvar os dados:\n{e}")
+
+    def _on_save_cancelled(self):
+        self.save_button.config(state="normal")
+        self.progress.reset("Cancelado: nenhum arquivo foi gravado.")
 
 
 if __name__ == "__main__":
@@ -2,188 +2,16 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import re
 import os
 
-DEFAULT_REPLACER_MASK = {'S/N': '', 'SN': '', 'NAN': '', "'": ''}
-DEFAULT_NUMERIC = ['ncm', 'origem', 'ean13', 'cest']
-
-# ---------------------- Helpers / tratamento ----------------------
-
-def get_numbers_from_string(s):
-    try:
-        s = str(s)
-    except:
-        return ""
-    nums = re.findall(r"\d+", s)
-    if not nums:
-        return ""
-    texto = "".join(nums)
-    if all(ch == "0" for ch in texto):
-        return ""
-    return texto
-
-def remove_items_in_string(s, replacer_mask):
-    try:
-        s = str(s)
-    except:
-        return ""
-    for k, v in replacer_mask.items():
-        s = s.replace(k, v)
-    return s
-
-def normalize_decimal_to_comma(v):
-    # transforma pontos decimais em vírgula (mantém strings vazias)
-    try:
-        s = str(v)
-    except:
-        return ""
-    if s.strip() == "":
-        return ""
-    return s.replace(".", ",")
-
-def clean_decimal_value(s):
-    try:
-        s = str(s).strip().upper()
-    except:
-        return "0"
-
-    if s == "" or s in ["NAN", "NONE"]:
-        return "0"
-
-    # Remover símbolos
-    s = re.sub(r"[^\d,.-]", "", s)
-
-    # Se tiver vírgula e ponto: remover separador de milhares
-    if "," in s and "." in s:
-        # Ex: 1.234,56 → remover ponto
-        if s.rfind(",") > s.rfind("."):
-            s = s.replace(".", "")
-        else:
-            s = s.replace(",", "")
-
-    # Agora padronizar: trocar vírgula por ponto
-    s = s.replace(",", ".")
-
-    try:
-        val = float(s)
-        return f"{val:.2f}".replace(".", ",")  # volta para vírgula
-    except:
-        return "0"
-
-
-# ---------------------- Máscara e colunas finais (ADSNet) ----------------------
-
-MASCARA_FIXA = {
-    'Nome do Produto (120)': 'descricao',
-    'Fornecedor': 'fornece',
-    'Marca (25)': 'marca',
-    'Estoque Atual': 'estoque',
-    'Unidade (06)': 'unidade',
-    'Valor Venda (Tabela Padrão)': 'prvenda',
-    'Valor Custo': 'ccompra',
-    'Peso': 'pesobr',
-    'Código CEST': 'cest',
-    'NCM (8)': 'ncm',
-    'Origem (0 a 8)': 'origem',
-    'Código de Barras (GTIN-8,12,13,14)': 'ean13'
-}
-
-FINAL_COLUMNS_ADSNET = [
-    "produto_id", "descricao", "apresentacao", "marca", "codfab", "ean13",
-    "ncm", "cest", "estoque", "unidade", "fator_cv", "muv", "localizacao",
-    "descricao2", "divisao_id", "fornece", "fornec_id", "trib_icms", "cst",
-    "csosn", "aliq_icms", "pFCP", "pauta", "cicms", "cIpi", "cst_pis",
-    "cst_cofins", "origem", "pesobr", "u_nota", "ccompra", "cmedio",
-    "prvenda", "comissao", "unidade2", "dun14", "pno"
-]
-
-# ---------------------- Classe de tratamento (sem GUI) ----------------------
-
-class ProdutosTratamento:
-    def __init__(self, numeric_fields=None, decimal_fields=None,replacer_mask=None, uppercase_all=True):
-        self.numeric_fields = numeric_fields or DEFAULT_NUMERIC.copy()
-        self.decimal_fields = decimal_fields or []
-        self.replacer_mask = replacer_mask or DEFAULT_REPLACER_MASK.copy()
-        self.uppercase_all = uppercase_all
-
-    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.dropna(axis=1, how='all').copy()
-
-        # transformar textos e aplicar uppercase se solicitado
-        for col in df.columns:
-            if df[col].dtype == object:
-                df[col] = df[col].astype(str)
-                if self.uppercase_all:
-                    df[col] = df[col].str.upper()
-                df[col] = [remove_items_in_string(x, self.replacer_mask) for x in df[col].values]
-
-        # tratar decimais (preços/pesos) se existirem
-        for col in self.decimal_fields:
-            if col in df.columns:
-                df[col] = [clean_decimal_value(x) for x in df[col].astype(str)]
-
-        # aplicar extração numérica nas colunas configuradas
-        for c in self.numeric_fields:
-            if c in df.columns:
-                df[c] = [get_numbers_from_string(x) for x in df[c].astype(str).values]
-
-        # remover trailing ".0" que costumam aparecer em colunas de códigos
-        for c in ['ean13', 'ncm', 'cest']:
-            if c in df.columns:
-                df[c] = df[c].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-
-        # garantir todas as colunas ADSNet existam (preencher vazias)
-        for c in FINAL_COLUMNS_ADSNET:
-            if c not in df.columns:
-                df[c] = ''
-
-        # reordenar e retornar
-        return df[FINAL_COLUMNS_ADSNET]
-
-# ---------------------- Preview Window (Treeview com scroll) ----------------------
-
-class PreviewWindow:
-    def __init__(self, master, df_preview: pd.DataFrame, title="Preview"):
-        self.win = tk.Toplevel(master)
-        self.win.title(title)
-        self.win.geometry("1000x520")
-
-        frame = ttk.Frame(self.win, padding=6)
-        frame.pack(fill='both', expand=True)
-
-        cols = list(df_preview.columns)
-
-        tree_frame = ttk.Frame(frame)
-        tree_frame.pack(fill='both', expand=True)
-
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
-
-        self.tree = ttk.Treeview(tree_frame, columns=cols, show='headings',
-                                 yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        vsb.config(command=self.tree.yview)
-        hsb.config(command=self.tree.xview)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+# ---------------------- Tratamento (sem GUI) ----------------------
 
-        for c in cols:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, width=140, anchor='w')
-
-        for row in df_preview.itertuples(index=False):
-            self.tree.insert('', 'end', values=[str(x) for x in row])
-
-        btns = ttk.Frame(frame)
-        btns.pack(fill='x', pady=6)
-        ttk.Button(btns, text="Fechar", command=self.win.destroy).pack(side='right', padx=6)
+from cadastro_produtos import DEFAULT_NUMERIC, MASCARA_FIXA, ProdutosTratamento
+from cadastro_export import EXPORT_FILETYPES, export_chunks, parse_split_rows, progress_text
+from cadastro_perfis import ProfileStore
+from cadastro_preview import PreviewWindow, parse_preview_rows
+from cadastro_source import PREVIEW_ROWS, LazySource
+from cadastro_worker import BackgroundJob, ProgressPanel
 
 # ---------------------- GUI Produtos (3 etapas) ----------------------
 
@@ -202,16 +30,19 @@ class ProdutosGUI:
         self.root.geometry("900x650")
 
         self.filepath = initial_filepath
-        self.df_original = None
-        self.df_mapped = None
+        self.source = None  # arquivo de origem (cabeçalho + amostra; lido inteiro só ao processar)
+        self.df_sample = None  # amostra já mapeada (colunas da etapa 3 e preview)
 
         self.rename_map = {}
         self.ignored_columns = set()
+        self.profiles = None  # perfis de mapeamento salvos (carregados na etapa 2)
 
         self.numeric_vars = {}
         self.uppercase_var = tk.IntVar(value=1)
         self.replacer_entry_var = tk.StringVar(value="S/N,SN,NAN,'")
         self.extra_numeric_var = tk.StringVar(value="")  # cols comma separated
+        self.split_rows_var = tk.StringVar(value="")  # vazio = arquivo único
+        self.preview_rows_var = tk.StringVar(value=str(PREVIEW_ROWS))
 
         self._build_step1()
 
@@ -255,16 +86,13 @@ class ProdutosGUI:
             messagebox.showwarning("Aviso", "Selecione um arquivo antes de avançar.")
             return
         try:
-            if self.filepath.lower().endswith('.csv'):
-                df = pd.read_csv(self.filepath)
-            else:
-                df = pd.read_excel(self.filepath, skiprows=0)
+            # só cabeçalho e amostra: o arquivo inteiro é lido em blocos ao processar
+            source = LazySource.open(self.filepath)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao ler o arquivo:\n{e}")
             return
 
-        df = df.dropna(axis=1, how='all')
-        self.df_original = df
+        self.source = source
         self._build_step2()
 
     # ---- Step 2: mapear colunas ----
@@ -292,6 +120,7 @@ class ProdutosGUI:
         hsb.pack(side='bottom', fill='x')
 
         self.column_entries = {}
+        suggestions = self._load_profile_suggestions()
 
         # header
         hdr = ttk.Frame(inner)
@@ -299,11 +128,11 @@ class ProdutosGUI:
         ttk.Label(hdr, text="Coluna original", width=50).grid(row=0, column=0, padx=2)
         ttk.Label(hdr, text="Nome destino (deixe em branco para IGNORAR)", width=50).grid(row=0, column=1, padx=2)
 
-        for idx, col in enumerate(self.df_original.columns, start=1):
+        for idx, col in enumerate(self.source.columns, start=1):
             ttk.Label(inner, text=str(col), width=50, anchor='w').grid(row=idx, column=0, padx=2, pady=2, sticky='w')
             ent = ttk.Entry(inner, width=50)
-            # sugestão: se o nome original corresponder a alguma máscara fixa, já preenche
-            sugest = MASCARA_FIXA.get(col, "")
+            # sugestão: perfil salvo ou nome parecido com a máscara fixa / perfis anteriores
+            sugest = suggestions.get(col, MASCARA_FIXA.get(col, ""))
             if sugest:
                 ent.insert(0, sugest)
             self.column_entries[col] = ent
@@ -312,8 +141,36 @@ class ProdutosGUI:
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(fill='x', pady=8)
         ttk.Button(btn_frame, text="← Voltar", command=self._build_step1).pack(side='left', padx=6)
+        ttk.Label(btn_frame, text=self.profile_text).pack(side='left', padx=6)
         ttk.Button(btn_frame, text="Avançar →", command=self._process_step2).pack(side='right', padx=6)
 
+    def _load_profile_suggestions(self):
+        # mesmo layout de arquivo já mapeado antes: vem do perfil salvo;
+        # senão, colunas reconhecidas pelos apelidos (sem acento/maiúsculas)
+        try:
+            self.profiles = ProfileStore()
+        except (OSError, ValueError) as e:
+            self.profiles = None
+            self.profile_text = "Perfis de mapeamento indisponíveis"
+            messagebox.showwarning("Aviso", f"Não foi possível ler os perfis de mapeamento:\n{e}")
+            return {}
+        suggestions, profile = self.profiles.suggest("produtos", self.source.columns)
+        if profile is not None:
+            self.profile_text = f"Perfil salvo aplicado ({profile['updated'][:10]})"
+        else:
+            self.profile_text = f"{len(suggestions)} de {len(self.source.columns)} colunas reconhecidas"
+        return suggestions
+
+    def _save_profile(self, rename_map, ignored, options=None):
+        # lembrar o mapeamento (e as opções da etapa 3, ao processar) deste
+        # layout de arquivo para a próxima vez; o cadastro_cli usa as mesmas
+        if self.profiles is None:
+            return
+        try:
+            self.profiles.save("produtos", self.source.columns, rename_map, ignored, options)
+        except OSError as e:
+            messagebox.showwarning("Aviso", f"Não foi possível salvar o perfil de mapeamento:\n{e}")
+
     def _process_step2(self):
         rename_map = {}
         ignored = set()
@@ -324,12 +181,11 @@ class ProdutosGUI:
             else:
                 rename_map[orig] = val
 
-        df = self.df_original.rename(columns=rename_map).copy()
-        df.drop(columns=list(ignored), inplace=True, errors='ignore')
-
-        self.df_mapped = df
+        # renome só na amostra: o arquivo inteiro é lido ao processar
+        self.df_sample = self.source.mapped_sample(rename_map, ignored)
         self.rename_map = rename_map
         self.ignored_columns = ignored
+        self._save_profile(rename_map, ignored)
 
         self._build_step3()
 
@@ -356,6 +212,13 @@ class ProdutosGUI:
         self.decimal_columns_var = tk.StringVar(value="")
         ttk.Entry(frame, textvariable=self.decimal_columns_var,width=50).pack(anchor="w", pady=4)
 
+        # importadores do ERP travam com arquivos muito grandes
+        ttk.Label(frame, text="Dividir o arquivo final a cada N linhas (vazio = arquivo único):").pack(anchor='w', pady=4)
+        ttk.Entry(frame, textvariable=self.split_rows_var, width=12).pack(anchor='w')
+
+        ttk.Label(frame, text="Linhas no preview (lidas do início do arquivo):").pack(anchor='w', pady=4)
+        ttk.Entry(frame, textvariable=self.preview_rows_var, width=12).pack(anchor='w')
+
         ttk.Label(frame, text="Marque as colunas que devem ficar apenas com números:", font=("Arial", 11)).pack(anchor='w', pady=8)
         cols_container = ttk.Frame(frame)
         cols_container.pack(fill='both', expand=True)
@@ -370,7 +233,7 @@ class ProdutosGUI:
         vsb.pack(side='right', fill='y')
 
         self.numeric_vars = {}
-        for idx, col in enumerate(self.df_mapped.columns):
+        for idx, col in enumerate(self.df_sample.columns):
             initial = 1 if col.lower() in DEFAULT_NUMERIC else 0
             var = tk.IntVar(value=initial)
             cb = ttk.Checkbutton(inner, text=col, variable=var)
@@ -379,20 +242,37 @@ class ProdutosGUI:
 
         btn_frame = ttk.Frame(self.root)
         btn_frame.pack(fill='x', pady=8)
-        ttk.Button(btn_frame, text="← Voltar", command=self._build_step2).pack(side='left', padx=6)
+        self.back_button = ttk.Button(btn_frame, text="← Voltar", command=self._build_step2)
+        self.back_button.pack(side='left', padx=6)
         ttk.Button(btn_frame, text="Visualizar preview", command=self._show_preview).pack(side='left', padx=6)
-        ttk.Button(btn_frame, text="Processar e Salvar", command=self._process_and_save).pack(side='right', padx=6)
+        self.process_button = ttk.Button(btn_frame, text="Processar e Salvar", command=self._process_and_save)
+        self.process_button.pack(side='right', padx=6)
+
+        # progresso do processamento em segundo plano (com Cancelar)
+        self.progress = ProgressPanel(self.root)
+        self.progress.pack(fill='x', padx=8, pady=4)
 
     def _show_preview(self):
+        try:
+            rows = parse_preview_rows(self.preview_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas para o preview.")
+            return
+
         tratador = self._build_tratador_from_ui()
         try:
-            df_preview = tratador.clean_dataframe(self.df_mapped.copy())
+            # só as linhas exibidas, com cache por mapeamento + opções
+            df_preview = self.source.preview(tratador, self.rename_map, self.ignored_columns, rows)
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar preview:\n{e}")
             return
-        PreviewWindow(self.root, df_preview.head(200), title="Preview - Produtos (primeiras linhas)")
+        PreviewWindow(self.root, df_preview, title="Preview - Produtos (primeiras linhas)")
 
     def _build_tratador_from_ui(self):
+        return ProdutosTratamento(**self._options_from_ui())
+
+    def _options_from_ui(self):
+        # opções da etapa 3 como argumentos do ProdutosTratamento (vão para o perfil)
         numeric_selected = [c for c, var in self.numeric_vars.items() if var.get() == 1]
         extra_txt = self.extra_numeric_var.get().strip()
         extra_list = [s.strip() for s in extra_txt.split(',') if s.strip()] if extra_txt else []
@@ -410,41 +290,72 @@ class ProdutosGUI:
         if decimal_list:
             numeric_final = [c for c in numeric_final if c not in decimal_list]
 
-        tratador = ProdutosTratamento(
-            numeric_fields=numeric_final,
-            decimal_fields=decimal_list,
-            replacer_mask=replacer_mask,
-            uppercase_all=bool(self.uppercase_var.get())
-        )
-
-        return tratador
+        return {
+            "numeric_fields": numeric_final,
+            "decimal_fields": decimal_list,
+            "replacer_mask": replacer_mask,
+            "uppercase_all": bool(self.uppercase_var.get()),
+        }
 
     def _process_and_save(self):
-        tratador = self._build_tratador_from_ui()
         try:
-            df_final = tratador.clean_dataframe(self.df_mapped.copy())
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar dados:\n{e}")
+            split_rows = parse_split_rows(self.split_rows_var.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "Informe um número inteiro de linhas por arquivo (ou deixe vazio).")
             return
 
+        options = self._options_from_ui()
+        tratador = ProdutosTratamento(**options)
+
+        # Pergunta onde salvar antes: o processamento roda em segundo plano
         default_dir = os.path.dirname(self.filepath) if self.filepath else os.getcwd()
         suggested_name = os.path.join(default_dir, os.path.basename(os.path.splitext(self.filepath)[0]) + " - Produtos Tratado.xlsx")
         out_path = filedialog.asksaveasfilename(defaultextension=".xlsx",
                                                 initialfile=os.path.basename(suggested_name),
                                                 initialdir=default_dir,
-                                                filetypes=[("Excel Files", "*.xlsx *.xls")])
+                                                filetypes=EXPORT_FILETYPES)
         if not out_path:
             return
-        try:
-            df_final.to_excel(out_path, index=False)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao salvar o arquivo:\n{e}")
-            return
-
-        messagebox.showinfo("Concluído", f"Arquivo salvo em:\n{out_path}")
+        self._save_profile(self.rename_map, self.ignored_columns, options)
+
+        source, rename_map, ignored = self.source, self.rename_map, self.ignored_columns
+
+        def work(report):
+            # roda fora da thread do Tk: nada de widgets aqui, só report()
+            report("Lendo e tratando dados...")
+            # o arquivo é lido, tratado e gravado em blocos (memória limitada ao bloco)
+            chunks = tratador.clean_chunks(source.chunks(), rename_map, ignored)
+            # formato pela extensão: .xlsx, .csv ou .txt (ADSNet)
+            return export_chunks(chunks, out_path, split_rows=split_rows,
+                                 progress=lambda rows, total: report(progress_text(rows, total), rows, total))
+
+        self._set_running(True)
+        job = BackgroundJob(self.root, work, self._on_saved, self._on_save_error,
+                            on_progress=self.progress.update, on_cancelled=self._on_save_cancelled)
+        self.progress.attach(job)
+        job.start()
+
+    def _set_running(self, running):
+        state = 'disabled' if running else 'normal'
+        self.process_button.config(state=state)
+        self.back_button.config(state=state)
+
+    def _on_saved(self, paths):
+        self._set_running(False)
+        self.progress.reset("Concluído")
+        messagebox.showinfo("Concluído", "Arquivo salvo em:\n" + "\n".join(paths))
         if isinstance(self.root, tk.Toplevel):
             self.root.destroy()
 
+    def _on_save_error(self, e):
+        self._set_running(False)
+        self.progress.reset()
+        messagebox.showerror("Erro", f"Erro ao processar/salvar os dados:\n{e}")
+
+    def _on_save_cancelled(self):
+        self._set_running(False)
+        self.progress.reset("Cancelado: nenhum arquivo foi gravado.")
+
     # start/helper
     def start(self):
         if isinstance(self.root, tk.Tk):
@@ -0,0 +1,294 @@
+# =========================================================
+# ETL - BASE DO TRANSFORM (RECEITAS / DESPESAS)
+# Autor: Victor
+# Descrição: Normalização e regras de padronização vetorizadas
+#            (operações .str e máscaras booleanas), aplicadas
+#            sobre as descrições distintas da base.
+# =========================================================
+
+import pandas as pd
+import numpy as np
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+
+def normalizar_serie(serie):
+    """
+    Normaliza uma série só de textos (descrições das planilhas):
+    caixa baixa, sem acentos, só letras/números/espaço e espaços simples.
+    """
+    return (
+        serie.str.lower()
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("utf-8")
+        .str.replace(r"[^a-z0-9\s]", "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _contem_algum(serie, termos):
+    padrao = "|".join(re.escape(t) for t in termos)
+    return serie.str.contains(padrao, regex=True)
+
+
+def aplicar_regras(serie, regras):
+    """
+    Aplica regras de padronização a uma série só de textos (já normalizados).
+    regras: lista de (prefixos, [(termos, resultado), ...], padrao)
+      - o grupo vale para textos que começam com algum dos prefixos;
+      - dentro do grupo, vale o primeiro (termos, resultado) em que algum
+        termo está contido no texto;
+      - sem termo encontrado, usa `padrao` (None = mantém o texto).
+    Vale o primeiro grupo que casar (first-match-wins).
+    """
+    resultado = serie.copy()
+    livre = pd.Series(True, index=serie.index)
+
+    for prefixos, regras_grupo, padrao in regras:
+        grupo = livre & serie.str.startswith(tuple(prefixos))
+        if not grupo.any():
+            continue
+
+        pendente = grupo.copy()
+        for termos, valor in regras_grupo:
+            casou = pendente & _contem_algum(serie, termos)
+            resultado[casou] = valor
+            pendente &= ~casou
+
+        if padrao is not None:
+            resultado[pendente] = padrao
+
+        livre &= ~grupo
+
+    return resultado
+
+
+# ---------------------- regras declarativas (tabela) ----------------------
+
+# como cada tipo de termo vira um teste ancorado no início do texto
+_TIPOS_TERMO = {
+    "prefixo": lambda termo: f"(?={re.escape(termo)})",
+    "contem": lambda termo: f"(?=.*?{re.escape(termo)})",
+    "regex": lambda termo: f"(?=.*?(?:{termo}))",
+}
+
+
+def _alternacao(opcoes):
+    """
+    Une as opções [[teste, ...], ...] em UMA regex ordenada. A alternância
+    do `re` tenta as opções da esquerda para a direita, então o grupo
+    nomeado que casar é sempre o primeiro da tabela (first-match-wins).
+    """
+    partes = [f"(?P<g{i}>{'|'.join(testes)})" for i, testes in enumerate(opcoes)]
+    return re.compile("^(?:" + "|".join(partes) + ")")
+
+
+def _primeiro_casamento(textos, regex):
+    # índice da opção que casou em cada texto (-1 = nenhuma); só os grupos
+    # g0..gN contam: grupos de captura dentro de um termo regex viram
+    # colunas extras no extract
+    opcoes = [f"g{i}" for i in range(len(regex.groupindex))]
+    casamentos = textos.str.extract(regex)[opcoes].notna().to_numpy()
+    return np.where(casamentos.any(axis=1), casamentos.argmax(axis=1), -1)
+
+
+class MotorRegras:
+    """
+    Regras de padronização lidas de uma tabela e compiladas uma única vez.
+    Cada linha da tabela tem: grupo, papel, tipo, termo, resultado.
+      - papel "gatilho": o texto entra no grupo se o termo casar;
+      - papel "regra": dentro do grupo, a primeira que casar dá o resultado;
+      - papel "padrao": resultado do grupo quando nenhuma regra casa
+        (sem linha padrao o texto fica como está).
+    tipo: prefixo, contem ou regex (sem grupos nomeados). Grupos e regras
+    valem na ordem da tabela.
+    """
+
+    def __init__(self, linhas):
+        grupos = {}
+        for n, linha in enumerate(linhas, start=2):
+            nome = linha["grupo"].strip()
+            papel = linha["papel"].strip()
+            grupo = grupos.setdefault(nome, {"gatilhos": [], "regras": [], "padrao": None})
+
+            if papel == "padrao":
+                grupo["padrao"] = linha["resultado"]
+                continue
+            tipo = linha["tipo"].strip()
+            if tipo not in _TIPOS_TERMO or papel not in ("gatilho", "regra"):
+                raise ValueError(f"Linha {n} da tabela de regras inválida: {linha}")
+
+            if tipo == "regex":
+                try:
+                    nomeados = re.compile(linha["termo"]).groupindex
+                except re.error as erro:
+                    raise ValueError(f"Linha {n} da tabela de regras: regex inválida ({erro}): {linha}")
+                if nomeados:
+                    raise ValueError(f"Linha {n} da tabela de regras: regex com grupo nomeado: {linha}")
+
+            teste = _TIPOS_TERMO[tipo](linha["termo"])
+            if papel == "gatilho":
+                grupo["gatilhos"].append(teste)
+            else:
+                grupo["regras"].append((teste, linha["resultado"]))
+
+        sem_gatilho = [nome for nome, g in grupos.items() if not g["gatilhos"]]
+        if sem_gatilho:
+            raise ValueError(f"Grupos sem gatilho na tabela de regras: {sem_gatilho}")
+
+        self.grupos = list(grupos)
+        self._gatilhos = _alternacao([g["gatilhos"] for g in grupos.values()])
+        self._regras = [
+            (
+                _alternacao([[teste] for teste, _ in g["regras"]]) if g["regras"] else None,
+                np.array([resultado for _, resultado in g["regras"]], dtype=object),
+                g["padrao"],
+            )
+            for g in grupos.values()
+        ]
+
+    @classmethod
+    def de_csv(cls, caminho):
+        """Carrega a tabela de regras de um CSV separado por ';'."""
+        with open(caminho, encoding="utf-8", newline="") as f:
+            return cls(list(csv.DictReader(f, delimiter=";")))
+
+    def aplicar(self, textos):
+        """Aplica as regras a uma série só de textos (já normalizados)."""
+        resultado = textos.to_numpy(dtype=object, copy=True)
+        grupo_de = _primeiro_casamento(textos, self._gatilhos)
+
+        for i, (regex, resultados, padrao) in enumerate(self._regras):
+            linhas = np.flatnonzero(grupo_de == i)
+            if len(linhas) == 0:
+                continue
+            regra_de = (
+                _primeiro_casamento(textos.iloc[linhas], regex)
+                if regex is not None else np.full(len(linhas), -1)
+            )
+            casou = regra_de >= 0
+            resultado[linhas[casou]] = resultados[regra_de[casou]]
+            if padrao is not None:
+                resultado[linhas[~casou]] = padrao
+
+        return pd.Series(resultado, index=textos.index)
+
+
+def carregar_categorias(caminho):
+    """Lê o CSV 'termo;categoria' e devolve o dicionário de mapeamento."""
+    with open(caminho, encoding="utf-8", newline="") as f:
+        return {linha["termo"]: linha["categoria"] for linha in csv.DictReader(f, delimiter=";")}
+
+
+# ---------------------- memo de descrições ----------------------
+
+_FALTA = object()
+
+
+class MemoLRU:
+    """
+    Memo limitado (LRU) texto original -> texto padronizado. Se `arquivo` for
+    informado, é carregado do disco e pode ser gravado com salvar(), sendo
+    reaproveitado entre execuções. `assinatura` identifica as regras que
+    geraram os resultados: se mudar, o conteúdo gravado é descartado.
+    """
+
+    def __init__(self, maxsize=50000, arquivo=None, assinatura=""):
+        self.maxsize = maxsize
+        self.arquivo = arquivo
+        self.assinatura = assinatura
+        self._itens = OrderedDict()
+        if arquivo and os.path.exists(arquivo):
+            self.carregar()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave, padrao=None):
+        if chave not in self._itens:
+            return padrao
+        self._itens.move_to_end(chave)
+        return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.maxsize:
+            self._itens.popitem(last=False)
+
+    def carregar(self):
+        with open(self.arquivo, encoding="utf-8") as f:
+            dados = json.load(f)
+        if dados.get("assinatura") != self.assinatura:
+            return
+        for chave, valor in dados.get("itens", []):
+            self.guardar(chave, valor)
+
+    def salvar(self):
+        if not self.arquivo:
+            return
+        temp = self.arquivo + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            # do menos para o mais recente: a ordem LRU sobrevive à recarga
+            json.dump({"assinatura": self.assinatura, "itens": list(self._itens.items())}, f, ensure_ascii=False)
+        os.replace(temp, self.arquivo)
+
+
+def _aplicar_com_memo(textos, func, memo):
+    resultados = [memo.obter(t, _FALTA) for t in textos]
+    faltam = [i for i, r in enumerate(resultados) if r is _FALTA]
+    if faltam:
+        novos = func(textos.iloc[faltam]).to_numpy()
+        for i, valor in zip(faltam, novos):
+            resultados[i] = valor
+            memo.guardar(textos.iloc[i], valor)
+    return np.array(resultados, dtype=object)
+
+
+def por_valores_distintos(serie, func, memo=None):
+    """
+    Aplica `func` (série de textos -> série) apenas aos textos DISTINTOS de
+    `serie` e devolve o resultado alinhado às linhas originais. Valores que
+    não são texto (NaN, números) passam intactos, como nas funções por linha.
+    memo: MemoLRU opcional; textos já vistos (nesta ou em outra execução)
+          nem chegam a `func`.
+    """
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Series(unicos, dtype=object)
+    eh_texto = np.fromiter((isinstance(v, str) for v in unicos), dtype=bool, count=len(unicos))
+
+    transformados = unicos.to_numpy(copy=True)
+    if eh_texto.any():
+        if memo is None:
+            transformados[eh_texto] = func(unicos[eh_texto]).to_numpy()
+        else:
+            transformados[eh_texto] = _aplicar_com_memo(unicos[eh_texto], func, memo)
+
+    valores = serie.to_numpy(dtype=object, copy=True)
+    linhas = codigos >= 0
+    linhas[linhas] = eh_texto[codigos[linhas]]
+    valores[linhas] = transformados[codigos[linhas]]
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def mapear_distintos(serie, mapeamento, padrao):
+    """
+    Equivale a serie.apply(lambda v: mapeamento.get(v, padrao)): o dicionário é
+    consultado uma vez por valor distinto e o resultado volta às linhas pelos
+    códigos do factorize.
+    """
+    codigos, unicos = pd.factorize(serie)
+    mapeados = np.array([mapeamento.get(v, padrao) for v in unicos] + [padrao], dtype=object)
+    # código -1 (NaN) aponta para o último item: o padrão
+    return pd.Series(mapeados[codigos], index=serie.index, name=serie.name)
+
+
+def assinatura_regras(*partes):
+    """Hash curto das regras (tabelas/listas) para versionar o memo gravado."""
+    return hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()[:16]
@@ -5,114 +5,87 @@
 # =========================================================
 
 import pandas as pd
-import re
-import unicodedata
+import os
+
+from etl_formatos import ler_base, salvar_base
+from etl_metricas import medir
+from transform_base import (
+    MotorRegras, carregar_categorias, normalizar_serie, por_valores_distintos,
+    mapear_distintos, MemoLRU, assinatura_regras
+)
 
 # configurações
-arquivo_entrada = r"d:\arquivos\python\controle financeiro pessoal\etl\transform\despesas_raw.xlsx"
-arquivo_saida = r"d:\arquivos\python\controle financeiro pessoal\etl\load\despesas_tratadas.xlsx"
+pasta_entrada = r"d:\arquivos\python\controle financeiro pessoal\etl\transform"
+nome_entrada = "despesas_raw"
+pasta_saida = r"d:\arquivos\python\controle financeiro pessoal\etl\load"
+nome_saida = "despesas_tratadas"
+# formato da base final (load); xlsx para o bi, parquet/feather/pickle se preferir
+formato_saida = "xlsx"
+# memo das descrições já padronizadas, reaproveitado entre execuções
+# (gravado na pasta de entrada)
+nome_memo = "memo_despesas.json"
+memo_max = 50000
+
+# tabelas de regras e categorias (editáveis, sem mexer no código)
+pasta_tabelas = os.path.dirname(os.path.abspath(__file__))
+arquivo_regras = os.path.join(pasta_tabelas, "regras_despesas.csv")
+arquivo_categorias = os.path.join(pasta_tabelas, "categorias_despesas.csv")
+
+# compilados uma única vez, na carga do módulo
+motor = MotorRegras.de_csv(arquivo_regras)
+mapeamento_categorias = carregar_categorias(arquivo_categorias)
+
+def _padronizar_textos(textos):
+    return motor.aplicar(normalizar_serie(textos))
 
 def motor_de_regras(texto):
     if not isinstance(texto, str):
         return texto
-
-    # normalização básica
-    t = texto.lower()
-    t = unicodedata.normalize("NFKD", t).encode("ascii", "ignore").decode("utf-8")
-    t = re.sub(r"[^a-z0-9\s]", "", t)
-    t = re.sub(r"\s+", " ", t).strip()
-
-    # regras específicas
-    if "aporte" in t or re.search(r"\b\d+\s*investimento\b", t):
-        if "caixa" in t:
-            return "aporte de caixa"
-        if "carro" in t:
-            return "aporte para carro"
-        return "aporte de investimento"
-
-    if t.startswith("nu"):
-        if "victor" in t:
-            return "nubank victor"
-        if "suellyn" in t:
-            return "nubank suellyn"
-        return t
-
-    if t.startswith("coisas") or t.startswith("coisa"):
-        if "conrado" in t or t.startswith("coisa"):
-            return "coisas conrado"
-        if "casa" in t:
-            return "coisas casa"
-        if "carro" in t:
-            return "coisas carro"
-        return t
-
-    if t.startswith("parcela"):
-        return "parcela carro"
-
-    if t.startswith("quitar"):
-        return "quitar menor divida"
-
-    return t
+    return _padronizar_textos(pd.Series([texto], dtype=object)).iloc[0]
 
 def definir_categoria(texto_normalizado):
-    # dicionário de mapeamento: "termo_chave": "categoria"
-    mapeamento_categorias = {
-        # --- Deus ---
-        "dizimo": "Deus",
-        "oferta" : "Deus",
-
-        # --- investimentos ---
-        "aporte de caixa": "caixa",
-        "aporte para carro": "investimentos",
-        "aporte de investimento": "investimentos",
-        "conrado": "investimentos",
-        "bernardo": "investimentos",
-        
-        # --- cartões e bancos ---
-        "nubank victor": "cartao de credito",
-        "nubank suellyn": "cartao de credito",
-        "xp casal": "cartao de credito",
-        
-        # --- moradia e família ---
-        "coisas casa": "moradia",
-        "coisas conrado": "dependentes",
-        "aluguel": "moradia",
-        "energia": "moradia",
-        "internet": "moradia",
-        "felicidade suellyn": "lazer",
-        "felicidade victor": "lazer",
-        
-        # --- transporte ---
-        "coisas carro": "transporte",
-        "parcela carro": "transporte",
-        "combustivel": "transporte",
-        "gasolina": "transporte",
-        "uber": "transporte",
-        
-        # --- dívidas ---
-        "quitar menor divida": "dividas",
-        "financiamento casa": "dividas",
-        
-        # --- alimentaçao e consumo (exemplos comuns) ---
-        "ifood": "alimentacao",
-        "supermercado": "alimentacao",
-        "restaurante": "lazer",
-        "farmacia": "saude",
-    }
-    
+    # dicionário de mapeamento "termo_chave": "categoria" em categorias_despesas.csv
     return mapeamento_categorias.get(texto_normalizado, "outros")
-# leitura da base raw
-df = pd.read_excel(arquivo_entrada)
 
-# cria coluna normalizada
-df["descricao_normalizada"] = df["descricao"].apply(motor_de_regras)
-df["categoria"] = df["descricao_normalizada"].apply(definir_categoria)
+def criar_memo(arquivo=None):
+    # a assinatura muda quando a tabela de regras é editada
+    with open(arquivo_regras, encoding="utf-8") as f:
+        return MemoLRU(memo_max, arquivo, assinatura=assinatura_regras(f.read()))
+
+def padronizar_descricoes(serie, memo=None):
+    """equivale a serie.apply(motor_de_regras), processando só as descrições distintas."""
+    return por_valores_distintos(serie, _padronizar_textos, memo)
+
+def definir_categorias(serie):
+    """equivale a serie.apply(definir_categoria), consultando cada descrição distinta uma vez."""
+    return mapear_distintos(serie, mapeamento_categorias, "outros")
+
+def transformar(df, memo=None):
+    with medir("passo", "transformar despesas", linhas_entrada=len(df)) as registro:
+        # cria coluna normalizada
+        with medir("passo", "motor de regras", linhas_entrada=len(df)):
+            df["descricao_normalizada"] = padronizar_descricoes(df["descricao"], memo)
+        df["categoria"] = definir_categorias(df["descricao_normalizada"])
+
+        tupla_linhas = ("TOTAL", "DESCRICAO")
+        df = df.drop(df[df["descricao"].isin(tupla_linhas)].index)
+        registro["linhas_saida"] = len(df)
+    return df
+
+def executar(pasta_entrada=pasta_entrada, pasta_saida=pasta_saida, formato_saida=formato_saida):
+    """lê a base raw, aplica o motor de regras e grava a base tratada. retorna o caminho gerado."""
+    # leitura da base raw
+    df = ler_base(pasta_entrada, nome_entrada)
+
+    memo = criar_memo(os.path.join(pasta_entrada, nome_memo))
+    df = transformar(df, memo)
+    memo.salvar()
 
-tupla_linhas = ("TOTAL", "DESCRICAO")
-df = df.drop(df[df["descricao"].isin(tupla_linhas)].index)
+    # salva base tratada
+    return salvar_base(df, pasta_saida, nome_saida, formato_saida)
 
-# salva base tratada
-df.to_excel(arquivo_saida, index=False)
+if __name__ == "__main__":
+    arquivo_saida = executar()
 
-print("transform finalizado com sucesso!")
-print(f"arquivo gerado em: {arquivo_saida}")
\ No newline at end of file
+    print("transform finalizado com sucesso!")
+    print(f"arquivo gerado em: {arquivo_saida}")
\ No newline at end of file
@@ -5,129 +5,110 @@
 # =========================================================
 
 import pandas as pd
-import re
-import unicodedata
+import numpy as np
+import os
+
+from etl_formatos import ler_base, salvar_base
+from etl_metricas import medir
+from transform_base import (
+    normalizar_serie, aplicar_regras, por_valores_distintos, MemoLRU, assinatura_regras
+)
 
 # CONFIGURAÇÕES
-ARQUIVO_ENTRADA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\TRANSFORM\receitas_raw.xlsx"
-ARQUIVO_SAIDA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\LOAD\receitas_tratadas.xlsx"
+PASTA_ENTRADA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\TRANSFORM"
+NOME_ENTRADA = "receitas_raw"
+PASTA_SAIDA = r"D:\ARQUIVOS\Python\Controle Financeiro Pessoal\ETL\LOAD"
+NOME_SAIDA = "receitas_tratadas"
+# formato da base final (LOAD); xlsx para o BI, parquet/feather/pickle se preferir
+FORMATO_SAIDA = "xlsx"
+# memo das descrições já padronizadas, reaproveitado entre execuções
+# (gravado na pasta de entrada)
+NOME_MEMO = "memo_receitas.json"
+MEMO_MAX = 50000
     
-def normalizar_texto(texto):
+# ---------------------- regras de padronização ----------------------
+# em forma de tabela (aplicadas por transform_base.aplicar_regras):
+# (prefixos, [(termos contidos, resultado), ...], padrão do grupo)
+REGRAS_RECEITAS = [
+    (("bonificacao",), [
+        (("victor",), "bonificacao Victor"),
+        (("suelynn", "suely", "suellyn"), "bonificacao Suellyn"),
+    ], "bonificacao Suellyn"),
+    (("13",), [
+        (("victor",), "13 Victor"),
+        (("suelynn", "suely", "suellyn"), "13 Suellyn"),
+    ], None),
+    (("ticket",), [], "vale alimentacao"),
+    (("vale",), [
+        (("refeicao",), "vale alimentacao"),
+    ], None),
+    (("comissao",), [
+        (("magalu",), "parceiro magalu"),
+    ], "comissao victor"),
+    (("fgts",), [
+        (("victor",), "fgts victor"),
+        (("suelynn", "suely", "suellyn", "varoa"), "fgts suellyn"),
+    ], None),
+    (("seguro",), [], "seguro desemprego"),
+]
+
+def _padronizar_textos(textos):
+    return aplicar_regras(normalizar_serie(textos), REGRAS_RECEITAS)
+
+def _tipo_receita_textos(textos):
+    return pd.Series(
+        np.where(textos.str.startswith("vale"), "Nao Tributada", "Tributada"),
+        index=textos.index
+    )
+
+def padronizar_descricao(texto):
     if not isinstance(texto, str):
         return texto
-    # lower case
-    texto = texto.lower()
-    # remover acentos
-    texto = unicodedata.normalize("NFKD", texto)
-    texto = texto.encode("ASCII", "ignore").decode("utf-8")
-    # remover caracteres especiais (mantém letras, números e espaço)
-    texto = re.sub(r"[^a-z0-9\s]", "", texto)
-    # remover espaços duplicados
-    texto = re.sub(r"\s+", " ", texto).strip()
-
-    return texto
-
-def padronizar_13(texto):
-    if not isinstance(texto, str):
-        return texto
-    t = texto
-    if t.startswith("13"):
-        if "victor" in t:
-            return "13 Victor"
-        if "suelynn" in t or "suely" in t or "suellyn" in t:
-            return "13 Suellyn"
-    return texto
-
-def padronizar_bonificacao(texto):
-    if not isinstance(texto, str):
-        return texto
-    t = texto
-
-    if t.startswith("bonificacao"):
-        if "victor" in t:
-            return "bonificacao Victor"
-        if "suelynn" in t or "suely" in t or "suellyn" in t:
-            return "bonificacao Suellyn"
-        else:
-            return "bonificacao Suellyn"
-    return texto
-
-def padronizar_vales(texto):
+    return _padronizar_textos(pd.Series([texto], dtype=object)).iloc[0]
+
+def tipo_receita(texto):
     if not isinstance(texto, str):
         return texto
-    t = texto
+    return _tipo_receita_textos(pd.Series([texto], dtype=object)).iloc[0]
 
-    if t.startswith("ticket"):
-        return "vale alimentacao"
-    
-    if t.startswith("vale"):
-        if "refeicao" in t:
-            return "vale alimentacao"
-    return texto
+def criar_memo(arquivo=None):
+    return MemoLRU(MEMO_MAX, arquivo, assinatura=assinatura_regras(REGRAS_RECEITAS))
 
-def padronizar_comissao(texto):
-    if not isinstance(texto, str):
-        return texto
-    t = texto
+def padronizar_descricoes(serie, memo=None):
+    """Equivale a serie.apply(padronizar_descricao), processando só as descrições distintas."""
+    return por_valores_distintos(serie, _padronizar_textos, memo)
 
-    if t.startswith("comissao"):
-        if "magalu" in t:
-            return "parceiro magalu"
-        return "comissao victor"
-    return texto
+def tipo_receita_serie(serie):
+    """Equivale a serie.apply(tipo_receita)."""
+    return por_valores_distintos(serie, _tipo_receita_textos)
 
-def padronizar_fgts(texto):
-    if not isinstance(texto,str):
-        return texto
-    t = texto
-    if t.startswith("fgts"):
-        if "victor" in t:
-            return "fgts victor"
-        if "suelynn" in t or "suely" in t or "suellyn" in t or "varoa" in t:
-            return "fgts suellyn"
-    return texto
-
-def padronizar_seguro(texto):
-    if not isinstance(texto, str):
-        return texto
-    t = texto
+def transformar(df, memo=None):
+    with medir("passo", "transformar receitas", linhas_entrada=len(df)) as registro:
+        # cria coluna normalizada (NUNCA sobrescreve a original)
+        with medir("passo", "padronizar descricoes", linhas_entrada=len(df)):
+            df["descricao_normalizada"] = padronizar_descricoes(df["descricao"], memo)
+        df["tipo_receita"] = tipo_receita_serie(df["descricao_normalizada"])
 
-    if t.startswith("seguro"):
-        return "seguro desemprego"
-    return texto
+        #remove linhas RECEITAS Não tributadas e TOTAL
+        tupla_linhas = ("RECEITAS NÃO TRIBUTÁVEIS", "TOTAL", "DESCRICAO")
+        df = df.drop(df[df["descricao"].isin(tupla_linhas)].index)
+        registro["linhas_saida"] = len(df)
+    return df
 
-def tipo_receita(texto):
-    if not isinstance(texto, str):
-        return texto
-    t = texto
-
-    if t.startswith("vale"):
-        return "Nao Tributada"
-    return "Tributada" 
-
-# leitura da base raw
-df = pd.read_excel(ARQUIVO_ENTRADA)
-
-# cria coluna normalizada (NUNCA sobrescreve a original)
-df["descricao_normalizada"] = (
-    df["descricao"]
-    .apply(normalizar_texto)
-    .apply(padronizar_bonificacao)
-    .apply(padronizar_13)
-    .apply(padronizar_vales)
-    .apply(padronizar_comissao)
-    .apply(padronizar_fgts)
-    .apply(padronizar_seguro)
-)
+def executar(pasta_entrada=PASTA_ENTRADA, pasta_saida=PASTA_SAIDA, formato_saida=FORMATO_SAIDA):
+    """Lê a base raw, aplica o transform e grava a base tratada. Retorna o caminho gerado."""
+    # leitura da base raw
+    df = ler_base(pasta_entrada, NOME_ENTRADA)
 
-df["tipo_receita"] = df["descricao_normalizada"].apply(tipo_receita)
+    memo = criar_memo(os.path.join(pasta_entrada, NOME_MEMO))
+    df = transformar(df, memo)
+    memo.salvar()
 
-#remove linhas RECEITAS Não tributadas e TOTAL
-tupla_linhas = ("RECEITAS NÃO TRIBUTÁVEIS", "TOTAL", "DESCRICAO")
-df = df.drop(df[df["descricao"].isin(tupla_linhas)].index)
+    # salva base tratada
+    return salvar_base(df, pasta_saida, NOME_SAIDA, formato_saida)
 
-# salva base tratada
-df.to_excel(ARQUIVO_SAIDA, index=False)
+if __name__ == "__main__":
+    arquivo_saida = executar()
 
-print("TRANSFORM FINALIZADO COM SUCESSO!")
-print(f"Arquivo gerado em: {ARQUIVO_SAIDA}")
\ No newline at end of file
+    print("TRANSFORM FINALIZADO COM SUCESSO!")
+    print(f"Arquivo gerado em: {arquivo_saida}")
\ No newline at end of file
@@ -0,0 +1,14 @@
+# =========================================================
+# VALORES AUSENTES NA LEITURA DAS PLANILHAS
+# Autor: Victor
+# Descrição: Textos que o pd.read_excel trata como ausentes
+#            (na_values padrão do pandas). Compartilhado pelas
+#            leituras com openpyxl do ETL (extract_base) e dos
+#            cadastros (cadastro_io).
+# =========================================================
+
+VALORES_NA = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+])
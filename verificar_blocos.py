@@ -0,0 +1,95 @@
+# =========================================================
+# CONFERÊNCIA - CADASTROS EM BLOCOS x ARQUIVO INTEIRO
+# Autor: Victor
+# Descrição: Confere que o tratamento em blocos (clean_chunks
+#            sobre read_chunks, usado na gravação das GUIs e do
+#            lote) dá os mesmos valores do clean_dataframe no
+#            arquivo inteiro, em xlsx e csv com células vazias.
+#            Usa os cadastros sintéticos do benchmark.
+#
+#   python verificar_blocos.py
+#   python verificar_blocos.py --cadastros produtos --bloco 20
+# =========================================================
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmark import CADASTROS
+from cadastro_io import read_chunks
+
+PASTA_DADOS = os.path.join(tempfile.gettempdir(), "verificar_blocos")
+LINHAS = 2_000
+# blocos pequenos; as colunas numéricas só têm vazios nos blocos ímpares,
+# então um bloco lê a coluna como int e o seguinte (com vazio) como float
+BLOCO = 50
+
+
+def _vazios_em_blocos_alternados(df, chunksize):
+    par = (pd.Series(range(len(df))) // chunksize % 2 == 0).to_numpy()
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_float_dtype(df[col]):
+            preenchida = df[col].ffill().bfill()
+            df.loc[par, col] = preenchida[par]
+    return df
+
+
+def _valores(df):
+    # compara valores, não tipos: 5 (Int64 nos blocos) == 5.0 (float no inteiro)
+    return df.astype(object).where(df.notna(), None).reset_index(drop=True)
+
+
+def verificar(pasta, tipo, linhas=LINHAS, chunksize=BLOCO):
+    """
+    Gera o cadastro `tipo`, grava em xlsx e csv e compara os dois
+    tratamentos. O tratador usa uma máscara sem 'NAN', para que vazio tratado
+    como texto também apareça na diferença. Retorna os arquivos diferentes.
+    """
+    gerar, criar = CADASTROS[tipo]
+    df = _vazios_em_blocos_alternados(gerar(linhas), chunksize)
+    tratador = criar()
+    tratador.replacer_mask = {"'": ""}
+
+    diferentes = []
+    os.makedirs(pasta, exist_ok=True)
+    for extensao, ler_inteiro in ((".xlsx", pd.read_excel), (".csv", pd.read_csv)):
+        caminho = os.path.join(pasta, f"{tipo}_{linhas}{extensao}")
+        if extensao == ".xlsx":
+            df.to_excel(caminho, index=False)
+        else:
+            df.to_csv(caminho, index=False)
+        inteiro = tratador.clean_dataframe(ler_inteiro(caminho))
+        blocos = pd.concat(tratador.clean_chunks(read_chunks(caminho, chunksize)), ignore_index=True)
+        igual = _valores(inteiro).equals(_valores(blocos))
+        print(f"cadastro/{tipo}/blocos{extensao}: {'ok' if igual else 'DIFERENTE'}")
+        if not igual:
+            diferentes.append(caminho)
+    return diferentes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confere o tratamento em blocos dos cadastros.")
+    parser.add_argument("--cadastros", nargs="+", choices=list(CADASTROS), default=list(CADASTROS))
+    parser.add_argument("--linhas", type=int, default=LINHAS)
+    parser.add_argument("--bloco", type=int, default=BLOCO, help="linhas por bloco")
+    parser.add_argument("--pasta", default=PASTA_DADOS, help="onde ficam os arquivos gerados")
+    args = parser.parse_args(argv)
+
+    diferentes = []
+    for tipo in args.cadastros:
+        diferentes += verificar(args.pasta, tipo, args.linhas, args.bloco)
+
+    if diferentes:
+        print("\nTratamento em blocos diferente do arquivo inteiro em:")
+        for caminho in diferentes:
+            print(f"  {caminho}")
+        return 1
+    print("Blocos e arquivo inteiro iguais.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
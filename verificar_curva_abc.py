@@ -0,0 +1,103 @@
+# =========================================================
+# CONFERÊNCIA - CURVA ABC (CASOS DE NULL)
+# Autor: Victor
+# Descrição: Roda a Curva ABC em pandas com extrações pequenas
+#            montadas à mão e compara com o resultado que a
+#            consulta do Firebird dá para elas: classificação
+#            ou descrição toda NULL (coluna inteira vazia) e
+#            classificação NULL só em parte dos itens. Cada
+#            caso roda em memória (curva_abc) e pela base de
+#            agregados diários (curva_abc_store).
+#
+#   python verificar_curva_abc.py
+# =========================================================
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from curva_abc import curva_abc
+from curva_abc_store import atualizar, curva_abc_periodo
+
+DATA_INI = "2024-01-01"
+DATA_FIM = "2024-12-31"
+
+
+def _itens(codproduto_clas, dscproduto_clas, dscproduto=("ARROZ", "FEIJAO", "FEIJAO")):
+    return pd.DataFrame({
+        "codproduto": [1, 2, 2],
+        "codproduto_clas": codproduto_clas,
+        "dscproduto": list(dscproduto),
+        "dscproduto_clas": dscproduto_clas,
+        "dtacomp": ["2024-01-10", "2024-02-10", "2024-03-10"],
+        "total": [10.0, 5.0, 1.0],
+        "qtd": [1.0, 2.0, 3.0],
+        "venda_id": [1, 2, 3],
+        "idn_cancelada": "N",
+        "tipo_nd": "N",
+        "codfilial": 1,
+    })
+
+
+# nome -> (itens, linhas esperadas: codproduto, descprod, total_prod, qtd)
+CASOS = {
+    # classificação toda vazia: float só com NaN e object só com None
+    "classificacao_toda_nula": (
+        _itens([np.nan] * 3, [None] * 3),
+        [(None, None, 16.0, 6.0)],
+    ),
+    "classificacao_parcial": (
+        _itens([np.nan, 7.0, 7.0], [None, "5KG", "5KG"]),
+        [(None, None, 10.0, 1.0), ("2/7", "FEIJAO/5KG", 6.0, 5.0)],
+    ),
+    # nenhum produto com descrição: o lado esquerdo do || é todo NULL
+    "descricao_toda_nula": (
+        _itens([7.0, 7.0, 7.0], ["5KG", "5KG", "5KG"], [None] * 3),
+        [("1/7", None, 10.0, 1.0), ("2/7", None, 6.0, 5.0)],
+    ),
+}
+
+
+def _linhas(df):
+    colunas = df[["codproduto", "descprod", "total_prod", "qtd"]]
+    return [
+        tuple(None if pd.isna(v) else v for v in linha)
+        for linha in colunas.itertuples(index=False, name=None)
+    ]
+
+
+def _pela_base(itens):
+    # carga numa base SQLite temporária e consulta do período; a base também
+    # tem um item classificado de antes do período (descrições de
+    # classificação já gravadas, fora do resultado)
+    historico = _itens([9.0] * 3, ["1KG"] * 3).head(1).assign(codproduto=3, dtacomp="2023-06-01", venda_id=0)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "curva_abc.sqlite")
+        atualizar(pd.concat([historico, itens], ignore_index=True), caminho=caminho)
+        return curva_abc_periodo(DATA_INI, DATA_FIM, caminho=caminho)
+
+
+def verificar(nome, itens, esperado):
+    igual = True
+    for origem, calcular in (
+        ("curva_abc", lambda: curva_abc(itens, DATA_INI, DATA_FIM)),
+        ("curva_abc_store", lambda: _pela_base(itens)),
+    ):
+        obtido = _linhas(calcular())
+        print(f"{origem}/{nome}: {'ok' if obtido == esperado else 'DIFERENTE'}")
+        if obtido != esperado:
+            print(f"  esperado: {esperado}")
+            print(f"  obtido:   {obtido}")
+            igual = False
+    return igual
+
+
+def main():
+    resultados = [verificar(nome, itens, esperado) for nome, (itens, esperado) in CASOS.items()]
+    return 0 if all(resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())